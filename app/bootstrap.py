@@ -3,9 +3,10 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import NamedTuple
+from typing import Any, Awaitable, NamedTuple
 from zoneinfo import ZoneInfo
 
 from aiogram import Bot, Dispatcher
@@ -13,14 +14,16 @@ from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from aiogram.fsm.storage.base import BaseStorage
 from aiogram.fsm.storage.memory import MemoryStorage
 
-from app.config import ADMIN_IDS, BOT_TOKEN, DB_PATH, REDIS_URL
+from app.config import ADMIN_IDS, BOT_TOKEN, DB_PATH, MAX_CONCURRENT_UPDATES, REDIS_URL
 from app.database.db import init_db
 from app.handlers import admin, daily, notifications, profile, settings, start, training
 from app.locales import get_text
 from app.middlewares.error_middleware import ErrorMiddleware
+from app.middlewares.update_scheduler import ChatUpdateScheduler
 from app.services.backup_service import BackupService, _scrub_secrets
 from app.services.notification_loader import load_scheduled_users
 from app.services.notification_service import NotificationService
+from app.services.problem_catalog import catalog_stats
 from app.utils.set_commands import set_bot_commands
 
 logger = logging.getLogger(__name__)
@@ -66,6 +69,11 @@ async def notify_admins_startup(bot: Bot, reminders_count: int) -> None:
             logger.warning("Startup notification to admin %s failed: %s", admin_id, e)
 
 
+def _log_task_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background startup task failed", exc_info=task.exception())
+
+
 class App(NamedTuple):
     bot: Bot
     dp: Dispatcher
@@ -91,14 +99,46 @@ def _build_fsm_storage() -> BaseStorage:
     return storage
 
 
-async def setup_app() -> App:
+async def _init_db_and_reminders(bot: Bot, notification_service: NotificationService) -> None:
     logger.info("Initializing database...")
     await init_db()
     logger.info("Database initialized successfully")
+    await load_scheduled_users(bot, notification_service)
+
+
+async def _set_bot_commands_best_effort(bot: Bot) -> None:
+    """The command menu is cosmetic: a Telegram hiccup here is logged, and
+    must not cancel the DB init it runs alongside (possibly mid-migration)."""
+    try:
+        await set_bot_commands(bot)
+    except Exception:
+        logger.warning("Setting the bot command menu failed", exc_info=True)
+
+
+async def _run_concurrently(*steps: Awaitable[Any]) -> None:
+    """Await independent startup steps together; the first failure cancels
+    the rest and is raised as itself, not as an ExceptionGroup."""
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for step in steps:
+                tg.create_task(step)
+    except BaseExceptionGroup as group:
+        raise group.exceptions[0] from None
+
+
+async def setup_app() -> App:
+    catalogs = catalog_stats()
+    logger.info(
+        "Problem catalogs built in %s ms (%s bytes): %s; random path (too large): %s",
+        catalogs["build_ms"], catalogs["bytes"], catalogs["sizes"], catalogs["skipped"],
+    )
 
     bot = Bot(token=BOT_TOKEN)
     storage = _build_fsm_storage()
-    dp = Dispatcher(storage=storage)
+    # Serializes updates per chat (FSM read-modify-write across awaits would
+    # otherwise interleave on double taps) while capping cross-chat concurrency.
+    update_scheduler = ChatUpdateScheduler(max_concurrency=MAX_CONCURRENT_UPDATES)
+    dp = Dispatcher(storage=storage, events_isolation=update_scheduler)
 
     logger.info("Initializing NotificationService...")
     notification_service = NotificationService(timezone="Europe/Moscow")
@@ -106,13 +146,28 @@ async def setup_app() -> App:
 
     # DI: services flow to handlers via dispatcher workflow data.
     dp["notification_service"] = notification_service
+    dp["update_scheduler"] = update_scheduler
 
-    await load_scheduled_users(bot, notification_service)
-    await set_bot_commands(bot)
+    # Schema check + reminders (Postgres) and the command menu (Telegram)
+    # don't depend on each other: wait for the slower one, not for both.
+    started = time.perf_counter()
+    try:
+        await _run_concurrently(
+            _init_db_and_reminders(bot, notification_service),
+            _set_bot_commands_best_effort(bot),
+        )
+    except BaseException:
+        notification_service.shutdown()
+        await bot.session.close()
+        raise
+    logger.info("Startup I/O finished in %.0f ms", (time.perf_counter() - started) * 1000)
 
     logger.info("Initializing BackupService...")
     backup_service = BackupService(bot)
     backup_service.start()
+    # One instance for the scheduler and admin handlers: they share its
+    # in-flight dump instead of racing their own pg_dumps.
+    dp["backup_service"] = backup_service
 
     dp.update.middleware(ErrorMiddleware())
 
@@ -136,10 +191,14 @@ async def setup_app() -> App:
 
 async def run_app(app: App) -> None:
     heartbeat_task = asyncio.create_task(_heartbeat_loop())
-    try:
-        await notify_admins_startup(
+    # Sent alongside polling: users' first updates don't wait on admin pings.
+    notify_task = asyncio.create_task(
+        notify_admins_startup(
             app.bot, reminders_count=app.notification_service.get_all_jobs_count()
         )
+    )
+    notify_task.add_done_callback(_log_task_failure)
+    try:
         logger.info("Bot started and listening for updates...")
         await app.dp.start_polling(
             app.bot,
@@ -147,6 +206,7 @@ async def run_app(app: App) -> None:
         )
     finally:
         heartbeat_task.cancel()
+        notify_task.cancel()
         logger.info("Shutting down bot...")
         app.notification_service.shutdown()
         app.backup_service.scheduler.shutdown()
@@ -29,6 +29,42 @@ DB_PATH: Path = BASE_DIR / "app" / "data"
 
 DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
 
+# Global cap on updates processed at once. Updates from the same chat are
+# always serialized; this bounds concurrency *across* chats so a burst can't
+# exhaust the DB connection pool.
+MAX_CONCURRENT_UPDATES: int = int(os.getenv("MAX_CONCURRENT_UPDATES", "64"))
+
+# pg_dump parallelism. 1 (default) streams a single-threaded custom-format dump
+# straight into the encrypted file; N > 1 dumps in directory format with N
+# workers into a temporary 0700 directory, then tars it into the encrypted file.
+BACKUP_DUMP_JOBS: int = max(1, int(os.getenv("BACKUP_DUMP_JOBS", "1")))
+
+# Backups bigger than this are written as numbered parts so each fits a
+# Telegram bot upload (50 MB).
+BACKUP_PART_SIZE: int = max(1, int(os.getenv("BACKUP_PART_SIZE_MB", "45"))) * 1024 * 1024
+
+# Full pg_dump cadence. Between full dumps, new rows of the append-only
+# ``problems`` table (the bulk of the database) can be exported on their own
+# every BACKUP_INCREMENT_INTERVAL_HOURS (0, the default, turns increments off).
+BACKUP_INTERVAL_HOURS: int = max(1, int(os.getenv("BACKUP_INTERVAL_HOURS", "12")))
+BACKUP_INCREMENT_INTERVAL_HOURS: int = max(
+    0, int(os.getenv("BACKUP_INCREMENT_INTERVAL_HOURS", "0"))
+)
+
+# Check every new backup before reporting it: "off" (default); "list" streams
+# the decrypted dump into ``pg_restore --list`` (every chunk and part is
+# authenticated, the archive's table of contents parsed); "restore" replays it
+# into BACKUP_VERIFY_DATABASE_URL — a scratch database that is overwritten on
+# every run.
+BACKUP_VERIFY: str = os.getenv("BACKUP_VERIFY", "off").strip().lower()
+if BACKUP_VERIFY not in ("off", "list", "restore"):
+    raise ValueError(f"BACKUP_VERIFY must be off, list or restore, not {BACKUP_VERIFY!r}")
+BACKUP_VERIFY_DATABASE_URL: str = os.getenv("BACKUP_VERIFY_DATABASE_URL", "").strip()
+if BACKUP_VERIFY == "restore" and not BACKUP_VERIFY_DATABASE_URL:
+    raise ValueError("BACKUP_VERIFY=restore needs BACKUP_VERIFY_DATABASE_URL")
+if BACKUP_VERIFY_DATABASE_URL and BACKUP_VERIFY_DATABASE_URL == DATABASE_URL:
+    raise ValueError("BACKUP_VERIFY_DATABASE_URL must not be the bot's own database")
+
 ADMIN_IDS: list[int] = [
     int(x.strip())
     for x in os.getenv("ADMIN_IDS", "").split(",")
@@ -1,16 +1,21 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Awaitable, Callable, Optional
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy import select, func, desc, update
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import delete, select, false, func, desc, text, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import joinedload
+from sqlalchemy.pool import NullPool
 from datetime import datetime, date, timedelta, timezone
 import json
 
 from app.config import DATABASE_URL, DB_PATH
 from app.database.models import (
     Base,
+    BackupRun,
     DailyChallenge,
     DailyChallengeAttempt,
     Problem,
@@ -25,20 +30,89 @@ async_session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_
 logger = logging.getLogger(__name__)
 
 
-async def init_db() -> None:
-    """Apply Alembic migrations to bring the schema to the latest revision."""
-    DB_PATH.mkdir(parents=True, exist_ok=True)
+# Newest migration in migrations/versions; bump it with every new revision
+# (a test checks it against Alembic's script head). A database already here
+# boots without loading Alembic at all.
+SCHEMA_HEAD = "0008_backup_run_snapshots"
+# Advisory lock key serializing migrations across replicas ("DotMath").
+_MIGRATION_LOCK_KEY = 0x446F744D617468
+_MIGRATION_LOCK_POLL_S = 0.25
+
+
+async def _schema_revisions(conn: AsyncConnection) -> set[str]:
+    """Revisions stamped in ``alembic_version``; empty on a fresh database."""
+    if await conn.scalar(text("SELECT to_regclass('alembic_version')")) is None:
+        return set()
+    return set((await conn.scalars(text("SELECT version_num FROM alembic_version"))).all())
 
+
+def _upgrade_to_head() -> None:
     from alembic import command
     from alembic.config import Config
 
     config_path = Path(__file__).resolve().parents[2] / "alembic.ini"
     cfg = Config(str(config_path))
     cfg.set_main_option("sqlalchemy.url", DATABASE_URL)
+    command.upgrade(cfg, "head")
+
+
+async def _run_upgrade() -> None:
+    """``_upgrade_to_head`` in a worker thread, awaited to the end even if the
+    caller is cancelled: the thread can't be stopped, and the migration lock
+    must stay held while Alembic is still running. The cancellation is
+    re-raised once it returns."""
+    upgrade = asyncio.ensure_future(asyncio.to_thread(_upgrade_to_head))
+    cancelled = False
+    while True:
+        try:
+            await asyncio.shield(upgrade)
+            break
+        except asyncio.CancelledError:
+            if upgrade.done():
+                raise
+            cancelled = True
+    if cancelled:
+        raise asyncio.CancelledError
+
 
-    import asyncio
+async def init_db() -> None:
+    """Bring the schema to the latest revision.
 
-    await asyncio.to_thread(command.upgrade, cfg, "head")
+    The usual boot finds it already there with one query and skips Alembic.
+    Otherwise migrations run under a Postgres advisory lock, so replicas
+    starting together take turns; the ones that waited re-check and find
+    the work done.
+    """
+    DB_PATH.mkdir(parents=True, exist_ok=True)
+
+    # Unpooled, like migrations/env.py: nothing opened here stays in the
+    # app's pool.
+    # Autocommit, and the lock is polled rather than waited for inside
+    # pg_advisory_lock: an open transaction or a blocked statement holds a
+    # snapshot, which CREATE INDEX CONCURRENTLY (0005) in the replica that
+    # is migrating would wait out forever.
+    boot_engine = create_async_engine(
+        DATABASE_URL, poolclass=NullPool, isolation_level="AUTOCOMMIT"
+    )
+    try:
+        async with boot_engine.connect() as conn:
+            if await _schema_revisions(conn) == {SCHEMA_HEAD}:
+                logger.info("Database schema already at %s", SCHEMA_HEAD)
+                return
+            # Session-level lock: also released if this connection dies.
+            while not await conn.scalar(select(func.pg_try_advisory_lock(_MIGRATION_LOCK_KEY))):
+                await asyncio.sleep(_MIGRATION_LOCK_POLL_S)
+            try:
+                if await _schema_revisions(conn) == {SCHEMA_HEAD}:
+                    logger.info(
+                        "Database schema migrated to %s by another instance", SCHEMA_HEAD
+                    )
+                    return
+                await _run_upgrade()
+            finally:
+                await conn.execute(select(func.pg_advisory_unlock(_MIGRATION_LOCK_KEY)))
+    finally:
+        await boot_engine.dispose()
     logger.info("Database schema upgraded to head")
 
 
@@ -154,50 +228,101 @@ async def create_training_session(telegram_id: int, difficulty: str, mode: str,
         return session_obj
 
 
-async def complete_training_session(session_id: int, correct: int, incorrect: int) -> None:
+@dataclass(frozen=True, slots=True)
+class SessionSummary:
+    """What the result screen needs once a session is finalized."""
+
+    current_streak: int
+    max_streak: int
+    already_completed: bool = False
+
+
+async def finalize_session(
+    session_id: int,
+    correct: int,
+    incorrect: int,
+    *,
+    daily_attempt_id: Optional[int] = None,
+    total_time_ms: int = 0,
+) -> SessionSummary:
+    """Complete a training session (and its daily attempt) in one transaction.
+
+    The session and its user are read with one locked SELECT, so concurrent
+    finishes of the same user can't lose counter updates; the user counters,
+    the day-streak and the daily attempt are committed together. Finalizing
+    an already completed session (a turn retried after a failed edit) leaves
+    the counters alone and just reports the streak.
+    """
     logger.info("Completing session id=%s: correct=%s incorrect=%s", session_id, correct, incorrect)
     async with async_session_maker() as session:
         stmt = (
             select(TrainingSession)
-            .options(selectinload(TrainingSession.user))
+            .options(joinedload(TrainingSession.user, innerjoin=True))
             .where(TrainingSession.id == session_id)
+            .with_for_update()
         )
         result = await session.execute(stmt)
         training_session = result.scalar_one()
-
         user = training_session.user
 
-        training_session.correct = correct
-        training_session.incorrect = incorrect
-        training_session.completed = True
-        training_session.completed_at = datetime.now(timezone.utc)
-
-        user.total_problems_solved += training_session.total_problems
-        user.correct_answers += correct
-        user.incorrect_answers += incorrect
-
-        today = date.today()
-        last_training = user.last_training_date.date() if user.last_training_date else None
+        if training_session.completed:
+            return SessionSummary(user.current_streak, user.max_streak, already_completed=True)
+
+        _apply_session_result(training_session, user, correct, incorrect)
+        if daily_attempt_id is not None:
+            await session.execute(
+                update(DailyChallengeAttempt)
+                .where(DailyChallengeAttempt.id == daily_attempt_id)
+                .values(
+                    correct=correct,
+                    incorrect=incorrect,
+                    total_time_ms=total_time_ms,
+                    completed_at=datetime.now(timezone.utc),
+                )
+            )
+        summary = SessionSummary(user.current_streak, user.max_streak)
+        await session.commit()
+        return summary
 
-        if last_training:
-            days_diff = (today - last_training).days
 
-            if days_diff == 0:
-                pass
-            elif days_diff == 1:
-                if correct >= 1:  # At least one correct answer for streak
-                    user.current_streak += 1
-            else:
-                user.current_streak = 1 if correct >= 1 else 0
+def _apply_session_result(
+    training_session: TrainingSession, user: User, correct: int, incorrect: int
+) -> None:
+    training_session.correct = correct
+    training_session.incorrect = incorrect
+    training_session.completed = True
+    training_session.completed_at = datetime.now(timezone.utc)
+
+    user.total_problems_solved += training_session.total_problems
+    user.correct_answers += correct
+    user.incorrect_answers += incorrect
+
+    today = date.today()
+    last_training = user.last_training_date.date() if user.last_training_date else None
+
+    if last_training:
+        days_diff = (today - last_training).days
+
+        if days_diff == 0:
+            pass
+        elif days_diff == 1:
+            if correct >= 1:  # At least one correct answer for streak
+                user.current_streak += 1
         else:
             user.current_streak = 1 if correct >= 1 else 0
+    else:
+        user.current_streak = 1 if correct >= 1 else 0
 
-        if user.current_streak > user.max_streak:
-            user.max_streak = user.current_streak
+    if user.current_streak > user.max_streak:
+        user.max_streak = user.current_streak
 
-        user.last_training_date = datetime.now(timezone.utc)
+    user.last_training_date = datetime.now(timezone.utc)
 
-        await session.commit()
+
+async def complete_training_session(session_id: int, correct: int, incorrect: int) -> int:
+    """Close the session, roll its counts into the user, return the day-streak."""
+    summary = await finalize_session(session_id, correct, incorrect)
+    return summary.current_streak
 
 
 def _empty_diff() -> dict[str, int]:
@@ -548,16 +673,25 @@ async def record_problem_answered(
         await session.commit()
 
 
+async def discard_problem_shown(problem_id: int) -> None:
+    """Delete a Problem row whose render failed, so a retried turn doesn't
+    leave it behind next to its own."""
+    async with async_session_maker() as session:
+        await session.execute(delete(Problem).where(Problem.id == problem_id))
+        await session.commit()
+
+
 async def get_session_mistakes(session_id: int) -> list[Problem]:
     """Return Problem rows for a session where the user answered incorrectly.
 
-    Used by the post-session "Retry mistakes" flow to seed a fresh in-memory
-    session with only the failed expressions.
+    Read when a session finishes, to pack its "Retry mistakes" list.
+    ``is_correct = false`` (not ``IS FALSE``) so the planner can use the
+    partial index ``ix_problems_session_mistakes``.
     """
     async with async_session_maker() as session:
         stmt = (
             select(Problem)
-            .where(Problem.session_id == session_id, Problem.is_correct.is_(False))
+            .where(Problem.session_id == session_id, Problem.is_correct == false())
             .order_by(Problem.id)
         )
         result = await session.execute(stmt)
@@ -709,3 +843,77 @@ async def get_daily_leaderboard(
         has_next = len(rows) > limit
         rows = rows[:limit]
         return [(u, a) for u, a in rows], has_next
+
+
+# ---------------------------------------------------------------------------
+# Backup run history (migration 0006)
+# ---------------------------------------------------------------------------
+
+
+async def record_backup_run(
+    name: str,
+    size_bytes: int,
+    parts: int,
+    jobs: int,
+    dump_ms: int,
+    encrypt_ms: int,
+    verify_mode: str,
+    verify_ms: Optional[int] = None,
+    verified: Optional[bool] = None,
+    kind: str = "full",
+    snapshot: Optional[str] = None,
+) -> None:
+    async with async_session_maker() as session:
+        session.add(
+            BackupRun(
+                name=name,
+                size_bytes=size_bytes,
+                parts=parts,
+                jobs=jobs,
+                dump_ms=dump_ms,
+                encrypt_ms=encrypt_ms,
+                verify_mode=verify_mode,
+                verify_ms=verify_ms,
+                verified=verified,
+                kind=kind,
+                snapshot=snapshot,
+            )
+        )
+        await session.commit()
+
+
+async def get_backup_runs(limit: int = 20) -> list[BackupRun]:
+    """Most recent backup runs first."""
+    async with async_session_maker() as session:
+        stmt = select(BackupRun).order_by(BackupRun.created_at.desc()).limit(limit)
+        result = await session.execute(stmt)
+        return list(result.scalars().all())
+
+
+async def get_backup_base() -> Optional[tuple[str, str]]:
+    """``(name, snapshot)`` of the newest backup run that recorded a snapshot.
+
+    What the next increment builds on; ``None`` until a full backup has
+    recorded one.
+    """
+    async with async_session_maker() as session:
+        stmt = (
+            select(BackupRun.name, BackupRun.snapshot)
+            .where(BackupRun.snapshot.is_not(None))
+            .order_by(BackupRun.created_at.desc(), BackupRun.id.desc())
+            .limit(1)
+        )
+        row = (await session.execute(stmt)).first()
+        return (row.name, row.snapshot) if row else None
+
+
+@asynccontextmanager
+async def driver_connection() -> AsyncIterator[Any]:
+    """The pooled connection's raw asyncpg connection, for ``COPY``.
+
+    SQLAlchemy has no COPY support; the backups stream binary COPY through
+    asyncpg directly.
+    """
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        yield raw.driver_connection
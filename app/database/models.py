@@ -5,12 +5,14 @@ from sqlalchemy import (
     Date,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
     Text,
     UniqueConstraint,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import declarative_base, relationship
@@ -93,6 +95,15 @@ class TrainingSession(Base):
 
 class Problem(Base):
     __tablename__ = "problems"
+    __table_args__ = (
+        # Wrong rows only, for get_session_mistakes (migration 0005).
+        Index(
+            "ix_problems_session_mistakes",
+            "session_id",
+            "id",
+            postgresql_where=text("is_correct = false"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     session_id = Column(Integer, ForeignKey("training_sessions.id"), nullable=False)
@@ -166,3 +177,33 @@ class DailyChallengeAttempt(Base):
 
     def __repr__(self) -> str:
         return f"<DailyChallengeAttempt user={self.user_id} date={self.challenge_date}>"
+
+
+class BackupRun(Base):
+    """Timings of one successful backup, kept for trend tracking.
+
+    ``snapshot`` is the ``pg_snapshot`` the backup covers: the next
+    incremental export carries the rows the newest run's snapshot didn't see.
+    """
+
+    __tablename__ = "backup_runs"
+
+    id = Column(Integer, primary_key=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False, index=True
+    )
+    name = Column(String, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+    parts = Column(Integer, nullable=False)
+    jobs = Column(Integer, nullable=False)  # pg_dump workers (1 = streamed custom format)
+    # A streamed dump is encrypted while pg_dump runs: encrypt_ms overlaps dump_ms.
+    dump_ms = Column(Integer, nullable=False)
+    encrypt_ms = Column(Integer, nullable=False)
+    verify_mode = Column(String, nullable=False)  # off, list, restore
+    verify_ms = Column(Integer, nullable=True)
+    verified = Column(Boolean, nullable=True)  # NULL when verification is off
+    kind = Column(String, nullable=False, server_default="full")  # full, incremental
+    snapshot = Column(String, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<BackupRun {self.name}>"
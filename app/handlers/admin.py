@@ -1,10 +1,11 @@
+import asyncio
 import hmac
 import logging
-import os
 import time
+from pathlib import Path
 
-import psutil
-from aiogram import F, Router
+from aiogram import Bot, F, Router
+from aiogram.exceptions import TelegramRetryAfter
 from aiogram.filters import Command
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
@@ -19,8 +20,17 @@ from app.database.db import (
 )
 from app.keyboards.callbacks import AdminCB
 from app.keyboards.inline import InlineKeyboards
-from app.locales import get_text
+from app.locales import get_template, get_text
+from app.middlewares.update_scheduler import ChatUpdateScheduler
+from app.services.backup_service import (
+    BackupService,
+    backup_parts,
+    manifest_path,
+    read_manifest,
+)
 from app.utils.helpers import escape_md
+from app.utils.latency import TURN_LATENCY
+from app.utils.ui import safe_edit
 
 
 class AdminStates(StatesGroup):
@@ -42,6 +52,8 @@ _BACKUP_MAX_ATTEMPTS = 5
 _BACKUP_LOCKOUT_SECONDS = 300
 _backup_attempts: dict[int, tuple[int, float]] = {}
 
+_BACKUP_UPLOAD_ATTEMPTS = 5  # per file, counting flood-wait retries
+
 
 def _backup_lock_remaining(user_id: int) -> int:
     """Seconds of lockout left for this admin, or 0 if not locked."""
@@ -86,18 +98,24 @@ async def admin_main_callback(callback: CallbackQuery, callback_data: AdminCB) -
         await callback.answer(get_text("admin_no_rights", lang), show_alert=True)
         return
 
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         get_text("admin_panel_title", lang),
         reply_markup=InlineKeyboards.admin_main_menu(lang),
-        parse_mode="Markdown",
     )
 
 
 @router.callback_query(AdminCB.filter(F.action == "stats"))
-async def admin_stats_handler(callback: CallbackQuery, callback_data: AdminCB) -> None:
+async def admin_stats_handler(
+    callback: CallbackQuery,
+    callback_data: AdminCB,
+    update_scheduler: ChatUpdateScheduler | None = None,
+) -> None:
     if not is_admin(callback.from_user.id):
         return
 
+    import psutil  # only this admin screen needs it; kept off the startup path
+
     lang = await get_user_language(callback.from_user.id)
     cpu_usage = psutil.cpu_percent()
     ram = psutil.virtual_memory()
@@ -105,6 +123,7 @@ async def admin_stats_handler(callback: CallbackQuery, callback_data: AdminCB) -
     total_users = await get_total_users_count()
     new_today = await get_new_users_count(1)
     new_week = await get_new_users_count(7)
+    turn = TURN_LATENCY.summary()
 
     stats_text = get_text("admin_stats_template", lang).format(
         cpu=cpu_usage,
@@ -114,12 +133,16 @@ async def admin_stats_handler(callback: CallbackQuery, callback_data: AdminCB) -
         total=total_users,
         new_today=new_today,
         new_week=new_week,
+        queue=update_scheduler.queue_depth if update_scheduler else 0,
+        in_flight=update_scheduler.in_flight if update_scheduler else 0,
+        turn_p50=turn["p50_ms"] if turn["p50_ms"] is not None else "—",
+        turn_p95=turn["p95_ms"] if turn["p95_ms"] is not None else "—",
     )
 
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         stats_text,
         reply_markup=InlineKeyboards.admin_main_menu(lang),
-        parse_mode="Markdown",
     )
 
 
@@ -134,9 +157,11 @@ async def admin_users_list_handler(callback: CallbackQuery, callback_data: Admin
     users = await get_all_users_paginated(limit, offset)
 
     if not users and offset == 0:
-        await callback.message.edit_text(
+        await safe_edit(
+            callback,
             get_text("admin_users_empty", lang),
             reply_markup=InlineKeyboards.admin_main_menu(lang),
+            parse_mode=None,
         )
         return
 
@@ -154,26 +179,40 @@ async def admin_users_list_handler(callback: CallbackQuery, callback_data: Admin
         text += f"• ID: `{user.telegram_id}` | {safe_first_name} ({prefix})\n"
 
     has_next = len(users) == limit
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.admin_users_list(offset, has_next, lang),
-        parse_mode="Markdown",
     )
 
 
 @router.callback_query(AdminCB.filter(F.action == "backup"))
-async def admin_backup_handler(callback: CallbackQuery, callback_data: AdminCB) -> None:
+async def admin_backup_handler(
+    callback: CallbackQuery, callback_data: AdminCB, backup_service: BackupService
+) -> None:
     if not is_admin(callback.from_user.id):
         return
 
     lang = await get_user_language(callback.from_user.id)
-    from app.services.backup_service import BackupService
-
-    backup_service = BackupService(callback.bot)
-    await backup_service.create_backup()
+    await backup_service.recent_or_new_backup()
     await callback.answer(get_text("admin_backup_ok", lang), show_alert=True)
 
 
+async def _send_backup_file(
+    bot: Bot, chat_id: int, path: Path, caption: str | None = None
+) -> None:
+    """``send_document`` that sits out Telegram flood waits between parts."""
+    for attempt in range(1, _BACKUP_UPLOAD_ATTEMPTS + 1):
+        try:
+            await bot.send_document(chat_id, FSInputFile(path), caption=caption)
+            return
+        except TelegramRetryAfter as e:
+            if attempt == _BACKUP_UPLOAD_ATTEMPTS:
+                raise
+            logger.warning("Flood wait %s s while uploading %s", e.retry_after, path.name)
+            await asyncio.sleep(e.retry_after)
+
+
 @router.callback_query(AdminCB.filter(F.action == "download"))
 async def admin_download_backup_prompt(
     callback: CallbackQuery, callback_data: AdminCB, state: FSMContext
@@ -191,7 +230,9 @@ async def admin_download_backup_prompt(
 
 
 @router.message(AdminStates.wait_backup_password)
-async def admin_download_backup_process(message: Message, state: FSMContext) -> None:
+async def admin_download_backup_process(
+    message: Message, state: FSMContext, backup_service: BackupService
+) -> None:
     if not is_admin(message.from_user.id):
         await state.clear()
         return
@@ -210,22 +251,31 @@ async def admin_download_backup_process(message: Message, state: FSMContext) ->
 
     if hmac.compare_digest(password.encode("utf-8"), ADMIN_BACKUP_PASSWORD.encode("utf-8")):
         _backup_attempts.pop(message.from_user.id, None)
-        from app.services.backup_service import BackupService
-
-        backup_service = BackupService(message.bot)
         await message.answer(get_text("admin_backup_creating", lang))
         try:
-            backup_path = await backup_service.create_backup()
+            backup_path = await backup_service.recent_or_new_backup()
 
             if backup_path:
-                path_str = str(backup_path)
-                filename = os.path.basename(path_str)
-                document = FSInputFile(path_str)
-                await message.bot.send_document(
-                    message.chat.id,
-                    document,
-                    caption=get_text("admin_backup_caption", lang).format(filename=filename),
-                )
+                parts = backup_parts(backup_path)
+                digests = read_manifest(backup_path) or {}
+                caption = get_template("admin_backup_caption", lang)
+                for number, part in enumerate(parts, 1):
+                    await _send_backup_file(
+                        message.bot,
+                        message.chat.id,
+                        part,
+                        caption.format(
+                            filename=part.name,
+                            part=number,
+                            total=len(parts),
+                            sha256=digests.get(part.name, "—"),
+                        ),
+                    )
+                if len(parts) > 1:
+                    # Lets the restore CLI verify the parts after download.
+                    await _send_backup_file(
+                        message.bot, message.chat.id, manifest_path(backup_path)
+                    )
             else:
                 await message.answer(get_text("admin_backup_file_error", lang))
         except Exception:
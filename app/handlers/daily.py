@@ -31,6 +31,7 @@ from app.handlers.training import TrainingStates, show_problem
 from app.keyboards.callbacks import MenuCB
 from app.keyboards.inline import InlineKeyboards
 from app.locales import get_text
+from app.services.problem_codec import ProblemSet
 from app.services.problem_generator import ProblemGenerator
 from app.utils.constants import Difficulty, TrainingMode
 from app.utils.ui import safe_edit, today_msk
@@ -75,7 +76,7 @@ def generate_daily_specs(seed: int) -> list[dict]:
                 "operation": problem.operation,
                 "answer": problem.answer,
                 "formatted_text": problem.formatted_text,
-                "metadata": problem.metadata,
+                "metadata": dict(problem.metadata),
             }
         )
     return specs
@@ -104,17 +105,15 @@ async def daily_entry_handler(
 
     challenge = await get_or_create_daily_challenge(today, generate_daily_specs, daily_seed)
     attempt, _created = await get_or_create_daily_attempt(user.id, today)
-    # Specs are already JSON-safe dicts (same shape as training.py's
-    # _problem_to_spec) — push them straight into FSM so RedisStorage can
-    # serialize them. show_problem materializes Problem on demand.
-    spec_list = list(challenge.problem_specs)
+    # The DB keeps the day's set as JSON specs; FSM gets the packed form.
+    problems = ProblemSet.from_specs(challenge.problem_specs)
 
     # Synthetic training session row so we can persist Problem rows + retry would still work.
     new_session = await create_training_session(
         telegram_id=callback.from_user.id,
         difficulty=Difficulty.HARD.value,
         mode=TrainingMode.MIXED.value,
-        total_problems=len(spec_list),
+        total_problems=len(problems),
     )
 
     await state.clear()
@@ -123,7 +122,7 @@ async def daily_entry_handler(
         session_id=new_session.id,
         difficulty=Difficulty.HARD.value,
         mode=TrainingMode.MIXED.value,
-        problems=spec_list,
+        problems=problems.blob,
         idx=0,
         correct=0,
         incorrect=0,
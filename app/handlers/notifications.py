@@ -18,6 +18,7 @@ from app.locales import get_text
 from app.services.notification_callback import send_training_reminder
 from app.services.notification_service import NotificationService
 from app.utils.constants import NOTIFICATION_PRESETS, NotificationPreset
+from app.utils.ui import safe_edit
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -33,10 +34,10 @@ async def settings_notifications_handler(
 ) -> None:
     lang = await get_user_language(callback.from_user.id)
     text = get_text("settings_notifications", lang)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.notification_preset_selection(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -57,10 +58,10 @@ async def notify_preset_handler(
     if preset == NotificationPreset.CUSTOM:
         await state.set_state(NotificationStates.waiting_for_custom_time)
         text = get_text("custom_time_input", lang)
-        await callback.message.edit_text(
+        await safe_edit(
+            callback,
             text,
             reply_markup=InlineKeyboards.cancel_custom_time(lang),
-            parse_mode="Markdown",
         )
         await callback.answer()
         return
@@ -114,10 +115,10 @@ async def notify_preset_handler(
         )
         text = get_text("notification_error", lang)
 
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.back_only(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -190,10 +191,10 @@ async def cancel_custom_time_handler(
     await state.clear()
     lang = await get_user_language(callback.from_user.id)
     text = get_text("custom_time_cancelled", lang)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.back_only(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -246,10 +247,10 @@ async def check_notifications_handler(
         except ValueError:
             text = get_text("unknown_preset", lang).format(preset=preset_str)
 
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.back_only(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -9,6 +9,7 @@ from app.keyboards.inline import InlineKeyboards
 from app.locales import get_text
 from app.services.hint_service import get_tips
 from app.services.stats_service import StatsService
+from app.utils.ui import safe_edit
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -20,14 +21,14 @@ async def show_profile_handler(callback: CallbackQuery, callback_data: MenuCB) -
     profile_text = await StatsService.get_formatted_profile(callback.from_user.id, lang)
     favorite_mode, favorite_difficulty = await get_user_favorite(callback.from_user.id)
 
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         profile_text,
         reply_markup=InlineKeyboards.profile_actions(
             lang,
             favorite_mode=favorite_mode,
             favorite_difficulty=favorite_difficulty,
         ),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -36,10 +37,10 @@ async def show_profile_handler(callback: CallbackQuery, callback_data: MenuCB) -
 async def show_leaderboard_handler(callback: CallbackQuery, callback_data: MenuCB) -> None:
     lang = await get_user_language(callback.from_user.id)
     text = await StatsService.get_leaderboard_choose_mode_text(lang)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.leaderboard_mode_choice(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -59,10 +60,10 @@ async def show_leaderboard_mode_handler(
         mode=mode,
         telegram_id=callback.from_user.id,
     )
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         leaderboard_text,
         reply_markup=InlineKeyboards.leaderboard_mode_choice(lang, mode, offset, has_next),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -70,10 +71,10 @@ async def show_leaderboard_mode_handler(
 @router.callback_query(MenuCB.filter(F.action == "tips"))
 async def show_tips_handler(callback: CallbackQuery, callback_data: MenuCB) -> None:
     lang = await get_user_language(callback.from_user.id)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         get_text("tips_choose", lang),
         reply_markup=InlineKeyboards.tips_menu(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -81,10 +82,10 @@ async def show_tips_handler(callback: CallbackQuery, callback_data: MenuCB) -> N
 async def _render_tip(callback: CallbackQuery, category: str) -> None:
     lang = await get_user_language(callback.from_user.id)
     text = get_tips(category, lang)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         text,
         reply_markup=InlineKeyboards.tips_menu(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -17,7 +17,7 @@ from app.keyboards.callbacks import BackCB, MenuCB
 from app.keyboards.inline import InlineKeyboards
 from app.locales import get_text
 from app.utils.helpers import escape_md
-from app.utils.ui import today_msk
+from app.utils.ui import safe_edit, today_msk
 
 router = Router()
 logger = logging.getLogger(__name__)
@@ -70,7 +70,8 @@ async def language_switch_handler(
     await callback.answer(get_text(msg_key, lang))
     daily_done = await has_user_done_daily(callback.from_user.id, today_msk())
     favorite_mode, favorite_difficulty = await get_user_favorite(callback.from_user.id)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         get_text("main_menu", lang),
         reply_markup=InlineKeyboards.main_menu(
             lang,
@@ -78,7 +79,6 @@ async def language_switch_handler(
             favorite_mode=favorite_mode,
             favorite_difficulty=favorite_difficulty,
         ),
-        parse_mode="Markdown",
     )
 
 
@@ -181,7 +181,8 @@ async def back_to_menu_handler(
     lang = await get_user_language(callback.from_user.id)
     daily_done = await has_user_done_daily(callback.from_user.id, today_msk())
     favorite_mode, favorite_difficulty = await get_user_favorite(callback.from_user.id)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         get_text("main_menu", lang),
         reply_markup=InlineKeyboards.main_menu(
             lang,
@@ -189,7 +190,6 @@ async def back_to_menu_handler(
             favorite_mode=favorite_mode,
             favorite_difficulty=favorite_difficulty,
         ),
-        parse_mode="Markdown",
     )
     await callback.answer()
 
@@ -197,9 +197,9 @@ async def back_to_menu_handler(
 @router.callback_query(MenuCB.filter(F.action == "help"))
 async def menu_help_handler(callback: CallbackQuery, callback_data: MenuCB) -> None:
     lang = await get_user_language(callback.from_user.id)
-    await callback.message.edit_text(
+    await safe_edit(
+        callback,
         get_text("help", lang),
         reply_markup=InlineKeyboards.back_only(lang),
-        parse_mode="Markdown",
     )
     await callback.answer()
@@ -12,9 +12,13 @@ answer) — required for "Retry mistakes" and timing stats.
 """
 from __future__ import annotations
 
-import json
+import asyncio
+import heapq
 import logging
+from dataclasses import replace
 from datetime import datetime, timezone
+from functools import partial
+from typing import Any, Awaitable, Callable
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
@@ -22,11 +26,10 @@ from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message
 
 from app.database.db import (
-    complete_daily_attempt,
-    complete_training_session,
     create_training_session,
+    discard_problem_shown,
+    finalize_session,
     get_session_mistakes,
-    get_user,
     get_user_favorite,
     get_user_language,
     record_problem_answered,
@@ -35,8 +38,11 @@ from app.database.db import (
 from app.keyboards.callbacks import TrainingCB
 from app.keyboards.inline import InlineKeyboards
 from app.locales import get_text
-from app.services.problem_generator import Problem, ProblemGenerator
+from app.services.problem_codec import ProblemSet
+from app.services.problem_generator import Problem, ProblemGenerator, make_problem
+from app.services.session_state import SessionState, session_state
 from app.utils.constants import DIFFICULTY_CONFIG, Difficulty, TrainingMode
+from app.utils.latency import TURN_LATENCY
 from app.utils.ui import (
     delete_user_message,
     edit_anchor,
@@ -112,24 +118,29 @@ async def select_mode_handler(
     cfg = DIFFICULTY_CONFIG[difficulty]
     examples_count = int(cfg["examples_count"])
 
-    problems = ProblemGenerator.generate_problems(difficulty, mode, examples_count)
     session = await create_training_session(
         telegram_id=callback.from_user.id,
         difficulty=difficulty.value,
         mode=mode.value,
-        total_problems=len(problems),
+        total_problems=examples_count,
     )
 
     await state.update_data(
         session_id=session.id,
         difficulty=difficulty.value,
         mode=mode.value,
-        problems=_problems_to_specs(problems),
+        # Problems are regenerated per index from the seed (SeededProblems).
+        problem_seed=ProblemGenerator.new_seed(),
+        problem_count=examples_count,
         idx=0,
         correct=0,
         incorrect=0,
         session_streak=0,
         last_time_s=None,
+        answer_time_sum=0.0,
+        timed_answers=0,
+        slowest=[],
+        mistake_mask=0,
         anchor_chat_id=callback.message.chat.id,
         anchor_message_id=callback.message.message_id,
         current_problem_id=None,
@@ -203,13 +214,11 @@ async def quick_start_handler(
         difficulty = _QUICK_START_DEFAULT_DIFFICULTY
     cfg = DIFFICULTY_CONFIG[difficulty]
     examples_count = int(cfg["examples_count"])
-    problems = ProblemGenerator.generate_problems(difficulty, mode, examples_count)
-
     session = await create_training_session(
         telegram_id=callback.from_user.id,
         difficulty=difficulty.value,
         mode=mode.value,
-        total_problems=len(problems),
+        total_problems=examples_count,
     )
 
     await state.clear()
@@ -218,7 +227,9 @@ async def quick_start_handler(
         session_id=session.id,
         difficulty=difficulty.value,
         mode=mode.value,
-        problems=_problems_to_specs(problems),
+        # Problems are regenerated per index from the seed (SeededProblems).
+        problem_seed=ProblemGenerator.new_seed(),
+        problem_count=examples_count,
         idx=0,
         correct=0,
         incorrect=0,
@@ -253,115 +264,151 @@ def _problem_metadata_for_persist(problem: Problem) -> dict:
     return meta
 
 
-def _problem_to_spec(problem: Problem) -> dict:
-    """Flatten a Problem into a JSON-safe dict for FSM storage.
+async def show_problem(
+    callback: CallbackQuery, state: FSMContext, feedback_prefix: str | None = None
+) -> None:
+    """Render the current problem into the anchor message.
 
-    RedisStorage serializes FSM data as JSON; Problem instances aren't
-    serializable directly. We round-trip via plain dicts at the FSM boundary —
-    daily.py already uses the same shape, so the spec format is shared.
+    Entry point for freshly started sessions (normal, quick start, daily,
+    retry). Works for both choose-answer (callback-driven) and type-answer
+    (text-driven) modes — the keyboard branches on ``mode``, the rendering
+    does not.
     """
-    return {
-        "first_num": problem.first_num,
-        "second_num": problem.second_num,
-        "operation": problem.operation,
-        "answer": problem.answer,
-        "formatted_text": problem.formatted_text,
-        "metadata": problem.metadata or {},
-    }
-
-
-def _spec_to_problem(spec: dict) -> Problem:
-    """Inverse of ``_problem_to_spec`` — rebuild a Problem from FSM-stored dict."""
-    return Problem(
-        first_num=int(spec["first_num"]),
-        second_num=int(spec["second_num"]),
-        operation=spec["operation"],
-        answer=int(spec["answer"]),
-        formatted_text=spec.get("formatted_text"),
-        metadata=spec.get("metadata") or {},
-    )
-
+    async with session_state(state) as session:
+        await _render_problem(callback, session, feedback_prefix)
+    await state.set_state(TrainingStates.waiting_for_answer)
 
-def _problems_to_specs(problems: list[Problem]) -> list[dict]:
-    return [_problem_to_spec(p) for p in problems]
 
+async def _render_problem(
+    target: CallbackQuery | Message,
+    session: SessionState,
+    feedback_prefix: str | None = None,
+    *,
+    answer_write: Callable[[], Awaitable[None]] | None = None,
+) -> None:
+    """Persist shown_at for ``session.idx`` and draw it into the anchor.
+
+    The shown_at insert (and the previous turn's ``answer_write``, if any)
+    run concurrently with the anchor edit. They are shielded and always
+    awaited: a failed edit or a cancelled handler doesn't cancel them, so an
+    answer that got this far is persisted either way. If the edit or any
+    write fails, the turn fails: the error is raised (a write error first)
+    and the shown row just inserted is deleted again. Mutates ``session`` in
+    memory only — the caller owns the FSM write.
+    """
+    problem = session.problems[session.idx]
+    session.problem_shown_at = datetime.now(timezone.utc).isoformat()
+
+    writes: list[Callable[[], Awaitable[Any]]] = [
+        partial(
+            record_problem_shown,
+            session_id=int(session.session_id),
+            first_number=problem.first_num,
+            second_number=problem.second_num,
+            operation=problem.operation,
+            correct_answer=problem.answer,
+            metadata=_problem_metadata_for_persist(problem),
+        )
+    ]
+    if answer_write is not None:
+        writes.append(answer_write)
 
-def _specs_to_problems(specs: list[dict]) -> list[Problem]:
-    return [_spec_to_problem(s) for s in specs]
+    persisted = asyncio.ensure_future(_settle_writes(writes))
+    try:
+        text = _problem_anchor_text(session, problem, feedback_prefix)
+        await _edit_session_anchor(target, session, text, _problem_keyboard(session, problem))
+    except BaseException:
+        await _discard_shown_row(await asyncio.shield(persisted))
+        raise
+    results = await asyncio.shield(persisted)
+    failed = [r for r in results if isinstance(r, BaseException)]
+    if failed:
+        await _discard_shown_row(results)
+        # Surface the DB error itself to the error middleware.
+        raise failed[0]
+    session.current_problem_id = results[0]
+
+
+def _problem_keyboard(session: SessionState, problem: Problem):
+    if TrainingMode(session.mode) == TrainingMode.CHOOSE_ANSWER:
+        return InlineKeyboards.training_type_controls(session.lang)
+    cfg = DIFFICULTY_CONFIG[Difficulty(session.difficulty)]
+    variants = ProblemGenerator.generate_variants(problem.answer, int(cfg["variants_count"]))
+    return InlineKeyboards.training_answer_variants(variants, session.idx, session.lang)
+
+
+async def _settle_writes(writes: list[Callable[[], Awaitable[Any]]]) -> list[Any]:
+    """Run every write to completion; results (or exceptions) in order.
+
+    Not a TaskGroup on purpose: one failed write must not cancel an insert
+    mid-commit and leave us unsure whether its row exists.
+    """
+    return await asyncio.gather(*(write() for write in writes), return_exceptions=True)
 
 
-async def show_problem(
-    callback: CallbackQuery, state: FSMContext, feedback_prefix: str | None = None
-) -> None:
-    """Render the current problem into the anchor message.
+async def _discard_shown_row(results: list[Any]) -> None:
+    shown_id = results[0]
+    if isinstance(shown_id, BaseException):
+        return
+    try:
+        await discard_problem_shown(shown_id)
+    except Exception:
+        logger.warning("Could not delete orphan problem row %s", shown_id, exc_info=True)
 
-    Works for both choose-answer (callback-driven) and type-answer (text-driven)
-    modes — the keyboard branches on ``mode``, the rendering does not.
-    """
-    data = await state.get_data()
-    problems = _specs_to_problems(data["problems"])
-    idx = int(data["idx"])
-    lang = data.get("lang", "ru")
-    mode = TrainingMode(data["mode"])
-    difficulty = Difficulty(data["difficulty"])
-    session_id = int(data["session_id"])
 
-    problem = problems[idx]
+async def _restore_anchor(target: CallbackQuery | Message, session: SessionState) -> None:
+    """Best effort: redraw ``session``'s current problem after a failed turn.
 
-    problem_id = await record_problem_shown(
-        session_id=session_id,
-        first_number=problem.first_num,
-        second_number=problem.second_num,
-        operation=problem.operation,
-        correct_answer=problem.answer,
-        metadata=_problem_metadata_for_persist(problem),
-    )
+    The FSM isn't advanced when a turn fails, so the screen must not be
+    either — otherwise the next answer is graded against a problem the user
+    never saw.
+    """
+    problem = session.problems[session.idx]
+    try:
+        await _edit_session_anchor(
+            target,
+            session,
+            _problem_anchor_text(session, problem, None),
+            _problem_keyboard(session, problem),
+        )
+    except Exception:
+        logger.warning(
+            "Could not restore the anchor of session %s", session.session_id, exc_info=True
+        )
 
-    shown_at = datetime.now(timezone.utc)
-    await state.update_data(
-        current_problem_id=problem_id,
-        problem_shown_at=shown_at.isoformat(),
-    )
 
-    text = format_problem_anchor(
+def _problem_anchor_text(
+    session: SessionState, problem: Problem, feedback_prefix: str | None
+) -> str:
+    return format_problem_anchor(
         expression=problem.formatted_text,
-        current=idx + 1,
-        total=len(problems),
-        lang=lang,
-        streak=int(data.get("session_streak", 0)),
-        last_time_s=data.get("last_time_s"),
+        current=session.idx + 1,
+        total=session.total,
+        lang=session.lang,
+        streak=session.session_streak,
+        last_time_s=session.last_time_s,
         feedback_prefix=feedback_prefix,
-        session_kind=data.get("session_kind", "normal"),
+        session_kind=session.session_kind,
     )
 
-    if mode == TrainingMode.CHOOSE_ANSWER:
-        keyboard = InlineKeyboards.training_type_controls(lang)
-    else:
-        cfg = DIFFICULTY_CONFIG[difficulty]
-        variants = ProblemGenerator.generate_variants(problem.answer, int(cfg["variants_count"]))
-        keyboard = InlineKeyboards.training_answer_variants(variants, idx, lang)
-
-    await state.set_state(TrainingStates.waiting_for_answer)
-    await safe_edit(callback, text, keyboard)
-
 
-async def _edit_anchor_from_state(
-    bot, state: FSMContext, text: str, reply_markup
+async def _edit_session_anchor(
+    target: CallbackQuery | Message, session: SessionState, text: str, reply_markup
 ) -> None:
-    """Edit the tracked anchor message by stored chat_id + message_id."""
-    data = await state.get_data()
+    """Callbacks edit their own message; typed answers edit the stored anchor."""
+    if isinstance(target, CallbackQuery):
+        await safe_edit(target, text, reply_markup)
+        return
     await edit_anchor(
-        bot,
-        chat_id=int(data["anchor_chat_id"]),
-        message_id=int(data["anchor_message_id"]),
+        target.bot,
+        chat_id=int(session.anchor_chat_id),
+        message_id=int(session.anchor_message_id),
         text=text,
         reply_markup=reply_markup,
     )
 
 
-async def _compute_last_time_s(state: FSMContext) -> float | None:
-    data = await state.get_data()
-    shown_iso = data.get("problem_shown_at")
+def _elapsed_since(shown_iso: str | None) -> float | None:
     if not shown_iso:
         return None
     try:
@@ -384,44 +431,38 @@ async def handle_answer(
     callback: CallbackQuery, callback_data: TrainingCB, state: FSMContext
 ) -> None:
     user_answer = callback_data.answer
-    await _record_and_advance(callback, state, user_answer=user_answer, skipped=False)
+    await _record_and_advance(
+        callback, state, user_answer=user_answer, skipped=False, shown_idx=callback_data.idx
+    )
     await callback.answer()
 
 
 @router.message(TrainingStates.waiting_for_answer, F.text)
 async def handle_typed_answer(message: Message, state: FSMContext) -> None:
-    data = await state.get_data()
-    if data.get("mode") != TrainingMode.CHOOSE_ANSWER.value:
-        return  # Other modes use the inline buttons exclusively.
-
-    lang = data.get("lang", "ru")
-    raw = (message.text or "").strip()
-
-    # Always best-effort drop the user message so the chat stays clean.
-    await delete_user_message(message)
-
-    try:
-        user_answer = int(raw)
-    except (ValueError, AttributeError):
-        # Re-render the anchor with an inline warning under the expression.
-        problems = _specs_to_problems(data["problems"])
-        idx = int(data["idx"])
-        text = format_problem_anchor(
-            expression=problems[idx].formatted_text,
-            current=idx + 1,
-            total=len(problems),
-            lang=lang,
-            streak=int(data.get("session_streak", 0)),
-            last_time_s=data.get("last_time_s"),
-            feedback_prefix=get_text("training_type_answer_invalid", lang),
-            session_kind=data.get("session_kind", "normal"),
-        )
-        await _edit_anchor_from_state(
-            message.bot, state, text, InlineKeyboards.training_type_controls(lang)
-        )
-        return
+    async with session_state(state) as session:
+        if session.mode != TrainingMode.CHOOSE_ANSWER.value:
+            return  # Other modes use the inline buttons exclusively.
+
+        lang = session.lang
+        raw = (message.text or "").strip()
+
+        # Always best-effort drop the user message so the chat stays clean.
+        await delete_user_message(message)
+
+        try:
+            user_answer = int(raw)
+        except (ValueError, AttributeError):
+            # Re-render the anchor with an inline warning under the expression.
+            problem = session.problems[session.idx]
+            text = _problem_anchor_text(
+                session, problem, get_text("training_type_answer_invalid", lang)
+            )
+            await _edit_session_anchor(
+                message, session, text, InlineKeyboards.training_type_controls(lang)
+            )
+            return
 
-    await _record_and_advance(message, state, user_answer=user_answer, skipped=False)
+        await _advance(message, state, session, user_answer=user_answer, skipped=False)
 
 
 @router.callback_query(
@@ -459,36 +500,73 @@ async def _record_and_advance(
     *,
     user_answer: int | None,
     skipped: bool,
+    shown_idx: int | None = None,
 ) -> None:
-    """Persist the answer, update FSM counters, render next problem or finish."""
-    data = await state.get_data()
-    problems_data = data["problems"]
-    idx_now = int(data["idx"])
-    correct_answer = int(problems_data[idx_now]["answer"])
-    is_correct = (not skipped) and user_answer == correct_answer
+    """Persist the answer, update FSM counters, render next problem or finish.
+
+    One FSM read and (at most) one FSM write per turn: everything in between
+    works on the in-memory ``SessionState``. ``shown_idx`` is the problem the
+    tapped keyboard was drawn for: a tap on an already answered problem (a
+    double tap, queued behind the first by the per-chat scheduler) is
+    dropped instead of being graded against the next one.
+    """
+    async with session_state(state) as session:
+        if shown_idx is not None and shown_idx != session.idx:
+            return
+        await _advance(target, state, session, user_answer=user_answer, skipped=skipped)
 
-    problem_id = data.get("current_problem_id")
-    if problem_id:
-        await record_problem_answered(int(problem_id), user_answer=user_answer, is_correct=is_correct)
 
-    last_time_s = await _compute_last_time_s(state)
-    correct = int(data["correct"]) + (1 if is_correct else 0)
-    incorrect = int(data["incorrect"]) + (0 if is_correct else 1)
-    session_streak = int(data.get("session_streak", 0))
-    session_streak = session_streak + 1 if is_correct else 0
+async def _advance(
+    target: CallbackQuery | Message,
+    state: FSMContext,
+    session: SessionState,
+    *,
+    user_answer: int | None,
+    skipped: bool,
+) -> None:
+    with TURN_LATENCY.measure():
+        await _advance_turn(target, state, session, user_answer=user_answer, skipped=skipped)
 
-    next_idx = idx_now + 1
-    has_next = next_idx < len(problems_data)
-    lang = data.get("lang", "ru")
 
-    await state.update_data(
-        correct=correct,
-        incorrect=incorrect,
-        session_streak=session_streak,
-        last_time_s=last_time_s,
-        idx=next_idx if has_next else idx_now,
+async def _advance_turn(
+    target: CallbackQuery | Message,
+    state: FSMContext,
+    session: SessionState,
+    *,
+    user_answer: int | None,
+    skipped: bool,
+) -> None:
+    idx_now = session.idx
+    correct_answer = session.problems[idx_now].answer
+    is_correct = (not skipped) and user_answer == correct_answer
+    before = replace(session)
+
+    answer_write = (
+        partial(
+            record_problem_answered,
+            session.current_problem_id,
+            user_answer=user_answer,
+            is_correct=is_correct,
+        )
+        if session.current_problem_id
+        else None
     )
 
+    session.last_time_s = _elapsed_since(session.problem_shown_at)
+    if session.last_time_s is not None:
+        _record_answer_time(session, idx_now, round(session.last_time_s, 3))
+    if is_correct:
+        session.correct += 1
+        session.session_streak += 1
+    else:
+        session.incorrect += 1
+        session.session_streak = 0
+        session.mistake_mask |= 1 << idx_now
+
+    next_idx = idx_now + 1
+    has_next = next_idx < session.total
+    lang = session.lang
+
     # Note: deliberately don't reveal the correct answer on wrong/skipped — both
     # paths feed into "Retry mistakes", and showing the answer would make retry
     # trivial. Users learn by retrying, not by being told.
@@ -500,115 +578,83 @@ async def _record_and_advance(
         feedback_prefix = get_text("training_incorrect_short", lang)
 
     if has_next:
-        await _show_next_problem(target, state, feedback_prefix)
-    else:
-        await finish_training(target, state, feedback_prefix)
-
-
-async def _show_next_problem(
-    target: CallbackQuery | Message, state: FSMContext, feedback_prefix: str
-) -> None:
-    """Render the next problem into the anchor regardless of caller shape."""
-    if isinstance(target, CallbackQuery):
-        await show_problem(target, state, feedback_prefix=feedback_prefix)
-        return
-
-    # Message path (typed answer): build text+kb, then edit the stored anchor.
-    data = await state.get_data()
-    problems = _specs_to_problems(data["problems"])
-    idx = int(data["idx"])
-    lang = data.get("lang", "ru")
-    difficulty = Difficulty(data["difficulty"])
-    mode = TrainingMode(data["mode"])
-    session_id = int(data["session_id"])
-
-    problem = problems[idx]
-    problem_id = await record_problem_shown(
-        session_id=session_id,
-        first_number=problem.first_num,
-        second_number=problem.second_num,
-        operation=problem.operation,
-        correct_answer=problem.answer,
-        metadata=_problem_metadata_for_persist(problem),
-    )
-    shown_at = datetime.now(timezone.utc)
-    await state.update_data(
-        current_problem_id=problem_id,
-        problem_shown_at=shown_at.isoformat(),
-    )
-
-    text = format_problem_anchor(
-        expression=problem.formatted_text,
-        current=idx + 1,
-        total=len(problems),
-        lang=lang,
-        streak=int(data.get("session_streak", 0)),
-        last_time_s=data.get("last_time_s"),
-        feedback_prefix=feedback_prefix,
-        session_kind=data.get("session_kind", "normal"),
-    )
-
-    if mode == TrainingMode.CHOOSE_ANSWER:
-        keyboard = InlineKeyboards.training_type_controls(lang)
+        # Already in waiting_for_answer (the handlers filter on it), so no
+        # set_state round trip here.
+        session.idx = next_idx
+        try:
+            await _render_problem(target, session, feedback_prefix, answer_write=answer_write)
+        except BaseException:
+            await _restore_anchor(target, before)
+            raise
     else:
-        cfg = DIFFICULTY_CONFIG[difficulty]
-        variants = ProblemGenerator.generate_variants(problem.answer, int(cfg["variants_count"]))
-        keyboard = InlineKeyboards.training_answer_variants(variants, idx, lang)
-
-    await state.set_state(TrainingStates.waiting_for_answer)
-    await _edit_anchor_from_state(target.bot, state, text, keyboard)
+        # The session summary reads every answered_at: persist first.
+        if answer_write is not None:
+            await answer_write()
+        await finish_training(target, state, feedback_prefix, session=session)
 
 
 async def finish_training(
     target: CallbackQuery | Message,
     state: FSMContext,
     feedback_prefix: str | None = None,
+    session: SessionState | None = None,
 ) -> None:
-    data = await state.get_data()
-    lang = data.get("lang", "ru")
-    session_id = int(data["session_id"])
-    correct = int(data["correct"])
-    incorrect = int(data["incorrect"])
-    total = correct + incorrect
-    session_kind = data.get("session_kind", "normal")
+    """Close the session and draw the result screen.
 
-    await complete_training_session(
-        session_id=session_id,
-        correct=correct,
-        incorrect=incorrect,
-    )
+    Called mid-turn with the caller's in-memory ``session`` (which the caller
+    writes back); standalone callers get their own load/write.
+    """
+    if session is None:
+        async with session_state(state) as loaded:
+            await finish_training(target, state, feedback_prefix, loaded)
+        return
 
-    if session_kind == "daily":
-        daily_attempt_id = data.get("daily_attempt_id")
-        session_started_iso = data.get("session_started_at")
-        total_time_ms = 0
-        if session_started_iso:
+    lang = session.lang
+    session_id = int(session.session_id)
+    correct = session.correct
+    incorrect = session.incorrect
+    total = correct + incorrect
+    session_kind = session.session_kind
+
+    daily_attempt_id = None
+    total_time_ms = 0
+    if session_kind == "daily" and session.daily_attempt_id:
+        daily_attempt_id = session.daily_attempt_id
+        if session.session_started_at:
             try:
-                started = datetime.fromisoformat(session_started_iso)
+                started = datetime.fromisoformat(session.session_started_at)
                 total_time_ms = int(
                     (datetime.now(timezone.utc) - started).total_seconds() * 1000
                 )
             except ValueError:
                 pass
-        if daily_attempt_id:
-            await complete_daily_attempt(
-                attempt_id=int(daily_attempt_id),
-                correct=correct,
-                incorrect=incorrect,
-                total_time_ms=total_time_ms,
-            )
 
-    avg_time = await _session_avg_time(session_id)
-    # complete_training_session above already mutated user.current_streak; re-read
-    # so the result screen reflects the user's actual day-streak after this run.
-    user_after = await get_user(target.from_user.id)
-    current_streak = int(getattr(user_after, "current_streak", 0) or 0)
+    # Session, user counters and daily attempt land in one transaction.
+    summary = await finalize_session(
+        session_id,
+        correct,
+        incorrect,
+        daily_attempt_id=daily_attempt_id,
+        total_time_ms=total_time_ms,
+    )
+    current_streak = summary.current_streak
+
+    # Both come from the session's running aggregates: no DB reads for them.
+    avg_time = (
+        session.answer_time_sum / session.timed_answers if session.timed_answers else None
+    )
+    slowest = (
+        [(session.problems[int(i)].formatted_text, t) for i, t in session.slowest]
+        if session.timed_answers >= SLOWEST_MIN_ANSWERS and session.problems is not None
+        else []
+    )
     body = format_session_result(
         correct=correct,
         total=total,
         avg_time_s=avg_time,
         current_streak=current_streak,
         lang=lang,
+        slowest=slowest,
     )
     if feedback_prefix:
         body = feedback_prefix + "\n\n" + body
@@ -618,43 +664,61 @@ async def finish_training(
         has_mistakes=has_mistakes, lang=lang, session_kind=session_kind
     )
 
-    if isinstance(target, CallbackQuery):
-        await safe_edit(target, body, keyboard)
-    else:
-        await _edit_anchor_from_state(target.bot, state, body, keyboard)
+    await _edit_session_anchor(target, session, body, keyboard)
 
-    # Preserve session_id / session_kind for retry; clear the rest.
+    # Preserve session_id / session_kind and the packed mistakes for retry;
+    # clear the rest.
     await state.set_state(TrainingStates.viewing_results)
-    await state.update_data(
-        problems=None,
-        idx=0,
-        correct=0,
-        incorrect=0,
-        session_streak=0,
-        current_problem_id=None,
-        problem_shown_at=None,
+    session.retry_problems = _packed_mistakes(session)
+    session.problems = None
+    session.idx = 0
+    session.correct = 0
+    session.incorrect = 0
+    session.session_streak = 0
+    session.current_problem_id = None
+    session.problem_shown_at = None
+    session.answer_time_sum = 0.0
+    session.timed_answers = 0
+    session.slowest = []
+    session.mistake_mask = 0
+
+
+# The breakdown needs something to compare: hide it for 1-2 problem retries.
+SLOWEST_MIN_ANSWERS = 3
+SLOWEST_SHOWN = 3
+
+
+def _record_answer_time(session: SessionState, idx: int, seconds: float) -> None:
+    """Fold one answer into the running sum/count and the top-``SLOWEST_SHOWN``."""
+    session.answer_time_sum += seconds
+    session.timed_answers += 1
+    # A new list, not an in-place insert: callers may hold a pre-turn copy.
+    session.slowest = heapq.nlargest(
+        SLOWEST_SHOWN, [*session.slowest, [idx, seconds]], key=lambda item: item[1]
     )
 
 
-async def _session_avg_time(session_id: int) -> float | None:
-    """Average seconds per answered problem within this session."""
-    from app.database.db import async_session_maker
-    from app.database.models import Problem
-    from sqlalchemy import func, select
-
-    async with async_session_maker() as session:
-        delta = func.extract("epoch", Problem.answered_at - Problem.shown_at)
-        stmt = (
-            select(func.avg(delta))
-            .where(
-                Problem.session_id == session_id,
-                Problem.shown_at.is_not(None),
-                Problem.answered_at.is_not(None),
-            )
-        )
-        result = await session.execute(stmt)
-        value = result.scalar()
-        return float(value) if value is not None else None
+def _packed_mistakes(session: SessionState) -> str | None:
+    """The session's wrong problems, packed from ``mistake_mask``.
+
+    None when the mask doesn't account for every mistake (a session that
+    began before the mask was kept): retry then reads the problems table.
+    """
+    mask = session.mistake_mask
+    if session.problems is None or mask.bit_count() != session.incorrect:
+        return None
+    return ProblemSet.from_problems(
+        session.problems[i] for i in range(session.total) if mask >> i & 1
+    ).blob
+
+
+def _problems_from_rows(rows) -> ProblemSet:
+    """Display fields are derived from the op (see make_problem), so the
+    stored metadata_json isn't needed to rebuild them."""
+    return ProblemSet.from_problems(
+        make_problem(row.first_number, row.second_number, row.operation, row.correct_answer)
+        for row in rows
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -668,50 +732,44 @@ async def _session_avg_time(session_id: int) -> float | None:
 async def retry_mistakes_handler(
     callback: CallbackQuery, callback_data: TrainingCB, state: FSMContext
 ) -> None:
-    data = await state.get_data()
-    lang = data.get("lang", "ru")
-    original_session_id = int(data["session_id"])
-    original_mode = data.get("mode", TrainingMode.MIXED.value)
-    original_difficulty = data.get("difficulty", Difficulty.EASY.value)
-
-    mistake_rows = await get_session_mistakes(original_session_id)
-    if not mistake_rows:
-        await callback.answer(get_text("training_no_mistakes", lang), show_alert=True)
-        return
-
-    rebuilt: list[Problem] = []
-    for row in mistake_rows:
-        metadata = json.loads(row.metadata_json) if row.metadata_json else {}
-        rebuilt.append(
-            Problem(
-                first_num=row.first_number,
-                second_num=row.second_number,
-                operation=row.operation,
-                answer=row.correct_answer,
-                formatted_text=metadata.get("formatted_text"),
-                metadata=metadata,
-            )
+    async with session_state(state) as session:
+        lang = session.lang
+        original_session_id = int(session.session_id)
+        original_mode = session.mode or TrainingMode.MIXED.value
+        original_difficulty = session.difficulty or Difficulty.EASY.value
+
+        if session.retry_problems is not None:
+            rebuilt = ProblemSet(session.retry_problems)
+        else:
+            # The FSM didn't hold the mistakes at finish: read them back.
+            rebuilt = _problems_from_rows(await get_session_mistakes(original_session_id))
+        if not rebuilt:
+            await callback.answer(get_text("training_no_mistakes", lang), show_alert=True)
+            return
+
+        new_session = await create_training_session(
+            telegram_id=callback.from_user.id,
+            difficulty=original_difficulty,
+            mode=original_mode,
+            total_problems=len(rebuilt),
         )
 
-    new_session = await create_training_session(
-        telegram_id=callback.from_user.id,
-        difficulty=original_difficulty,
-        mode=original_mode,
-        total_problems=len(rebuilt),
-    )
+        session.session_id = new_session.id
+        session.problems = rebuilt
+        session.idx = 0
+        session.correct = 0
+        session.incorrect = 0
+        session.session_streak = 0
+        session.last_time_s = None
+        session.answer_time_sum = 0.0
+        session.timed_answers = 0
+        session.slowest = []
+        session.mistake_mask = 0
+        session.retry_problems = None
+        session.current_problem_id = None
+        session.problem_shown_at = None
+        session.session_kind = "retry"
+        await _render_problem(callback, session)
 
     await state.set_state(TrainingStates.waiting_for_answer)
-    await state.update_data(
-        session_id=new_session.id,
-        problems=_problems_to_specs(rebuilt),
-        idx=0,
-        correct=0,
-        incorrect=0,
-        session_streak=0,
-        last_time_s=None,
-        current_problem_id=None,
-        problem_shown_at=None,
-        session_kind="retry",
-    )
-    await show_problem(callback, state)
     await callback.answer()
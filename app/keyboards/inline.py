@@ -2,10 +2,18 @@
 
 Keyboards here are pure builders — no I/O, no state. Handlers feed in the
 state-dependent parameters (lang, daily_done flag, pagination offsets).
+
+Builders whose output depends only on ``lang`` (and ``expanded``) are wrapped
+in ``@_static_keyboard``: built once per argument set, then served from an LRU
+cache as a read-only markup (``FrozenInlineKeyboardMarkup``) — every handler
+shares the same instance, so none may mutate it.
 """
 from __future__ import annotations
 
+import functools
+
 from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
+from pydantic import ConfigDict
 
 from app.keyboards.callbacks import (
     AdminCB,
@@ -42,6 +50,51 @@ _MODE_SECONDARY: tuple[TrainingMode, ...] = (
     TrainingMode.SQRT_ONLY,
 )
 
+
+class _ReadOnlyList(list):
+    """A list that refuses in-place changes (still a ``list`` for aiogram/pydantic)."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("cached keyboard is shared and read-only; build a new markup")
+
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+
+
+class FrozenInlineKeyboardButton(InlineKeyboardButton):
+    model_config = ConfigDict(frozen=True)
+
+
+class FrozenInlineKeyboardMarkup(InlineKeyboardMarkup):
+    model_config = ConfigDict(frozen=True)
+
+
+def freeze_markup(markup: InlineKeyboardMarkup) -> FrozenInlineKeyboardMarkup:
+    rows = _ReadOnlyList(
+        _ReadOnlyList(
+            FrozenInlineKeyboardButton(**button.model_dump(exclude_none=True))
+            for button in row
+        )
+        for row in markup.inline_keyboard
+    )
+    # model_construct keeps the read-only lists (validation would copy them
+    # into plain ones).
+    return FrozenInlineKeyboardMarkup.model_construct(inline_keyboard=rows)
+
+
+def _static_keyboard(builder):
+    """Memoize a builder whose output depends only on its (hashable) args."""
+
+    @functools.lru_cache(maxsize=64)
+    @functools.wraps(builder)
+    def cached(*args, **kwargs) -> FrozenInlineKeyboardMarkup:
+        return freeze_markup(builder(*args, **kwargs))
+
+    return cached
+
+
 _MODE_LABEL_KEYS: dict[TrainingMode, str] = {
     TrainingMode.CHOOSE_ANSWER: "mode_choose",
     TrainingMode.MULTIPLICATION_ONLY: "mode_mult",
@@ -165,6 +218,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=rows)
 
     @staticmethod
+    @_static_keyboard
     def admin_main_menu(lang: str = "ru") -> InlineKeyboardMarkup:
         return InlineKeyboardMarkup(
             inline_keyboard=[
@@ -233,6 +287,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=buttons)
 
     @staticmethod
+    @_static_keyboard
     def difficulty_selection(lang: str = "ru") -> InlineKeyboardMarkup:
         keys = {
             Difficulty.EASY: "difficulty_easy",
@@ -259,6 +314,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=buttons)
 
     @staticmethod
+    @_static_keyboard
     def mode_selection(lang: str = "ru", expanded: bool = False) -> InlineKeyboardMarkup:
         """Two-level mode picker.
 
@@ -480,6 +536,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=rows)
 
     @staticmethod
+    @_static_keyboard
     def training_type_controls(lang: str = "ru") -> InlineKeyboardMarkup:
         """Single skip + exit row for typed-answer mode."""
         return InlineKeyboardMarkup(
@@ -545,6 +602,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=buttons)
 
     @staticmethod
+    @_static_keyboard
     def daily_already_done(lang: str = "ru") -> InlineKeyboardMarkup:
         return InlineKeyboardMarkup(
             inline_keyboard=[
@@ -564,6 +622,7 @@ class InlineKeyboards:
         )
 
     @staticmethod
+    @_static_keyboard
     def notification_preset_selection(lang: str = "ru") -> InlineKeyboardMarkup:
         preset_keys = {
             NotificationPreset.MORNING: "notify_preset_morning",
@@ -593,6 +652,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=buttons)
 
     @staticmethod
+    @_static_keyboard
     def cancel_custom_time(lang: str = "ru") -> InlineKeyboardMarkup:
         return InlineKeyboardMarkup(
             inline_keyboard=[
@@ -606,6 +666,7 @@ class InlineKeyboards:
         )
 
     @staticmethod
+    @_static_keyboard
     def tips_menu(lang: str = "ru") -> InlineKeyboardMarkup:
         return InlineKeyboardMarkup(
             inline_keyboard=[
@@ -677,6 +738,7 @@ class InlineKeyboards:
         return InlineKeyboardMarkup(inline_keyboard=rows)
 
     @staticmethod
+    @_static_keyboard
     def back_only(lang: str = "ru") -> InlineKeyboardMarkup:
         """Bare 'back to menu' keyboard — no privacy toggle (for non-profile screens)."""
         return InlineKeyboardMarkup(
@@ -1,19 +1,150 @@
-"""i18n: get message by key and language."""
+"""i18n: get message by key and language.
+
+The catalog is compiled once at import:
+
+- every language gets a fully resolved ``{key: text}`` map with the
+  default-language fallback already applied, so ``get_text`` is two dict
+  lookups;
+- every text is preparsed into a ``TextTemplate``. Texts with plain
+  ``{name}`` fields are compiled into a small function returning an
+  f-string, so rendering no longer re-parses the ``str.format`` string on
+  each call; texts with format specs or conversions keep ``format_map``.
+
+The same pass validates the catalog: a key present in several languages must
+use the same placeholders everywhere, otherwise a ``KeyError`` would surface
+only when a user of the other language hits that screen. A mismatch fails the
+import (and so the bot start) with ``LocaleCatalogError``.
+"""
+from __future__ import annotations
+
+from keyword import iskeyword
+from string import Formatter
+from typing import Any, Callable, Mapping
+
 from app.locales.ru import TEXTS as RU
 from app.locales.en import TEXTS as EN
 
 LOCALES = {"ru": RU, "en": EN}
 DEFAULT_LANG = "ru"
 
+_FORMATTER = Formatter()
+
+
+def _is_plain_name(name: str) -> bool:
+    return name.isidentifier() and not iskeyword(name) and not name.startswith("_")
+
+
+def _compile_renderer(fields: frozenset[str], pieces: list[str]) -> Callable[..., str]:
+    """Keyword-only function returning one f-string — the fastest way CPython
+    has to splice values into text. Extra keywords are ignored like
+    ``str.format`` does; a missing one raises ``TypeError``.
+    """
+    params = ", ".join(sorted(fields))
+    source = f"def render(*, {params}, **_unused):\n    return {' '.join(pieces)}\n"
+    namespace: dict[str, Any] = {}
+    exec(compile(source, "<locale template>", "exec"), namespace)
+    return namespace["render"]
+
+
+class LocaleCatalogError(ValueError):
+    """Locale texts are malformed or disagree on placeholders."""
+
+
+class TextTemplate:
+    """A localized text parsed once; ``format`` mirrors ``str.format(**values)``."""
+
+    __slots__ = ("text", "fields", "format")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        pieces: list[str] = []
+        fields: list[str] = []
+        simple = True
+        for literal, name, spec, conversion in _FORMATTER.parse(text):
+            if literal:
+                escaped = literal.replace("{", "{{").replace("}", "}}")
+                pieces.append("f" + repr(escaped))
+            if name is None:
+                continue
+            fields.append(name)
+            if spec or conversion or not _is_plain_name(name):
+                simple = False
+            pieces.append(f"f'{{{name}}}'")
+        self.fields = frozenset(fields)
+        if not fields:
+            self.format = self._literal
+        elif simple:
+            self.format = _compile_renderer(self.fields, pieces)
+        else:
+            self.format = self._format_map
+
+    def _literal(self, **values: Any) -> str:
+        return self.text
+
+    def _format_map(self, **values: Any) -> str:
+        return self.text.format_map(values)
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __repr__(self) -> str:
+        return f"TextTemplate({self.text!r})"
+
+
+def validate_catalog(locales: Mapping[str, Mapping[str, str]]) -> list[str]:
+    """Describe every placeholder mismatch / unparsable text; empty when clean."""
+    problems: list[str] = []
+    fields: dict[str, dict[str, frozenset[str]]] = {}
+    for lang, texts in locales.items():
+        for key, text in texts.items():
+            try:
+                fields.setdefault(key, {})[lang] = TextTemplate(text).fields
+            except ValueError as exc:
+                problems.append(f"{lang}:{key}: {exc}")
+    for key, per_lang in fields.items():
+        if len(set(per_lang.values())) > 1:
+            listed = ", ".join(
+                f"{lang}={sorted(names)}" for lang, names in sorted(per_lang.items())
+            )
+            problems.append(f"{key}: placeholders differ ({listed})")
+    return problems
+
+
+def _compile(
+    locales: Mapping[str, Mapping[str, str]],
+) -> tuple[dict[str, dict[str, str]], dict[str, dict[str, TextTemplate]]]:
+    problems = validate_catalog(locales)
+    if problems:
+        raise LocaleCatalogError("locale catalog is invalid:\n  " + "\n  ".join(problems))
+    default = locales[DEFAULT_LANG]
+    texts = {lang: {**default, **own} for lang, own in locales.items()}
+    # Languages share one TextTemplate per distinct string (the fallbacks).
+    parsed: dict[str, TextTemplate] = {}
+
+    def parse(text: str) -> TextTemplate:
+        template = parsed.get(text)
+        if template is None:
+            template = parsed[text] = TextTemplate(text)
+        return template
+
+    templates = {
+        lang: {key: parse(text) for key, text in resolved.items()}
+        for lang, resolved in texts.items()
+    }
+    return texts, templates
+
+
+_TEXTS, _TEMPLATES = _compile(LOCALES)
+
 
 def get_text(key: str, lang: str | None = None) -> str:
     """Return localized string for key. Falls back to default language if key missing."""
-    lang = lang or DEFAULT_LANG
-    if lang not in LOCALES:
-        lang = DEFAULT_LANG
-    texts = LOCALES[lang]
-    if key in texts:
-        return texts[key]
-    return LOCALES[DEFAULT_LANG].get(key, key)
+    return _TEXTS.get(lang or DEFAULT_LANG, _TEXTS[DEFAULT_LANG]).get(key, key)
+
+
+def get_template(key: str, lang: str | None = None) -> TextTemplate:
+    """Preparsed template for key (same fallbacks as ``get_text``)."""
+    template = _TEMPLATES.get(lang or DEFAULT_LANG, _TEMPLATES[DEFAULT_LANG]).get(key)
+    return template if template is not None else TextTemplate(key)
 
 # ToDO: Разделение локализации на файлы по модулям. (common.py, start.py, ...)
@@ -68,6 +68,8 @@ TEXTS = {
         "✅ {correct} / {total}    🎯 {acc}%\n"
         "⏱ {avg_time} avg        🔥 {streak} d"
     ),
+    "training_result_slowest": "\n\n🐢 **Slowest:**",
+    "training_result_slowest_row": "\n`{expression}` — {time}",
     "training_no_mistakes": "No mistakes — nothing to retry!",
     "training_abort": "❌ Training cancelled.",
     "btn_skip": "⏭ Skip",
@@ -190,14 +192,16 @@ TEXTS = {
         "📊 **Stats**\n"
         "────────────────\n"
         "🖥 CPU: `{cpu}%` · RAM: `{ram_pct}%` ({ram_used}/{ram_total} GB)\n"
-        "👥 Users: `{total}` · today: `{new_today}` · week: `{new_week}`"
+        "👥 Users: `{total}` · today: `{new_today}` · week: `{new_week}`\n"
+        "⏳ Update queue: `{queue}` · in flight: `{in_flight}`\n"
+        "⚡ Training turn: p50 `{turn_p50}` ms · p95 `{turn_p95}` ms"
     ),
     "admin_users_empty": "No users yet.",
     "admin_users_header": "👥 **Users** (page {page})\n────────────────\n",
     "admin_users_no_username": "no username",
     "admin_backup_prompt": "⌨️ Enter password to download backup:",
     "admin_backup_creating": "🔄 Creating backup...",
-    "admin_backup_caption": "💾 Backup: {filename}",
+    "admin_backup_caption": "💾 Backup: {filename} ({part}/{total})\n🔐 SHA-256: {sha256}",
     "admin_backup_file_error": "❌ Failed to create backup file.",
     "admin_backup_critical_error": "❌ Critical error while creating the backup. See server logs for details.",
     "admin_backup_wrong_password": "❌ Wrong password.",
@@ -68,6 +68,8 @@ TEXTS = {
         "✅ {correct} / {total}    🎯 {acc}%\n"
         "⏱ {avg_time} ср.        🔥 {streak} дн"
     ),
+    "training_result_slowest": "\n\n🐢 **Дольше всего:**",
+    "training_result_slowest_row": "\n`{expression}` — {time}",
     "training_no_mistakes": "Ошибок не было — перерешивать нечего!",
     "training_abort": "❌ Тренировка прервана.",
     "btn_skip": "⏭ Пропустить",
@@ -190,14 +192,16 @@ TEXTS = {
         "📊 **Статистика**\n"
         "────────────────\n"
         "🖥 CPU: `{cpu}%` · RAM: `{ram_pct}%` ({ram_used}/{ram_total} GB)\n"
-        "👥 Юзеров: `{total}` · сегодня: `{new_today}` · неделя: `{new_week}`"
+        "👥 Юзеров: `{total}` · сегодня: `{new_today}` · неделя: `{new_week}`\n"
+        "⏳ Очередь апдейтов: `{queue}` · в работе: `{in_flight}`\n"
+        "⚡ Ход тренировки: p50 `{turn_p50}` ms · p95 `{turn_p95}` ms"
     ),
     "admin_users_empty": "Пользователей пока нет.",
     "admin_users_header": "👥 **Пользователи** (стр. {page})\n────────────────\n",
     "admin_users_no_username": "нет username",
     "admin_backup_prompt": "⌨️ Введите пароль для выгрузки бэкапа:",
     "admin_backup_creating": "🔄 Создаю бэкап...",
-    "admin_backup_caption": "💾 Бэкап: {filename}",
+    "admin_backup_caption": "💾 Бэкап: {filename} ({part}/{total})\n🔐 SHA-256: {sha256}",
     "admin_backup_file_error": "❌ Ошибка при создании файла бэкапа.",
     "admin_backup_critical_error": "❌ Критическая ошибка при создании бэкапа. Подробности в логах сервера.",
     "admin_backup_wrong_password": "❌ Неверный пароль.",
@@ -0,0 +1,119 @@
+"""Per-chat ordered, globally bounded update processing.
+
+Training handlers read-modify-write FSM data across several awaits
+(``get_data`` → DB calls → ``update_data``). With aiogram's default
+``handle_as_tasks=True`` two fast taps from the same user run concurrently
+and can interleave, corrupting ``idx``/``correct``. Processing every update
+serially would fix that but waste concurrency across unrelated users.
+
+``ChatUpdateScheduler`` plugs into aiogram's ``events_isolation`` hook, which
+``FSMContextMiddleware`` enters around every handler *before* the state is
+loaded:
+
+- updates from the same chat run one at a time, in arrival order
+  (``asyncio.Lock`` wakes waiters FIFO);
+- different chats run concurrently, capped by a global semaphore;
+- ``queue_depth`` / ``in_flight`` expose the backlog for the admin stats.
+
+Locks are reference-counted and dropped when the last waiter leaves, so the
+map doesn't grow with every chat the bot has ever seen (aiogram's own
+``SimpleEventIsolation`` keeps them forever).
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, Hashable
+
+from aiogram.fsm.storage.base import BaseEventIsolation, StorageKey
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 64
+# Log once each time the backlog crosses this depth — a sign the cap is too
+# low or a handler is stuck on a slow dependency.
+QUEUE_DEPTH_WARN_THRESHOLD = 100
+
+
+def _chat_key(key: StorageKey) -> Hashable:
+    """Serialize per chat (and forum thread), regardless of user or destiny."""
+    return key.bot_id, key.chat_id, key.thread_id, key.business_connection_id
+
+
+class ChatUpdateScheduler(BaseEventIsolation):
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+        self._refs: dict[Hashable, int] = {}
+        self._queued = 0
+        self._in_flight = 0
+        self._warned = False
+
+    @property
+    def queue_depth(self) -> int:
+        """Updates accepted but still waiting for their chat turn or a global slot."""
+        return self._queued
+
+    @property
+    def in_flight(self) -> int:
+        """Updates currently inside a handler."""
+        return self._in_flight
+
+    @property
+    def active_chats(self) -> int:
+        """Chats with at least one running or queued update."""
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def lock(self, key: StorageKey) -> AsyncGenerator[None, None]:
+        chat = _chat_key(key)
+        chat_lock = self._locks.get(chat)
+        if chat_lock is None:
+            chat_lock = self._locks[chat] = asyncio.Lock()
+        self._refs[chat] = self._refs.get(chat, 0) + 1
+        self._enqueue()
+        started = False
+        try:
+            # Chat lock first, then a global slot: a chat waiting on its own
+            # previous update must not hold one of the shared slots.
+            async with chat_lock:
+                async with self._slots:
+                    self._queued -= 1
+                    started = True
+                    self._in_flight += 1
+                    try:
+                        yield
+                    finally:
+                        self._in_flight -= 1
+        finally:
+            if not started:
+                self._queued -= 1  # cancelled while waiting
+            self._release_ref(chat)
+
+    def _enqueue(self) -> None:
+        self._queued += 1
+        if self._queued >= QUEUE_DEPTH_WARN_THRESHOLD:
+            if not self._warned:
+                self._warned = True
+                logger.warning(
+                    "Update queue depth %s (in flight %s, cap %s)",
+                    self._queued, self._in_flight, self.max_concurrency,
+                )
+        elif self._warned and self._queued < QUEUE_DEPTH_WARN_THRESHOLD // 2:
+            self._warned = False
+
+    def _release_ref(self, chat: Hashable) -> None:
+        remaining = self._refs[chat] - 1
+        if remaining:
+            self._refs[chat] = remaining
+        else:
+            del self._refs[chat]
+            del self._locks[chat]
+
+    async def close(self) -> None:
+        self._locks.clear()
+        self._refs.clear()
@@ -0,0 +1,159 @@
+"""Precomputed finite problem catalogs with O(1) no-repeat draws.
+
+Several operation spaces are tiny — ``sqrt`` easy has 11 possible problems,
+``power`` easy 9 — yet the scalar generators sample with replacement, so a
+session often shows the same ``√49`` twice. Where the space is small enough,
+every problem of an ``(operation, difficulty)`` is enumerated once at import
+into compact ``array('i')`` columns.
+
+A seeded session walks each catalog through an affine permutation
+``pos = (a * idx + b) mod n`` with ``gcd(a, n) == 1`` and ``a``/``b`` derived
+from the session seed. That is a shuffled index that needs no stored state:
+distinct problem indices map to distinct catalog entries (no repeats until a
+session outgrows the catalog), any single draw is uniform, and each draw is
+O(1).
+
+Only operations whose scalar draw is uniform over a product of independent
+ranges are catalogued (``add``, ``mul``, ``power``, ``sqrt``), so a uniform
+pick from the catalog has exactly the scalar distribution. ``sub`` folds
+``(x, y)`` into ``max/min`` and the divisions draw the quotient/remainder
+conditionally on the divisor; a flat catalog would reweight those, so they —
+and any space over ``CATALOG_MAX_SIZE`` — stay on the random path.
+"""
+from __future__ import annotations
+
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from itertools import product
+from typing import Iterator
+
+from app.utils.constants import DIFFICULTY_CONFIG, Difficulty, OPERATION_RANGES
+
+CATALOG_MAX_SIZE = 10_000
+
+_MASK64 = (1 << 64) - 1
+# Stable per-op salt so each op gets its own permutation (str hash() is
+# randomized per process, and sessions outlive processes).
+_OP_SALT = {"add": 1, "mul": 2, "power": 3, "sqrt": 4}
+
+
+@dataclass(frozen=True, slots=True)
+class Catalog:
+    operation: str
+    first: array
+    second: array
+    answer: array
+
+    def __len__(self) -> int:
+        return len(self.answer)
+
+    def entry(self, pos: int) -> tuple[int, int, str, int]:
+        return self.first[pos], self.second[pos], self.operation, self.answer[pos]
+
+    @property
+    def nbytes(self) -> int:
+        return sum(col.itemsize * len(col) for col in (self.first, self.second, self.answer))
+
+
+def _inclusive(lo: int, hi: int) -> range:
+    return range(int(lo), int(hi) + 1)
+
+
+def _spaces(difficulty: Difficulty) -> Iterator[tuple[str, str, list[range]]]:
+    """``(op key, op symbol, independent ranges)`` mirroring ``_generate_*``."""
+    add = OPERATION_RANGES["add"][difficulty]
+    yield "add", "+", [_inclusive(add["min"], add["max"])] * 2
+
+    cfg = DIFFICULTY_CONFIG[difficulty]
+    min_num = int(cfg.get("min_num", 2))
+    max_num = int(cfg.get("max_num", 100))
+    if cfg.get("mul_small_factor_max"):
+        mul = [_inclusive(min_num, max_num), _inclusive(2, cfg["mul_small_factor_max"])]
+    elif cfg.get("mul_max_factor"):
+        mul = [_inclusive(10, cfg["mul_max_factor"])] * 2
+    else:
+        mul = [_inclusive(min_num, max_num)] * 2
+    yield "mul", "×", mul
+
+    power = OPERATION_RANGES["power"][difficulty]
+    yield "power", "^", [_inclusive(power["base_min"], power["base_max"]), power["exponents"]]
+
+    sqrt = OPERATION_RANGES["sqrt"][difficulty]
+    yield "sqrt", "√", [_inclusive(sqrt["result_min"], sqrt["result_max"])]
+
+
+def _build(op: str, symbol: str, ranges: list) -> Catalog:
+    first, second, answer = array("i"), array("i"), array("i")
+    for combo in product(*ranges):
+        if op == "add":
+            a, b = combo
+            row = (a, b, a + b)
+        elif op == "mul":
+            a, b = combo
+            row = (a, b, a * b)
+        elif op == "power":
+            base, exponent = combo
+            row = (base, exponent, base ** exponent)
+        else:  # sqrt
+            (result,) = combo
+            row = (result * result, 0, result)
+        first.append(row[0])
+        second.append(row[1])
+        answer.append(row[2])
+    return Catalog(symbol, first, second, answer)
+
+
+def _build_all() -> tuple[dict[tuple[str, Difficulty], Catalog], dict]:
+    started = time.perf_counter()
+    catalogs: dict[tuple[str, Difficulty], Catalog] = {}
+    skipped: dict[str, int] = {}
+    for difficulty in Difficulty:
+        for op, symbol, ranges in _spaces(difficulty):
+            size = math.prod(len(r) for r in ranges)
+            if size > CATALOG_MAX_SIZE:
+                skipped[f"{op}/{difficulty.value}"] = size
+                continue
+            catalogs[(op, difficulty)] = _build(op, symbol, ranges)
+    stats = {
+        "build_ms": round((time.perf_counter() - started) * 1000, 2),
+        "sizes": {f"{op}/{d.value}": len(c) for (op, d), c in catalogs.items()},
+        "bytes": sum(c.nbytes for c in catalogs.values()),
+        "skipped": skipped,
+    }
+    return catalogs, stats
+
+
+CATALOGS, _STATS = _build_all()
+
+
+def catalog_stats() -> dict:
+    """Entry counts per catalog, total bytes, import-time build cost, skipped spaces."""
+    return _STATS
+
+
+def get_catalog(op: str, difficulty: Difficulty) -> Catalog | None:
+    return CATALOGS.get((op, difficulty))
+
+
+def _mix64(z: int) -> int:
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def permuted_position(seed: int, op: str, idx: int, size: int) -> int:
+    """Catalog position of session problem ``idx``: a seed-keyed permutation.
+
+    ``a`` is the first value coprime with ``size`` at or after a seed-derived
+    start, so ``idx -> (a * idx + b) % size`` is a bijection on ``[0, size)``.
+    """
+    if size == 1:
+        return 0
+    h = _mix64((seed ^ _mix64(_OP_SALT[op])) & _MASK64)
+    a = 1 + h % (size - 1)
+    while math.gcd(a, size) != 1:
+        a = a % (size - 1) + 1
+    b = _mix64(h) % size
+    return (a * idx + b) % size
@@ -0,0 +1,159 @@
+"""Compact FSM encoding of a session's problem list.
+
+Problems used to live in FSM data as JSON dicts — repeated key names, a
+``formatted_text`` string and a ``metadata`` dict per problem, ~150 bytes
+each — and ``RedisStorage`` re-serialized the whole list on every write.
+
+Each problem is now a fixed 13-byte record: three little-endian int32
+(first operand, second operand, answer) and a one-byte op code. The record
+array is base64-encoded so it survives aiogram's JSON serializer. Display
+fields (``formatted_text``, ``metadata``) are derived on decode via
+``make_problem``; they are pure functions of the numbers and the op.
+
+Freshly generated sessions don't need even that: ``SeededProblems`` keeps
+only ``(seed, difficulty, mode, count)`` and regenerates problem ``idx`` via
+``ProblemGenerator.generate_at``. ``ProblemSet`` remains for lists that aren't
+reproducible from a seed — the daily challenge and retry-mistakes.
+"""
+from __future__ import annotations
+
+import base64
+import struct
+from typing import Iterable, Sequence
+
+from app.services.problem_generator import Problem, ProblemGenerator, make_problem
+from app.utils.constants import Difficulty, TrainingMode
+
+# Append-only: the index is the on-the-wire op code.
+OPERATIONS: tuple[str, ...] = ("+", "−", "×", "÷", "÷r", "^", "√")
+_OP_CODES = {op: code for code, op in enumerate(OPERATIONS)}
+
+_RECORD = struct.Struct("<iiiB")
+
+
+def encode_problems(problems: Iterable[Problem]) -> str:
+    """Pack problems into a base64 string (ASCII, JSON-safe)."""
+    raw = b"".join(
+        _RECORD.pack(p.first_num, p.second_num, p.answer, _OP_CODES[p.operation])
+        for p in problems
+    )
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _record_count(blob: str) -> int:
+    padding = len(blob) - len(blob.rstrip("="))
+    return (len(blob) // 4 * 3 - padding) // _RECORD.size
+
+
+def decode_problem(blob: str, idx: int) -> Problem:
+    """Decode record ``idx`` alone — O(1) in the length of the list.
+
+    Base64 maps every 3 bytes to 4 chars, so only the few quads covering
+    the 13-byte record are decoded.
+    """
+    start = idx * _RECORD.size
+    first_quad = start // 3
+    last_quad = -(-(start + _RECORD.size) // 3)
+    chunk = base64.b64decode(blob[first_quad * 4 : last_quad * 4])
+    first, second, answer, op = _RECORD.unpack_from(chunk, start - first_quad * 3)
+    return make_problem(first, second, OPERATIONS[op], answer)
+
+
+def decode_problems(blob: str) -> list[Problem]:
+    raw = base64.b64decode(blob)
+    return [
+        make_problem(first, second, OPERATIONS[op], answer)
+        for first, second, answer, op in _RECORD.iter_unpack(raw)
+    ]
+
+
+class ProblemSet(Sequence[Problem]):
+    """Immutable view over an encoded problem list; items decode on access."""
+
+    __slots__ = ("blob", "_count")
+
+    def __init__(self, blob: str) -> None:
+        self.blob = blob
+        self._count = _record_count(blob)
+
+    @classmethod
+    def from_problems(cls, problems: Iterable[Problem]) -> ProblemSet:
+        return cls(encode_problems(problems))
+
+    @classmethod
+    def from_specs(cls, specs: Iterable[dict]) -> ProblemSet:
+        """Accept the legacy dict specs (daily challenge rows, pre-codec FSM data)."""
+        return cls.from_problems(
+            make_problem(
+                int(spec["first_num"]),
+                int(spec["second_num"]),
+                spec["operation"],
+                int(spec["answer"]),
+            )
+            for spec in specs
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._count))]
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("problem index out of range")
+        return decode_problem(self.blob, idx)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ProblemSet):
+            return self.blob == other.blob
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self.blob)
+
+    def __repr__(self) -> str:
+        return f"ProblemSet(<{len(self)} problems>)"
+
+
+class SeededProblems(Sequence[Problem]):
+    """Constant-size session problem list: each item is generated on access."""
+
+    __slots__ = ("seed", "difficulty", "mode", "count")
+
+    def __init__(
+        self, seed: int, difficulty: Difficulty, mode: TrainingMode, count: int
+    ) -> None:
+        self.seed = seed
+        self.difficulty = Difficulty(difficulty)
+        self.mode = TrainingMode(mode)
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self.count))]
+        if idx < 0:
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError("problem index out of range")
+        return ProblemGenerator.generate_at(self.difficulty, self.mode, self.seed, idx)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, SeededProblems):
+            return (self.seed, self.difficulty, self.mode, self.count) == (
+                other.seed, other.difficulty, other.mode, other.count
+            )
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.seed, self.difficulty, self.mode, self.count))
+
+    def __repr__(self) -> str:
+        return (
+            f"SeededProblems(seed={self.seed}, {self.difficulty.value}/"
+            f"{self.mode.value}, <{self.count} problems>)"
+        )
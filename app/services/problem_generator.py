@@ -5,18 +5,28 @@ Per-operation ranges come from OPERATION_RANGES; multiplication/division
 keep their legacy DIFFICULTY_CONFIG entries.
 
 Wrong-answer variants use a Gaussian spread around the correct answer
-(no clipping to zero, except for ops whose result cannot be negative).
+(no clipping to zero, except for ops whose result cannot be negative),
+sampled by inverse CDF rather than rejection.
 
 All public methods accept an optional ``rng: random.Random`` so the
 daily-challenge generator can produce a deterministic sequence from a seed.
 ``rng=None`` (default) falls back to the module-level ``random``.
+
+``generate_at`` is the counter-based variant: problem ``idx`` of a session is
+a pure function of ``(seed, difficulty, mode, idx)``, so a session only has to
+remember its seed and can materialize any problem on demand.
 """
 from __future__ import annotations
 
 import json
+import math
 import random
-from typing import Optional
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 
+from app.services.problem_catalog import get_catalog, permuted_position
 from app.utils.constants import (
     DIFFICULTY_CONFIG,
     Difficulty,
@@ -24,31 +34,42 @@ from app.utils.constants import (
     TrainingMode,
 )
 
+_EMPTY_METADATA: Mapping[str, Any] = MappingProxyType({})
+
 
+@dataclass(frozen=True, slots=True)
 class Problem:
-    def __init__(
-        self,
-        first_num: int,
-        second_num: int,
-        operation: str,
-        answer: int,
-        *,
-        formatted_text: str | None = None,
-        metadata: dict | None = None,
-    ):
-        self.first_num = first_num
-        self.second_num = second_num
-        self.operation = operation
-        self.answer = answer
-        self.formatted_text = formatted_text or f"{first_num} {operation} {second_num}"
-        self.metadata = metadata or {}
+    """Immutable value type; sessions create one per rendered turn.
+
+    ``metadata`` is a read-only mapping and is left out of ``==``/``hash`` —
+    it is derived from the operands (see ``make_problem``).
+    """
+
+    first_num: int
+    second_num: int
+    operation: str
+    answer: int
+    formatted_text: str = field(default="", kw_only=True)
+    metadata: Mapping[str, Any] = field(default=None, kw_only=True, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.formatted_text:
+            object.__setattr__(
+                self,
+                "formatted_text",
+                f"{self.first_num} {self.operation} {self.second_num}",
+            )
+        if not self.metadata:
+            object.__setattr__(self, "metadata", _EMPTY_METADATA)
+        elif not isinstance(self.metadata, MappingProxyType):
+            object.__setattr__(self, "metadata", MappingProxyType(dict(self.metadata)))
 
     def __str__(self) -> str:
         return self.formatted_text
 
     @property
     def metadata_json(self) -> str | None:
-        return json.dumps(self.metadata) if self.metadata else None
+        return json.dumps(dict(self.metadata)) if self.metadata else None
 
 
 # Superscript digits for power formatting (e.g. 12² instead of 12^2).
@@ -59,6 +80,110 @@ def _to_superscript(n: int) -> str:
     return str(n).translate(_SUPERSCRIPT)
 
 
+def make_problem(first_num: int, second_num: int, operation: str, answer: int) -> Problem:
+    """Rebuild a Problem from its four integers-plus-op, deriving display fields.
+
+    ``formatted_text`` and ``metadata`` are pure functions of the operands, so
+    compact storage (see ``problem_codec``) only keeps the numbers and the op.
+    """
+    if operation == "÷r":
+        return Problem(
+            first_num,
+            second_num,
+            operation,
+            answer,
+            formatted_text=f"{first_num} ÷ {second_num} (с остатком)",
+            metadata={
+                "remainder": first_num - second_num * answer,
+                "dividend": first_num,
+                "divisor": second_num,
+            },
+        )
+    if operation == "^":
+        return Problem(
+            first_num,
+            second_num,
+            operation,
+            answer,
+            formatted_text=f"{first_num}{_to_superscript(second_num)}",
+            metadata={"exponent": second_num},
+        )
+    if operation == "√":
+        return Problem(
+            first_num,
+            second_num,
+            operation,
+            answer,
+            formatted_text=f"√{first_num}",
+            metadata={"radicand": first_num},
+        )
+    return Problem(first_num, second_num, operation, answer)
+
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def _index_seed(seed: int, idx: int) -> int:
+    """SplitMix64 output ``idx`` of the stream seeded with ``seed``.
+
+    Jumping to any index is O(1), and neighbouring indices give unrelated
+    seeds (plain ``seed + idx`` would correlate the Mersenne Twister states).
+    """
+    z = (seed + (idx + 1) * _GOLDEN_GAMMA) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+_STD_NORMAL = NormalDist()
+_SQRT2 = math.sqrt(2.0)
+# inv_cdf is undefined at exactly 0 and 1.
+_P_EPS = 1e-15
+
+
+def _free_intervals(lowest: float, taken: list[int]):
+    """Integer intervals ``[lo, hi]`` of ``[lowest, inf)`` minus ``taken``."""
+    lo = lowest
+    for t in sorted(taken):
+        if t < lo:
+            continue
+        if t > lo:
+            yield lo, t - 1
+        lo = t + 1
+    yield lo, math.inf
+
+
+def _draw_offset(
+    sigma: float, lowest: float, taken: list[int], rng: random.Random
+) -> int:
+    """One offset ``d`` with P(d) ∝ P(round(N(0, sigma)) == d) over free offsets.
+
+    Bin ``d`` covers ``[d - 0.5, d + 0.5)``, so an interval's mass is a CDF
+    difference and a point inside it is an inverse-CDF lookup: O(len(taken))
+    per draw, no rejection, no scan.
+    """
+    intervals = []
+    total = 0.0
+    scale = 1.0 / (sigma * _SQRT2)
+    for lo, hi in _free_intervals(lowest, taken):
+        # Phi(x) = (1 + erf(x / sqrt 2)) / 2; the halves cancel in differences.
+        below = math.erf((lo - 0.5) * scale)
+        mass = math.erf((hi + 0.5) * scale) - below
+        if mass > 0.0:
+            intervals.append((lo, hi, below, mass))
+            total += mass
+
+    u = rng.random() * total
+    for lo, hi, below, mass in intervals:
+        if u < mass:
+            break
+        u -= mass
+    p = min(max((1.0 + below + u) / 2.0, _P_EPS), 1.0 - _P_EPS)
+    offset = math.floor(sigma * _STD_NORMAL.inv_cdf(p) + 0.5)
+    return int(min(max(offset, lo), hi))
+
+
 def _resolve_rng(rng: Optional[random.Random]) -> random.Random:
     """Use the supplied rng, or fall back to the module-level ``random`` proxy."""
     return rng if rng is not None else random  # type: ignore[return-value]
@@ -76,6 +201,30 @@ class ProblemGenerator:
             ProblemGenerator._generate_one(difficulty, mode, rng=rng) for _ in range(count)
         ]
 
+    @staticmethod
+    def new_seed() -> int:
+        """Fresh session seed; fits a signed 64-bit JSON/SQL integer."""
+        return random.getrandbits(63)
+
+    @staticmethod
+    def generate_at(
+        difficulty: Difficulty, mode: TrainingMode, seed: int, idx: int
+    ) -> Problem:
+        """Problem ``idx`` of the session seeded with ``seed`` — deterministic.
+
+        Catalogued ``(op, difficulty)`` spaces are drawn without replacement
+        (see ``problem_catalog``); the rest use the scalar generators.
+        """
+        rng = random.Random(_index_seed(seed, idx))
+        op = _pick_op(mode, rng)
+        catalog = get_catalog(op, difficulty)
+        if catalog is not None:
+            # Small spaces: walk a seed-keyed permutation of every possible
+            # problem, so a session never repeats one.
+            pos = permuted_position(seed, op, idx, len(catalog))
+            return make_problem(*catalog.entry(pos))
+        return _OP_GENERATORS[op](difficulty, rng=rng)
+
     @staticmethod
     def _generate_one(
         difficulty: Difficulty,
@@ -83,32 +232,7 @@ class ProblemGenerator:
         rng: Optional[random.Random] = None,
     ) -> Problem:
         r = _resolve_rng(rng)
-        if mode == TrainingMode.ADDITION_ONLY:
-            return ProblemGenerator._generate_addition(difficulty, rng=r)
-        if mode == TrainingMode.SUBTRACTION_ONLY:
-            return ProblemGenerator._generate_subtraction(difficulty, rng=r)
-        if mode == TrainingMode.DIVISION_REMAINDER:
-            return ProblemGenerator._generate_division_remainder(difficulty, rng=r)
-        if mode == TrainingMode.POWER_ONLY:
-            return ProblemGenerator._generate_power(difficulty, rng=r)
-        if mode == TrainingMode.SQRT_ONLY:
-            return ProblemGenerator._generate_sqrt(difficulty, rng=r)
-        if mode == TrainingMode.MULTIPLICATION_ONLY:
-            return ProblemGenerator._generate_multiplication(difficulty, rng=r)
-        if mode == TrainingMode.DIVISION_ONLY:
-            return ProblemGenerator._generate_division(difficulty, rng=r)
-
-        # MIXED and CHOOSE_ANSWER → sample uniformly across all operations.
-        choices = (
-            ProblemGenerator._generate_multiplication,
-            ProblemGenerator._generate_division,
-            ProblemGenerator._generate_addition,
-            ProblemGenerator._generate_subtraction,
-            ProblemGenerator._generate_division_remainder,
-            ProblemGenerator._generate_power,
-            ProblemGenerator._generate_sqrt,
-        )
-        return r.choice(choices)(difficulty, rng=r)
+        return _OP_GENERATORS[_pick_op(mode, r)](difficulty, rng=r)
 
     # ---- Operations -------------------------------------------------------
 
@@ -183,15 +307,7 @@ class ProblemGenerator:
         quotient = r.randint(1, cfg["quotient_max"])
         remainder = r.randint(1, min(divisor - 1, cfg["remainder_max"]))
         dividend = divisor * quotient + remainder
-        formatted = f"{dividend} ÷ {divisor} (с остатком)"
-        return Problem(
-            dividend,
-            divisor,
-            "÷r",
-            quotient,
-            formatted_text=formatted,
-            metadata={"remainder": remainder, "dividend": dividend, "divisor": divisor},
-        )
+        return make_problem(dividend, divisor, "÷r", quotient)
 
     @staticmethod
     def _generate_power(
@@ -201,16 +317,7 @@ class ProblemGenerator:
         cfg = OPERATION_RANGES["power"][difficulty]
         base = r.randint(cfg["base_min"], cfg["base_max"])
         exponent = r.choice(cfg["exponents"])
-        result = base ** exponent
-        formatted = f"{base}{_to_superscript(exponent)}"
-        return Problem(
-            base,
-            exponent,
-            "^",
-            result,
-            formatted_text=formatted,
-            metadata={"exponent": exponent},
-        )
+        return make_problem(base, exponent, "^", base ** exponent)
 
     @staticmethod
     def _generate_sqrt(
@@ -219,16 +326,7 @@ class ProblemGenerator:
         r = _resolve_rng(rng)
         cfg = OPERATION_RANGES["sqrt"][difficulty]
         result = r.randint(cfg["result_min"], cfg["result_max"])
-        radicand = result * result
-        formatted = f"√{radicand}"
-        return Problem(
-            radicand,
-            0,
-            "√",
-            result,
-            formatted_text=formatted,
-            metadata={"radicand": radicand},
-        )
+        return make_problem(result * result, 0, "√", result)
 
     # ---- Variants ---------------------------------------------------------
 
@@ -240,44 +338,61 @@ class ProblemGenerator:
         allow_negative: bool = False,
         rng: Optional[random.Random] = None,
     ) -> list[tuple[int, bool]]:
-        """Gaussian spread around the correct answer; reject duplicates.
+        """Gaussian spread around the correct answer, all values distinct.
 
         ``allow_negative`` should be True only for subtraction-like ops where
         a near-zero correct answer could legitimately produce negative wrong
         answers.
+
+        Each wrong answer costs at most two draws: one plain Gaussian draw,
+        and only if that lands on a forbidden value (negative, duplicate) an
+        inverse-CDF draw from the Gaussian restricted to the still-free
+        offsets (``_draw_offset``). A rejected draw followed by an exact
+        conditional draw is the same distribution the old reject-and-retry
+        loop converged to — without its unbounded tail near zero.
         """
         r = _resolve_rng(rng)
         variants_count = max(2, int(variants_count))
         correct_answer = int(correct_answer)
-
-        out: list[tuple[int, bool]] = [(correct_answer, True)]
-        used = {correct_answer}
-
         sigma = max(2.0, abs(correct_answer) * 0.15)
+        lowest = -math.inf if allow_negative else -correct_answer
 
-        attempts = 0
-        while len(out) < variants_count and attempts < 200:
-            attempts += 1
-            candidate = round(r.gauss(correct_answer, sigma))
-            if not allow_negative and candidate < 0:
-                continue
-            if candidate in used:
-                continue
-            used.add(candidate)
-            out.append((candidate, False))
-
-        offset = 1
-        while len(out) < variants_count and offset < 1000:
-            for sign in (1, -1):
-                candidate = correct_answer + sign * offset
-                if not allow_negative and candidate < 0:
-                    continue
-                if candidate not in used:
-                    used.add(candidate)
-                    out.append((candidate, False))
-                    if len(out) >= variants_count:
-                        break
-            offset += 1
+        out: list[tuple[int, bool]] = [(correct_answer, True)]
+        taken = [0]
+        for _ in range(variants_count - 1):
+            offset = math.floor(r.gauss(0.0, sigma) + 0.5)
+            if offset < lowest or offset in taken:
+                offset = _draw_offset(sigma, lowest, taken, r)
+            taken.append(offset)
+            out.append((correct_answer + offset, False))
 
         r.shuffle(out)
         return out
+
+
+# MIXED / CHOOSE_ANSWER pick uniformly from all ops. The order is part of the
+# seeded sequences (daily challenge), so append-only.
+_MIXED_OPS = ("mul", "div", "add", "sub", "div_remainder", "power", "sqrt")
+_MODE_OPS: dict[TrainingMode, tuple[str, ...]] = {
+    TrainingMode.ADDITION_ONLY: ("add",),
+    TrainingMode.SUBTRACTION_ONLY: ("sub",),
+    TrainingMode.DIVISION_REMAINDER: ("div_remainder",),
+    TrainingMode.POWER_ONLY: ("power",),
+    TrainingMode.SQRT_ONLY: ("sqrt",),
+    TrainingMode.MULTIPLICATION_ONLY: ("mul",),
+    TrainingMode.DIVISION_ONLY: ("div",),
+}
+_OP_GENERATORS = {
+    "add": ProblemGenerator._generate_addition,
+    "sub": ProblemGenerator._generate_subtraction,
+    "mul": ProblemGenerator._generate_multiplication,
+    "div": ProblemGenerator._generate_division,
+    "div_remainder": ProblemGenerator._generate_division_remainder,
+    "power": ProblemGenerator._generate_power,
+    "sqrt": ProblemGenerator._generate_sqrt,
+}
+
+
+def _pick_op(mode: TrainingMode, rng) -> str:
+    ops = _MODE_OPS.get(mode, _MIXED_OPS)
+    return ops[0] if len(ops) == 1 else rng.choice(ops)
@@ -0,0 +1,198 @@
+"""Typed view over the FSM data of an active training session.
+
+With ``RedisStorage`` every ``get_data`` is a round trip that deserializes the
+whole blob, and ``update_data`` is *two* (aiogram reads, merges, writes). A
+single answer used to pay that six-plus times. Handlers now load the data once
+into a ``SessionState``, mutate the object in memory and write it back once:
+
+    async with session_state(state) as session:
+        session.idx += 1
+        ...
+
+The write-back is skipped when nothing changed and when the block raises, so a
+failed turn never leaves half-updated counters behind.
+
+Freshly generated sessions keep only ``problem_seed`` + ``problem_count``
+(see ``SeededProblems``): constant size whatever the session length. Explicit
+lists (daily, retry) are immutable for the life of a session, so they live
+apart from the counters: packed by ``problem_codec`` under their own FSM
+destiny (``session_problems``), written once when the session starts and
+cached in-process by ``session_id``. Entry points may hand such a list over
+inline (packed string or legacy spec list); the first ``session_state`` block
+moves it out.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field, fields, replace
+from typing import Any, AsyncIterator
+
+from aiogram.fsm.context import FSMContext
+
+from app.services.problem_codec import ProblemSet, SeededProblems
+
+PROBLEMS_DESTINY = "session_problems"
+# Active sessions per process; a miss costs one extra FSM read.
+_PROBLEM_CACHE_SIZE = 4096
+_problem_cache: OrderedDict[int, ProblemSet] = OrderedDict()
+
+
+@dataclass(slots=True)
+class SessionState:
+    lang: str = "ru"
+    session_id: int | None = None
+    difficulty: str | None = None
+    mode: str | None = None
+    problems: ProblemSet | SeededProblems | None = None
+    idx: int = 0
+    correct: int = 0
+    incorrect: int = 0
+    session_streak: int = 0
+    last_time_s: float | None = None
+    # Running answer-time aggregates: fixed size whatever the session length.
+    answer_time_sum: float = 0.0
+    timed_answers: int = 0
+    # The slowest answers so far as ``[problem idx, seconds]``, slowest first.
+    slowest: list[list[float]] = field(default_factory=list)
+    # Bit i set: problem i was answered wrong or skipped.
+    mistake_mask: int = 0
+    # Packed mistakes of the session just finished, for "Retry mistakes";
+    # "" = none, None = not recorded (fall back to the problems table).
+    retry_problems: str | None = None
+    anchor_chat_id: int | None = None
+    anchor_message_id: int | None = None
+    current_problem_id: int | None = None
+    problem_shown_at: str | None = None
+    session_kind: str = "normal"
+    session_started_at: str | None = None
+    daily_attempt_id: int | None = None
+    # Keys this class doesn't model (picker leftovers, other flows) survive
+    # the round trip untouched.
+    extra: dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_data(cls, data: dict[str, Any]) -> SessionState:
+        known = _FIELD_NAMES & data.keys()
+        kwargs = {name: data[name] for name in known if data[name] is not None}
+        for name in _INT_FIELDS & kwargs.keys():
+            kwargs[name] = int(kwargs[name])
+        inline = data.get("problems")
+        seed = data.get("problem_seed")
+        if seed is not None and data.get("difficulty") and data.get("mode"):
+            kwargs["problems"] = SeededProblems(
+                int(seed), data["difficulty"], data["mode"], int(data["problem_count"])
+            )
+        elif isinstance(inline, str):
+            kwargs["problems"] = ProblemSet(inline)
+        elif inline:
+            kwargs["problems"] = ProblemSet.from_specs(inline)
+        extra = {
+            k: v
+            for k, v in data.items()
+            if k not in _FIELD_NAMES and k not in _PROBLEM_KEYS and k not in _RETIRED_KEYS
+        }
+        return cls(**kwargs, extra=extra)
+
+    def to_data(self) -> dict[str, Any]:
+        """Counters and the seed — explicit lists go under ``PROBLEMS_DESTINY``."""
+        data = dict(self.extra)
+        for name in _FIELD_NAMES:
+            data[name] = getattr(self, name)
+        data["problem_count"] = self.total or None
+        seeded = isinstance(self.problems, SeededProblems)
+        data["problem_seed"] = self.problems.seed if seeded else None
+        return data
+
+    @property
+    def total(self) -> int:
+        return len(self.problems or ())
+
+    @property
+    def has_anchor(self) -> bool:
+        return self.anchor_chat_id is not None and self.anchor_message_id is not None
+
+
+_FIELD_NAMES = frozenset(f.name for f in fields(SessionState)) - {"extra", "problems"}
+_PROBLEM_KEYS = frozenset({"problems", "problem_count", "problem_seed"})
+# Per-answer lists of sessions started before the running aggregates and the
+# mistake mask: dropped on the next write instead of riding along in ``extra``.
+_RETIRED_KEYS = frozenset({"answer_times", "mistakes"})
+_INT_FIELDS = frozenset(
+    {
+        "session_id",
+        "idx",
+        "correct",
+        "incorrect",
+        "session_streak",
+        "timed_answers",
+        "mistake_mask",
+        "anchor_chat_id",
+        "anchor_message_id",
+        "current_problem_id",
+        "daily_attempt_id",
+    }
+)
+
+
+def _problems_context(state: FSMContext) -> FSMContext:
+    return FSMContext(
+        storage=state.storage, key=replace(state.key, destiny=PROBLEMS_DESTINY)
+    )
+
+
+def remember_problems(session_id: int, problems: ProblemSet) -> None:
+    _problem_cache[session_id] = problems
+    _problem_cache.move_to_end(session_id)
+    while len(_problem_cache) > _PROBLEM_CACHE_SIZE:
+        _problem_cache.popitem(last=False)
+
+
+async def _load_problems(state: FSMContext, session_id: int) -> ProblemSet | None:
+    cached = _problem_cache.get(session_id)
+    if cached is not None:
+        _problem_cache.move_to_end(session_id)
+        return cached
+    data = await _problems_context(state).get_data()
+    # A stale blob from the previous session must never be served.
+    if data.get("session_id") != session_id or not data.get("packed"):
+        return None
+    problems = ProblemSet(data["packed"])
+    remember_problems(session_id, problems)
+    return problems
+
+
+async def _store_problems(state: FSMContext, session_id: int, problems: ProblemSet) -> None:
+    await _problems_context(state).set_data(
+        {"session_id": session_id, "packed": problems.blob}
+    )
+    remember_problems(session_id, problems)
+
+
+async def _read(state: FSMContext) -> tuple[dict[str, Any], SessionState, ProblemSet | None]:
+    data = await state.get_data()
+    session = SessionState.from_data(data)
+    stored = None
+    if session.problems is None and data.get("problem_count") and session.session_id is not None:
+        session.problems = stored = await _load_problems(state, session.session_id)
+    return data, session, stored
+
+
+async def load_session_state(state: FSMContext) -> SessionState:
+    """One ``get_data`` round trip (plus one on a problem-cache miss)."""
+    _, session, _ = await _read(state)
+    return session
+
+
+@asynccontextmanager
+async def session_state(state: FSMContext) -> AsyncIterator[SessionState]:
+    """Load once, yield for in-memory mutation, write back once on success."""
+    data, session, stored = await _read(state)
+    yield session
+    if isinstance(session.problems, ProblemSet) and session.problems is not stored:
+        # New explicit list (daily / retry start): store it before the
+        # counters that reference it.
+        await _store_problems(state, int(session.session_id), session.problems)
+    updated = session.to_data()
+    if updated != data:
+        await state.set_data(updated)
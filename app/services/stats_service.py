@@ -9,7 +9,7 @@ from app.database.db import (
     get_user_rank,
     get_user_stats,
 )
-from app.locales import get_text
+from app.locales import get_template, get_text
 from app.utils.ui import format_seconds, today_msk
 
 
@@ -81,6 +81,7 @@ class StatsService:
 
         anonymous = get_text("leaderboard_anonymous", lang)
         hidden_label = get_text("leaderboard_hidden", lang)
+        row_template = get_template(row_key, lang)
 
         for i, (user, value, diff) in enumerate(top_data, 1):
             idx = offset + i
@@ -92,7 +93,7 @@ class StatsService:
             else:
                 name = escape_md(user.first_name or user.username or anonymous)
             
-            text += get_text(row_key, lang).format(
+            text += row_template.format(
                 medal=medal,
                 name=name,
                 value=value,
@@ -127,7 +128,7 @@ class StatsService:
         text += "━" * 15 + "\n"
         anonymous = get_text("leaderboard_anonymous", lang)
         hidden = get_text("leaderboard_hidden", lang)
-        row_template = get_text("daily_leaderboard_row", lang)
+        row_template = get_template("daily_leaderboard_row", lang)
 
         for i, (user, attempt) in enumerate(rows, 1):
             idx = offset + i
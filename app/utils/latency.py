@@ -0,0 +1,55 @@
+"""Rolling latency windows for hot handler paths.
+
+A fixed-size ring of recent durations per tracked path — cheap enough to
+record on every update, and enough to read p50/p95 from the admin stats
+without a metrics backend.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+DEFAULT_WINDOW = 512
+
+
+class LatencyWindow:
+    def __init__(self, name: str, size: int = DEFAULT_WINDOW) -> None:
+        self.name = name
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def record(self, ms: float) -> None:
+        self._samples.append(ms)
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        """Record the block's wall time, including when it raises."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record((time.perf_counter() - started) * 1000)
+
+    def percentile(self, q: float) -> float | None:
+        """Nearest-rank percentile over the window (``q`` in 0..100), ms."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+        return ordered[rank]
+
+    def summary(self) -> dict[str, float | int | None]:
+        p50, p95 = self.percentile(50), self.percentile(95)
+        return {
+            "count": len(self._samples),
+            "p50_ms": round(p50, 1) if p50 is not None else None,
+            "p95_ms": round(p95, 1) if p95 is not None else None,
+        }
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+
+# Answer → next problem on screen (DB writes + anchor edit).
+TURN_LATENCY = LatencyWindow("training_turn")
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from aiogram import Bot
 from aiogram.types import BotCommand
@@ -25,10 +26,12 @@ async def set_bot_commands(bot: Bot) -> None:
 
     Telegram serves the entry whose ``language_code`` matches the user's
     client locale; the call without ``language_code`` is the fallback for
-    every other locale.
+    every other locale. The two calls are independent and sent together.
     """
     ru = [BotCommand(command=c, description=ru_text) for c, ru_text, _ in _COMMANDS]
     en = [BotCommand(command=c, description=en_text) for c, _, en_text in _COMMANDS]
-    await bot.set_my_commands(ru)
-    await bot.set_my_commands(en, language_code="en")
+    await asyncio.gather(
+        bot.set_my_commands(ru),
+        bot.set_my_commands(en, language_code="en"),
+    )
     logger.info("Bot commands installed (ru default + en)")
\ No newline at end of file
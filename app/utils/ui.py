@@ -6,7 +6,9 @@ new ones; these helpers keep that paradigm consistent across handlers.
 - ``render_progress_bar`` / ``format_seconds`` — pure rendering primitives.
 - ``format_problem_anchor`` — the standard data-dense problem screen.
 - ``format_session_result`` — the compact end-of-session block.
-- ``safe_edit`` — swallows aiogram's "message is not modified" race noise.
+- ``safe_edit`` / ``edit_anchor`` — coalesced anchor edits: per
+  (chat_id, message_id) only the latest pending edit is sent, and an edit
+  identical to the last one sent is skipped without an API call.
 - ``delete_user_message`` — best-effort cleanup for type-answer mode where
   the user's reply would otherwise pile up in the chat.
 - ``today_msk`` — calendar boundary for daily challenges (Europe/Moscow,
@@ -14,15 +16,18 @@ new ones; these helpers keep that paradigm consistent across handlers.
 """
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
 from datetime import date, datetime
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional, Sequence
 from zoneinfo import ZoneInfo
 
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
 from aiogram.types import CallbackQuery, InlineKeyboardMarkup, Message
 
-from app.locales import get_text
+from app.locales import get_template, get_text
 
 logger = logging.getLogger(__name__)
 
@@ -84,13 +89,13 @@ def format_problem_anchor(
         🔥 серия 3   ⏱ 4.2s
     """
     bar = render_progress_bar(current, total)
-    header = get_text("training_anchor_header", lang).format(
+    header = get_template("training_anchor_header", lang).format(
         current=current, total=total, bar=bar
     )
 
     footer_parts: list[str] = []
     if streak > 0:
-        footer_parts.append(get_text("training_streak_footer", lang).format(streak=streak))
+        footer_parts.append(get_template("training_streak_footer", lang).format(streak=streak))
     if last_time_s is not None:
         footer_parts.append(f"⏱ {format_seconds(last_time_s)}")
     footer = "   ".join(footer_parts)
@@ -113,33 +118,164 @@ def format_session_result(
     avg_time_s: Optional[float],
     current_streak: int,
     lang: str,
+    slowest: Sequence[tuple[str, float]] = (),
 ) -> str:
-    """Compact end-of-session block."""
+    """Compact end-of-session block, plus the slowest problems when given
+    (``(expression, seconds)`` pairs, slowest first)."""
     accuracy = (correct / total * 100) if total else 0.0
-    return get_text("training_result_v2", lang).format(
+    text = get_template("training_result_v2", lang).format(
         correct=correct,
         total=total,
         acc=round(accuracy),
         avg_time=format_seconds(avg_time_s) if avg_time_s else "—",
         streak=current_streak,
     )
+    if slowest:
+        row = get_template("training_result_slowest_row", lang)
+        text += get_text("training_result_slowest", lang) + "".join(
+            row.format(expression=expression, time=format_seconds(seconds))
+            for expression, seconds in slowest
+        )
+    return text
 
 
-async def safe_edit(
-    callback: CallbackQuery,
-    text: str,
-    reply_markup: InlineKeyboardMarkup | None = None,
-    parse_mode: str = "Markdown",
+# ---------------------------------------------------------------------------
+# Coalesced anchor edits
+# ---------------------------------------------------------------------------
+
+# Bounded LRU of per-message edit slots; old anchors just lose their dedupe
+# digest, which costs at most one redundant edit.
+_EDIT_CACHE_SIZE = 10_000
+
+
+class _EditSlot:
+    """Edit state for one (chat_id, message_id).
+
+    ``digest`` is what Telegram currently shows (as far as we know), ``busy``
+    marks an in-flight request, ``pending`` holds the single latest edit
+    queued behind it — anything older is superseded, not sent.
+    """
+
+    __slots__ = ("digest", "busy", "pending")
+
+    def __init__(self) -> None:
+        self.digest: bytes | None = None
+        self.busy = False
+        self.pending: tuple[bytes, Callable[[], Awaitable[Any]], asyncio.Future] | None = None
+
+
+_edit_slots: OrderedDict[tuple[int, int], _EditSlot] = OrderedDict()
+
+
+def _payload_digest(
+    text: str, reply_markup: InlineKeyboardMarkup | None, parse_mode: str | None
+) -> bytes:
+    markup = reply_markup.model_dump_json(exclude_none=True) if reply_markup is not None else ""
+    payload = f"{parse_mode}\x00{text}\x00{markup}".encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).digest()
+
+
+def _get_slot(key: tuple[int, int]) -> _EditSlot:
+    slot = _edit_slots.get(key)
+    if slot is None:
+        slot = _edit_slots[key] = _EditSlot()
+        if len(_edit_slots) > _EDIT_CACHE_SIZE:
+            _edit_slots.popitem(last=False)
+    else:
+        _edit_slots.move_to_end(key)
+    return slot
+
+
+def _resolve(future: asyncio.Future, delivered: bool, error: Exception | None = None) -> None:
+    if future.done():  # waiter was cancelled
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(delivered)
+
+
+async def _send_if_changed(
+    slot: _EditSlot, digest: bytes, send: Callable[[], Awaitable[Any]]
 ) -> None:
-    """Edit the anchor via callback.message; swallow "message is not modified"."""
+    if digest == slot.digest:
+        return
     try:
-        await callback.message.edit_text(
-            text, reply_markup=reply_markup, parse_mode=parse_mode
-        )
+        await send()
     except TelegramBadRequest as e:
         if "message is not modified" in str(e):
+            slot.digest = digest
             return
+        slot.digest = None
+        raise
+    except Exception:
+        slot.digest = None
         raise
+    slot.digest = digest
+
+
+async def _coalesced_edit(
+    key: tuple[int, int], digest: bytes, send: Callable[[], Awaitable[Any]]
+) -> None:
+    """Run ``send`` for ``key`` with latest-wins coalescing.
+
+    While an edit for the same message is in flight, later callers park their
+    payload in ``slot.pending`` (replacing, and thereby completing, any older
+    parked one) and wait. The in-flight owner drains the pending slot before
+    returning, so at most two requests go out for any burst of edits.
+    """
+    slot = _get_slot(key)
+    while slot.busy:
+        if slot.pending is not None:
+            _resolve(slot.pending[2], True)  # superseded: counts as delivered
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        slot.pending = (digest, send, future)
+        if await future:
+            return
+        # Owner was cancelled before reaching us — take over.
+
+    slot.busy = True
+    error: Exception | None = None
+    try:
+        try:
+            await _send_if_changed(slot, digest, send)
+        except Exception as e:
+            error = e
+        while slot.pending is not None:
+            pending_digest, pending_send, future = slot.pending
+            slot.pending = None
+            try:
+                await _send_if_changed(slot, pending_digest, pending_send)
+            except Exception as e:
+                _resolve(future, False, e)
+            else:
+                _resolve(future, True)
+    finally:
+        slot.busy = False
+        if slot.pending is not None:
+            _resolve(slot.pending[2], False)
+            slot.pending = None
+    if error is not None:
+        raise error
+
+
+async def safe_edit(
+    callback: CallbackQuery,
+    text: str,
+    reply_markup: InlineKeyboardMarkup | None = None,
+    parse_mode: str | None = "Markdown",
+) -> None:
+    """Edit the anchor via callback.message, coalesced per message.
+
+    Unchanged payloads are skipped locally; "message is not modified" from
+    Telegram is still swallowed for edits made before this process started.
+    """
+    message = callback.message
+    await _coalesced_edit(
+        (message.chat.id, message.message_id),
+        _payload_digest(text, reply_markup, parse_mode),
+        lambda: message.edit_text(text, reply_markup=reply_markup, parse_mode=parse_mode),
+    )
 
 
 async def edit_anchor(
@@ -148,21 +284,20 @@ async def edit_anchor(
     message_id: int,
     text: str,
     reply_markup: InlineKeyboardMarkup | None = None,
-    parse_mode: str = "Markdown",
+    parse_mode: str | None = "Markdown",
 ) -> None:
     """Edit a specific message by (chat_id, message_id) — used by type-answer mode."""
-    try:
-        await bot.edit_message_text(
+    await _coalesced_edit(
+        (chat_id, message_id),
+        _payload_digest(text, reply_markup, parse_mode),
+        lambda: bot.edit_message_text(
             text=text,
             chat_id=chat_id,
             message_id=message_id,
             reply_markup=reply_markup,
             parse_mode=parse_mode,
-        )
-    except TelegramBadRequest as e:
-        if "message is not modified" in str(e):
-            return
-        raise
+        ),
+    )
 
 
 async def delete_user_message(message: Message) -> None:
@@ -0,0 +1 @@
+"""Micro-benchmarks. Run a module directly: ``python -m benchmarks.<name>``."""
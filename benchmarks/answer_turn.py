@@ -0,0 +1,100 @@
+"""Answer turn latency: serial DB writes + edit vs writes concurrent with the edit.
+
+    python -m benchmarks.answer_turn
+
+Runs the real ``_record_and_advance`` with the two DB writes and the
+Telegram edit replaced by sleeps of typical round-trip times. "serial" is
+the previous order (answer UPDATE, then shown_at INSERT, then the edit);
+"concurrent" is what the handler does now. Latencies come from
+``TURN_LATENCY``, the same window the admin stats read.
+"""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from aiogram.types import CallbackQuery
+
+from app.handlers import training
+from app.services.problem_codec import ProblemSet
+from app.services.problem_generator import make_problem
+from app.services.session_state import remember_problems
+from app.utils.latency import TURN_LATENCY
+
+DB_WRITE_S = 0.004
+TELEGRAM_EDIT_S = 0.060
+TURNS = 30
+
+
+async def _answered(*args, **kwargs) -> None:
+    await asyncio.sleep(DB_WRITE_S)
+
+
+async def _shown(*args, **kwargs) -> int:
+    await asyncio.sleep(DB_WRITE_S)
+    return 1
+
+
+async def _edit(*args, **kwargs) -> None:
+    await asyncio.sleep(TELEGRAM_EDIT_S)
+
+
+def _state() -> MagicMock:
+    state = MagicMock()
+    state.get_data = AsyncMock(
+        return_value={
+            "lang": "ru", "session_id": 1, "problem_count": 2, "idx": 0,
+            "mode": "mixed", "difficulty": "easy", "current_problem_id": 1,
+        }
+    )
+    state.set_data = AsyncMock()
+    return state
+
+
+def _callback() -> MagicMock:
+    cb = MagicMock(spec=CallbackQuery)
+    cb.message = MagicMock()
+    return cb
+
+
+async def _serial_render(target, session, feedback_prefix=None, *, answer_write=None):
+    # Pre-change order: every await in sequence.
+    if answer_write is not None:
+        await answer_write()
+    session.current_problem_id = await _shown()
+    await _edit()
+
+
+async def _run(serial: bool) -> dict:
+    TURN_LATENCY.clear()
+    remember_problems(1, ProblemSet.from_problems([make_problem(2, 2, "+", 4)] * 2))
+    patches = [
+        patch.object(training, "record_problem_answered", side_effect=_answered),
+        patch.object(training, "record_problem_shown", side_effect=_shown),
+        patch.object(training, "safe_edit", side_effect=_edit),
+    ]
+    if serial:
+        patches.append(patch.object(training, "_render_problem", _serial_render))
+    for p in patches:
+        p.start()
+    try:
+        for _ in range(TURNS):
+            await training._record_and_advance(
+                _callback(), _state(), user_answer=4, skipped=False
+            )
+    finally:
+        for p in patches:
+            p.stop()
+    return TURN_LATENCY.summary()
+
+
+def run() -> None:
+    print(f"DB write {DB_WRITE_S * 1000:.0f} ms x2, edit {TELEGRAM_EDIT_S * 1000:.0f} ms")
+    print(f"{'path':<11} | {'p50, ms':>8} | {'p95, ms':>8}")
+    for name, serial in (("serial", True), ("concurrent", False)):
+        summary = asyncio.run(_run(serial))
+        print(f"{name:<11} | {summary['p50_ms']:>8.1f} | {summary['p95_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,135 @@
+"""Backup: two-pass (plaintext temp file, then encrypt) vs pg_dump piped into the encryptor.
+
+    python -m benchmarks.backup_pipeline
+
+pg_dump is replaced by a child process that writes ``DUMP_SIZE`` bytes, to
+``--file`` for the old flow and to stdout for the streaming one, so only the
+pipeline around it differs. "two-pass" is the previous ``create_backup``
+(dump to disk, ``_encrypt_file`` in a thread, remove the plaintext);
+"streaming" is ``BackupService._dump_encrypted`` into a single-part
+``_PartWriter``, published by ``_publish_parts``. Both end with the
+encrypted file fsynced, which the old flow skipped.
+
+Peak disk is sampled from the backups directory while the run is going;
+file I/O counts bytes written to and read back from files in it.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, patch
+
+from app.services import backup_service
+from app.services.backup_service import (
+    BackupService,
+    _PartWriter,
+    _encrypt_file,
+    _publish_parts,
+)
+
+DUMP_SIZE = 512 << 20
+PASSWORD = "benchmark"
+
+_PRODUCER = """
+import sys
+size, target = int(sys.argv[1]), sys.argv[2]
+out = open(target, "wb") if target else sys.stdout.buffer
+block = bytes(range(256)) * 4096
+while size > 0:
+    out.write(block[:size])
+    size -= len(block)
+out.close()
+"""
+
+_spawn = asyncio.create_subprocess_exec
+
+
+async def _producer(target: str = "", **kwargs):
+    return await _spawn(sys.executable, "-c", _PRODUCER, str(DUMP_SIZE), target, **kwargs)
+
+
+def _fsync(path: Path) -> None:
+    with path.open("rb+") as f:
+        os.fsync(f.fileno())
+
+
+async def _two_pass(workdir: Path) -> int:
+    plain, enc = workdir / "bench.dump", workdir / "bench.dump.enc"
+    proc = await _producer(str(plain))
+    await proc.communicate()
+    try:
+        await asyncio.to_thread(_encrypt_file, plain, enc, PASSWORD)
+        await asyncio.to_thread(_fsync, enc)  # streaming fsyncs before its rename
+    finally:
+        plain.unlink(missing_ok=True)
+    # pg_dump writes the plaintext, the encryptor reads it back, then writes.
+    return 2 * DUMP_SIZE + enc.stat().st_size
+
+
+async def _streaming(workdir: Path) -> int:
+    service = BackupService(AsyncMock())
+    enc = workdir / "bench.dump.enc"
+    # One part, as create_backup writes it: renamed to ``enc`` when complete.
+    out = _PartWriter(workdir / ".bench.dump.enc.part", DUMP_SIZE << 1)
+    with patch.object(backup_service.asyncio, "create_subprocess_exec",
+                      lambda *a, **kw: _producer(**kw)), \
+            patch.object(backup_service, "ADMIN_BACKUP_PASSWORD", PASSWORD):
+        exit_code, _, _ = await service._dump_encrypted(out)
+    assert exit_code == 0
+    _publish_parts(out.parts, enc)
+    return enc.stat().st_size
+
+
+async def _measure(run, workdir: Path) -> dict:
+    peak = 0
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        nonlocal peak
+        while not done.is_set():
+            used = sum(p.stat().st_size for p in workdir.iterdir() if p.is_file())
+            peak = max(peak, used)
+            await asyncio.sleep(0.005)
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    try:
+        file_io = await run(workdir)
+    finally:
+        elapsed = time.perf_counter() - started
+        done.set()
+        await sampler
+    for p in workdir.iterdir():
+        p.unlink()
+    return {"wall_s": elapsed, "peak_disk": peak, "file_io": file_io}
+
+
+async def _main() -> None:
+    mib = 1 << 20
+    print(f"dump size: {DUMP_SIZE // mib} MiB")
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        results = {}
+        for name, run in (("two-pass", _two_pass), ("streaming", _streaming)):
+            results[name] = r = await _measure(run, workdir)
+            print(
+                f"{name:>10}: {r['wall_s']:.2f} s, peak disk {r['peak_disk'] / mib:.0f} MiB, "
+                f"file I/O {r['file_io'] / mib:.0f} MiB"
+            )
+    old, new = results["two-pass"], results["streaming"]
+    print(
+        f"speedup {old['wall_s'] / new['wall_s']:.2f}x, "
+        f"file I/O {old['file_io'] / new['file_io']:.1f}x less"
+    )
+
+
+def run() -> None:
+    asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,52 @@
+"""Scalar ``ProblemGenerator`` vs NumPy ``generate_batch`` throughput.
+
+    python -m benchmarks.batch_generation
+
+Needs numpy (requirements-dev.txt).
+"""
+from __future__ import annotations
+
+import random
+import time
+
+import numpy as np
+
+from benchmarks.batch_generator import generate_batch
+from app.services.problem_generator import ProblemGenerator
+from app.utils.constants import Difficulty, TrainingMode
+
+COUNTS = (1_000, 100_000)
+DIFFICULTY = Difficulty.HARD
+MODE = TrainingMode.MIXED
+
+
+def _best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run() -> None:
+    print(f"{'problems':>8} | {'scalar, ms':>10} | {'batch, ms':>9} | "
+          f"{'batch+pack, ms':>14} | {'speedup':>7}")
+    for n in COUNTS:
+        scalar = _best_of(
+            lambda: ProblemGenerator.generate_problems(DIFFICULTY, MODE, n, rng=random.Random(1))
+        )
+        batch = _best_of(
+            lambda: generate_batch(DIFFICULTY, MODE, n, rng=np.random.default_rng(1))
+        )
+        packed = _best_of(
+            lambda: generate_batch(
+                DIFFICULTY, MODE, n, rng=np.random.default_rng(1)
+            ).to_problem_set()
+        )
+        print(f"{n:>8} | {scalar * 1e3:>10.1f} | {batch * 1e3:>9.2f} | "
+              f"{packed * 1e3:>14.2f} | {scalar / batch:>6.0f}x")
+
+
+if __name__ == "__main__":
+    run()
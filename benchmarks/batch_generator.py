@@ -0,0 +1,202 @@
+"""Vectorized batch problem generation (NumPy).
+
+``ProblemGenerator`` draws one problem at a time through ``random.randint``
+and per-call config lookups — fine for a 10-problem session, slow for
+marathon sessions, pre-generated pools or load-test fixtures with
+hundreds of thousands of problems. ``generate_batch`` draws whole columns
+per operation with a seedable ``numpy.random.Generator`` and follows the
+scalar generators' distributions exactly (same ranges, same conditional
+bounds for division, same uniform op mix for mixed modes);
+``tests/benchmarks/test_batch_generator.py`` compares their histograms.
+
+The result is columnar (``ProblemBatch``) and packs straight into the
+``problem_codec`` record layout, so a batch becomes a ``ProblemSet``
+without building a ``Problem`` per row.
+
+Nothing in the bot uses it, and NumPy is a dev dependency
+(requirements-dev.txt), so it lives here rather than under ``app/`` and
+stays out of the image.
+"""
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.services.problem_codec import OPERATIONS, ProblemSet
+from app.services.problem_generator import Problem, make_problem
+from app.utils.constants import (
+    DIFFICULTY_CONFIG,
+    Difficulty,
+    OPERATION_RANGES,
+    TrainingMode,
+)
+
+# Op codes (indices into problem_codec.OPERATIONS) each mode draws from.
+_ALL_OPS = tuple(range(len(OPERATIONS)))
+_MODE_OPS: dict[TrainingMode, tuple[int, ...]] = {
+    TrainingMode.ADDITION_ONLY: (OPERATIONS.index("+"),),
+    TrainingMode.SUBTRACTION_ONLY: (OPERATIONS.index("−"),),
+    TrainingMode.MULTIPLICATION_ONLY: (OPERATIONS.index("×"),),
+    TrainingMode.DIVISION_ONLY: (OPERATIONS.index("÷"),),
+    TrainingMode.DIVISION_REMAINDER: (OPERATIONS.index("÷r"),),
+    TrainingMode.POWER_ONLY: (OPERATIONS.index("^"),),
+    TrainingMode.SQRT_ONLY: (OPERATIONS.index("√"),),
+    TrainingMode.MIXED: _ALL_OPS,
+    TrainingMode.CHOOSE_ANSWER: _ALL_OPS,
+}
+
+
+@dataclass(frozen=True, slots=True)
+class ProblemBatch:
+    """Columnar problems: parallel int arrays plus an op-code array."""
+
+    first_num: np.ndarray
+    second_num: np.ndarray
+    answer: np.ndarray
+    op: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.op)
+
+    def problem(self, idx: int) -> Problem:
+        return make_problem(
+            int(self.first_num[idx]),
+            int(self.second_num[idx]),
+            OPERATIONS[int(self.op[idx])],
+            int(self.answer[idx]),
+        )
+
+    def to_problems(self) -> list[Problem]:
+        return [
+            make_problem(first, second, OPERATIONS[op], answer)
+            for first, second, answer, op in zip(
+                self.first_num.tolist(),
+                self.second_num.tolist(),
+                self.answer.tolist(),
+                self.op.tolist(),
+            )
+        ]
+
+    def to_problem_set(self) -> ProblemSet:
+        """Pack into the ``problem_codec`` layout in one vectorized copy."""
+        records = np.empty(
+            len(self),
+            dtype=[("first", "<i4"), ("second", "<i4"), ("answer", "<i4"), ("op", "u1")],
+        )
+        records["first"] = self.first_num
+        records["second"] = self.second_num
+        records["answer"] = self.answer
+        records["op"] = self.op
+        return ProblemSet(base64.b64encode(records.tobytes()).decode("ascii"))
+
+
+def generate_batch(
+    difficulty: Difficulty,
+    mode: TrainingMode,
+    count: int,
+    rng: np.random.Generator | None = None,
+) -> ProblemBatch:
+    """``count`` problems for ``(difficulty, mode)`` in a handful of array ops."""
+    rng = rng if rng is not None else np.random.default_rng()
+    difficulty = Difficulty(difficulty)
+    ops_pool = _MODE_OPS[TrainingMode(mode)]
+
+    if len(ops_pool) == 1:
+        op = np.full(count, ops_pool[0], dtype=np.uint8)
+    else:
+        op = rng.choice(np.array(ops_pool, dtype=np.uint8), size=count)
+
+    first = np.empty(count, dtype=np.int64)
+    second = np.empty(count, dtype=np.int64)
+    answer = np.empty(count, dtype=np.int64)
+    for code in ops_pool:
+        mask = op == code
+        n = int(mask.sum())
+        if n:
+            first[mask], second[mask], answer[mask] = _DRAWERS[OPERATIONS[code]](
+                rng, difficulty, n
+            )
+    return ProblemBatch(first, second, answer, op)
+
+
+# ---- Per-operation column drawers ------------------------------------------
+# Each mirrors the ProblemGenerator._generate_* method of the same op.
+# ``integers(low, high + 1)`` because numpy's upper bound is exclusive.
+
+
+def _draw_add(rng, difficulty, n):
+    cfg = OPERATION_RANGES["add"][difficulty]
+    a = rng.integers(cfg["min"], cfg["max"] + 1, size=n)
+    b = rng.integers(cfg["min"], cfg["max"] + 1, size=n)
+    return a, b, a + b
+
+
+def _draw_sub(rng, difficulty, n):
+    cfg = OPERATION_RANGES["sub"][difficulty]
+    x = rng.integers(cfg["min"], cfg["max"] + 1, size=n)
+    y = rng.integers(cfg["min"], cfg["max"] + 1, size=n)
+    a, b = np.maximum(x, y), np.minimum(x, y)
+    return a, b, a - b
+
+
+def _draw_mul(rng, difficulty, n):
+    cfg = DIFFICULTY_CONFIG[difficulty]
+    small_factor_max = cfg.get("mul_small_factor_max")
+    mul_max_factor = cfg.get("mul_max_factor")
+    min_num = int(cfg.get("min_num", 2))
+    max_num = int(cfg.get("max_num", 100))
+    if small_factor_max:
+        a = rng.integers(min_num, max_num + 1, size=n)
+        b = rng.integers(2, int(small_factor_max) + 1, size=n)
+    elif mul_max_factor:
+        a = rng.integers(10, int(mul_max_factor) + 1, size=n)
+        b = rng.integers(10, int(mul_max_factor) + 1, size=n)
+    else:
+        a = rng.integers(min_num, max_num + 1, size=n)
+        b = rng.integers(min_num, max_num + 1, size=n)
+    return a, b, a * b
+
+
+def _draw_div(rng, difficulty, n):
+    cfg = DIFFICULTY_CONFIG[difficulty]
+    max_dividend = int(cfg.get("div_max_dividend", 100))
+    max_divisor = max(2, int(cfg.get("div_max_divisor", 12)))
+    max_quotient = max(2, int(cfg.get("div_max_quotient", 12)))
+    divisor = rng.integers(2, max_divisor + 1, size=n)
+    upper_q = np.maximum(np.minimum(max_quotient, max_dividend // divisor), 2)
+    quotient = rng.integers(2, upper_q + 1)
+    return divisor * quotient, divisor, quotient
+
+
+def _draw_div_remainder(rng, difficulty, n):
+    cfg = OPERATION_RANGES["div_remainder"][difficulty]
+    divisor = rng.integers(2, cfg["divisor_max"] + 1, size=n)
+    quotient = rng.integers(1, cfg["quotient_max"] + 1, size=n)
+    remainder = rng.integers(1, np.minimum(divisor - 1, cfg["remainder_max"]) + 1)
+    return divisor * quotient + remainder, divisor, quotient
+
+
+def _draw_power(rng, difficulty, n):
+    cfg = OPERATION_RANGES["power"][difficulty]
+    base = rng.integers(cfg["base_min"], cfg["base_max"] + 1, size=n)
+    exponent = rng.choice(np.array(cfg["exponents"], dtype=np.int64), size=n)
+    return base, exponent, base ** exponent
+
+
+def _draw_sqrt(rng, difficulty, n):
+    cfg = OPERATION_RANGES["sqrt"][difficulty]
+    result = rng.integers(cfg["result_min"], cfg["result_max"] + 1, size=n)
+    return result * result, np.zeros(n, dtype=np.int64), result
+
+
+_DRAWERS = {
+    "+": _draw_add,
+    "−": _draw_sub,
+    "×": _draw_mul,
+    "÷": _draw_div,
+    "÷r": _draw_div_remainder,
+    "^": _draw_power,
+    "√": _draw_sqrt,
+}
@@ -0,0 +1,41 @@
+"""Static inline keyboards: per-call build vs the memoized frozen markup.
+
+    python -m benchmarks.keyboards
+
+"fresh" calls the undecorated builder (``__wrapped__``): pydantic buttons,
+``CallbackData.pack()`` and ``get_text`` on every call, as before caching.
+"cached" is what handlers get now.
+"""
+from __future__ import annotations
+
+import timeit
+
+from app.keyboards.inline import InlineKeyboards
+
+CASES = (
+    ("difficulty_selection", {}),
+    ("mode_selection", {"expanded": True}),
+    ("notification_preset_selection", {}),
+    ("tips_menu", {}),
+    ("training_type_controls", {}),
+    ("back_only", {}),
+)
+
+
+def _per_call_us(fn) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def run() -> None:
+    print(f"{'keyboard':<32} | {'fresh, µs':>10} | {'cached, µs':>10}")
+    for name, kwargs in CASES:
+        builder = getattr(InlineKeyboards, name)
+        fresh = _per_call_us(lambda: builder.__wrapped__("ru", **kwargs))
+        cached = _per_call_us(lambda: builder("ru", **kwargs))
+        print(f"{name:<32} | {fresh:>10.1f} | {cached:>10.2f}")
+
+
+if __name__ == "__main__":
+    run()
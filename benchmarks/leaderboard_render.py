@@ -0,0 +1,71 @@
+"""Leaderboard page render: per-call ``get_text().format()`` vs compiled templates.
+
+    python -m benchmarks.leaderboard_render
+
+Renders the title, legend and 10 rows of the weighted leaderboard the way
+``StatsService`` builds them. "format" is the previous path (fallback lookup
+plus ``str.format`` re-parsing the row text per row), "compiled" uses
+``get_template`` as the service does now.
+"""
+from __future__ import annotations
+
+import timeit
+
+from app.locales import LOCALES, DEFAULT_LANG, get_template, get_text
+
+ROWS = [
+    (f"**{i}.**" if i > 3 else "🥇🥈🥉"[i - 1], f"User {i}", 1000 - i * 37, i, i * 2, i * 3)
+    for i in range(1, 11)
+]
+
+
+def _legacy_get_text(key: str, lang: str | None = None) -> str:
+    lang = lang or DEFAULT_LANG
+    if lang not in LOCALES:
+        lang = DEFAULT_LANG
+    texts = LOCALES[lang]
+    if key in texts:
+        return texts[key]
+    return LOCALES[DEFAULT_LANG].get(key, key)
+
+
+def render_format(lang: str) -> str:
+    text = _legacy_get_text("leaderboard_title_weighted", lang)
+    text += "━" * 15 + "\n"
+    text += _legacy_get_text("leaderboard_legend", lang)
+    for medal, name, value, easy, medium, hard in ROWS:
+        text += _legacy_get_text("leaderboard_row_weighted", lang).format(
+            medal=medal, name=name, value=value, easy=easy, medium=medium, hard=hard
+        )
+    return text
+
+
+def render_compiled(lang: str) -> str:
+    text = get_text("leaderboard_title_weighted", lang)
+    text += "━" * 15 + "\n"
+    text += get_text("leaderboard_legend", lang)
+    row_template = get_template("leaderboard_row_weighted", lang)
+    for medal, name, value, easy, medium, hard in ROWS:
+        text += row_template.format(
+            medal=medal, name=name, value=value, easy=easy, medium=medium, hard=hard
+        )
+    return text
+
+
+def _per_call_us(fn) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def run() -> None:
+    print(f"{'lang':<6} | {'format, µs':>10} | {'compiled, µs':>12} | {'speedup':>7}")
+    for lang in ("ru", "en"):
+        assert render_format(lang) == render_compiled(lang)
+        old = _per_call_us(lambda: render_format(lang))
+        new = _per_call_us(lambda: render_compiled(lang))
+        print(f"{lang:<6} | {old:>10.2f} | {new:>12.2f} | {old / new:>6.2f}x")
+
+
+if __name__ == "__main__":
+    run()
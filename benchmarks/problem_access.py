@@ -0,0 +1,88 @@
+"""Per-turn cost of fetching the current problem, by session length.
+
+    python -m benchmarks.problem_access
+
+Compares the ways a training turn has obtained ``problems[idx]``:
+
+- ``json specs``: the original FSM shape — deserialize the JSON list of
+  spec dicts and build a ``Problem`` for every entry, then index;
+- ``packed, full``: decode every 13-byte record of the packed blob;
+- ``packed, random``: ``ProblemSet[idx]`` — decode the one record;
+- ``seeded``: ``SeededProblems[idx]`` — regenerate from the session seed.
+"""
+from __future__ import annotations
+
+import json
+import random
+import timeit
+
+from app.services.problem_codec import (
+    ProblemSet,
+    SeededProblems,
+    decode_problems,
+    encode_problems,
+)
+from app.services.problem_generator import Problem, ProblemGenerator
+from app.utils.constants import Difficulty, TrainingMode
+
+SIZES = (10, 100, 1000)
+DIFFICULTY = Difficulty.HARD
+MODE = TrainingMode.MIXED
+
+
+def _spec(p: Problem) -> dict:
+    return {
+        "first_num": p.first_num,
+        "second_num": p.second_num,
+        "operation": p.operation,
+        "answer": p.answer,
+        "formatted_text": p.formatted_text,
+        "metadata": dict(p.metadata),
+    }
+
+
+def _from_spec(spec: dict) -> Problem:
+    return Problem(
+        int(spec["first_num"]),
+        int(spec["second_num"]),
+        spec["operation"],
+        int(spec["answer"]),
+        formatted_text=spec.get("formatted_text"),
+        metadata=spec.get("metadata"),
+    )
+
+
+def _per_call_us(fn, budget_s: float = 0.2) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = max(1, int(budget_s / (timer.timeit(number) / number)))
+    return min(timer.repeat(repeat=3, number=runs)) / runs * 1e6
+
+
+def run() -> None:
+    seed = 20260101
+    print(f"{'problems':>8} | {'json specs':>11} | {'packed, full':>12} | "
+          f"{'packed, random':>14} | {'seeded':>8}   (µs per turn)")
+    for n in SIZES:
+        problems = ProblemGenerator.generate_problems(
+            DIFFICULTY, MODE, n, rng=random.Random(seed)
+        )
+        as_json = json.dumps([_spec(p) for p in problems], ensure_ascii=False)
+        blob = encode_problems(problems)
+        idx = n // 2
+
+        cases = (
+            lambda: [_from_spec(s) for s in json.loads(as_json)][idx],
+            lambda: decode_problems(blob)[idx],
+            lambda: ProblemSet(blob)[idx],
+            lambda: SeededProblems(seed, DIFFICULTY, MODE, n)[idx],
+        )
+        json_us, full_us, random_us, seeded_us = (_per_call_us(c) for c in cases)
+        print(f"{n:>8} | {json_us:>11.1f} | {full_us:>12.1f} | "
+              f"{random_us:>14.1f} | {seeded_us:>8.1f}")
+        print(f"{'':>8}   stored bytes: json {len(as_json.encode())}, "
+              f"packed {len(blob)}, seeded ~40")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,78 @@
+"""Startup import cost of ``app.bootstrap``, from ``python -X importtime``.
+
+    python -m benchmarks.startup_imports
+
+Each run imports ``app.bootstrap`` in a fresh interpreter, so nothing is
+cached in ``sys.modules``; the median of ``RUNS`` is reported, along with the
+slowest top-level packages (cumulative) and the slowest ``app.*`` modules
+(self time). Modules that only a backup run or the admin stats screen need
+(``LAZY``) must not show up here at all.
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+RUNS = 5
+TOP = 8
+LAZY = ("psutil", "cryptography", "alembic")
+
+# config.py refuses to import without these; no connection is ever made.
+_ENV = {
+    "BOT_TOKEN": "1:benchmark",
+    "DATABASE_URL": "postgresql+asyncpg://bench@localhost/bench",
+    "ADMIN_BACKUP_PASSWORD": "benchmark",
+}
+
+
+def _importtime() -> list[tuple[str, int, int]]:
+    """One fresh-interpreter import: ``(module, self_us, cumulative_us)`` rows."""
+    env = {**os.environ, **{k: os.environ.get(k, v) for k, v in _ENV.items()}}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.bootstrap"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def run() -> None:
+    totals = []
+    packages: dict[str, list[int]] = defaultdict(list)
+    own: dict[str, list[int]] = defaultdict(list)
+    loaded: set[str] = set()
+    for _ in range(RUNS):
+        rows = _importtime()
+        totals.append(sum(self_us for _, self_us, _ in rows))
+        for name, self_us, cumulative_us in rows:
+            loaded.add(name)
+            if "." not in name:
+                packages[name].append(cumulative_us)
+            if name == "app" or name.startswith("app."):
+                own[name].append(self_us)
+
+    print(f"import app.bootstrap: median {statistics.median(totals) / 1000:.0f} ms over {RUNS} runs")
+    print("slowest packages (cumulative):")
+    for name, samples in sorted(packages.items(), key=lambda kv: -statistics.median(kv[1]))[:TOP]:
+        print(f"  {statistics.median(samples) / 1000:8.1f} ms  {name}")
+    print("slowest app modules (self):")
+    for name, samples in sorted(own.items(), key=lambda kv: -statistics.median(kv[1]))[:TOP]:
+        print(f"  {statistics.median(samples) / 1000:8.1f} ms  {name}")
+
+    eager = [name for name in LAZY if name in loaded]
+    print(f"deferred until first use: {', '.join(LAZY)}"
+          + (f" -- but imported at startup: {', '.join(eager)}" if eager else ""))
+    if eager:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+"""Boot-time schema check: Alembic upgrade on every start vs the head fast path.
+
+    DATABASE_URL=postgresql+asyncpg://… python -m benchmarks.startup_migrations
+
+Needs a reachable database; it is migrated to head first. Each sample is a
+fresh interpreter (a real cold start: nothing of Alembic imported yet)
+timing only the schema step. "alembic upgrade" is the previous ``init_db``
+(``command.upgrade(cfg, "head")`` in a thread, which loads the migration
+environment and connects even when there is nothing to do); "fast path" is
+``init_db`` now.
+"""
+from __future__ import annotations
+
+import asyncio
+import statistics
+import subprocess
+import sys
+
+RUNS = 7
+
+_SAMPLE = """
+import asyncio, sys, time
+from app.database import db
+step = db.init_db if sys.argv[1] == "fast" else (lambda: asyncio.to_thread(db._upgrade_to_head))
+started = time.perf_counter()
+asyncio.run(step())
+print(time.perf_counter() - started)
+"""
+
+
+def _sample(variant: str) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", _SAMPLE, variant], capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def run() -> None:
+    from app.database.db import init_db
+
+    asyncio.run(init_db())
+    results = {}
+    for name, variant in (("alembic upgrade", "upgrade"), ("fast path", "fast")):
+        samples = [_sample(variant) for _ in range(RUNS)]
+        results[name] = statistics.median(samples)
+        print(
+            f"{name:>15}: median {results[name] * 1000:.1f} ms "
+            f"(min {min(samples) * 1000:.1f}, max {max(samples) * 1000:.1f}) over {RUNS} boots"
+        )
+    print(f"speedup {results['alembic upgrade'] / results['fast path']:.1f}x")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,94 @@
+"""Answer-variant generation: gauss-and-reject loop vs the bounded sampler.
+
+    python -m benchmarks.variant_sampling
+
+``_legacy_generate_variants`` is the previous implementation, kept here
+verbatim as the baseline. Cases cover the typical render (4 variants around
+a mid-size answer) and the paths where rejection dominates: answers near
+zero with negatives disallowed, and many variants in a narrow spread.
+"""
+from __future__ import annotations
+
+import random
+import timeit
+
+from app.services.problem_generator import ProblemGenerator
+
+CASES = (
+    ("typical: 144, 4 variants", 144, 4, False),
+    ("near zero: 0, 4 variants", 0, 4, False),
+    ("near zero: 1, 4 variants", 1, 4, False),
+    ("narrow: 5, 12 variants", 5, 12, False),
+    ("narrow: 0, 30 variants", 0, 30, False),
+)
+
+
+def _legacy_generate_variants(
+    correct_answer: int,
+    variants_count: int,
+    *,
+    allow_negative: bool = False,
+    rng: random.Random,
+) -> list[tuple[int, bool]]:
+    r = rng
+    variants_count = max(2, int(variants_count))
+    correct_answer = int(correct_answer)
+
+    out: list[tuple[int, bool]] = [(correct_answer, True)]
+    used = {correct_answer}
+
+    sigma = max(2.0, abs(correct_answer) * 0.15)
+
+    attempts = 0
+    while len(out) < variants_count and attempts < 200:
+        attempts += 1
+        candidate = round(r.gauss(correct_answer, sigma))
+        if not allow_negative and candidate < 0:
+            continue
+        if candidate in used:
+            continue
+        used.add(candidate)
+        out.append((candidate, False))
+
+    offset = 1
+    while len(out) < variants_count and offset < 1000:
+        for sign in (1, -1):
+            candidate = correct_answer + sign * offset
+            if not allow_negative and candidate < 0:
+                continue
+            if candidate not in used:
+                used.add(candidate)
+                out.append((candidate, False))
+                if len(out) >= variants_count:
+                    break
+        offset += 1
+
+    r.shuffle(out)
+    return out
+
+
+def _per_call_us(fn) -> float:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def run() -> None:
+    rng = random.Random(0)
+    print(f"{'case':<28} | {'reject loop, µs':>15} | {'sampler, µs':>15}")
+    for label, answer, count, allow_negative in CASES:
+        legacy = _per_call_us(
+            lambda: _legacy_generate_variants(
+                answer, count, allow_negative=allow_negative, rng=rng
+            )
+        )
+        current = _per_call_us(
+            lambda: ProblemGenerator.generate_variants(
+                answer, count, allow_negative=allow_negative, rng=rng
+            )
+        )
+        print(f"{label:<28} | {legacy:>15.1f} | {current:>15.1f}")
+
+
+if __name__ == "__main__":
+    run()
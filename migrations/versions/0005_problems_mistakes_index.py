@@ -0,0 +1,53 @@
+"""Partial index for the "Retry mistakes" read.
+
+``get_session_mistakes`` wants the wrong rows of one session in id order.
+Indexing just ``is_correct = false`` rows keeps the index a fraction of
+``ix_problems_session_id`` (most answers are right). Built concurrently so
+the deploy doesn't block answer writes on a large ``problems`` table.
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0005_problems_mistakes_index"
+down_revision = "0004_favorite_difficulty"
+branch_labels = None
+depends_on = None
+
+
+_INDEX_IS_INVALID = sa.text(
+    "SELECT NOT indisvalid FROM pg_index"
+    " WHERE indexrelid = to_regclass('ix_problems_session_mistakes')"
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # An interrupted CONCURRENTLY build leaves an INVALID index behind,
+        # which IF NOT EXISTS would happily keep: drop it and build again.
+        if op.get_bind().execute(_INDEX_IS_INVALID).scalar():
+            op.drop_index(
+                "ix_problems_session_mistakes",
+                table_name="problems",
+                postgresql_concurrently=True,
+            )
+        op.create_index(
+            "ix_problems_session_mistakes",
+            "problems",
+            ["session_id", "id"],
+            postgresql_where=sa.text("is_correct = false"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_problems_session_mistakes",
+            table_name="problems",
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
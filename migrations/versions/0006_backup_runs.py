@@ -0,0 +1,39 @@
+"""Backup run timings (dump / encrypt / verify) for trend tracking."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0006_backup_runs"
+down_revision = "0005_problems_mistakes_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "backup_runs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("size_bytes", sa.BigInteger(), nullable=False),
+        sa.Column("parts", sa.Integer(), nullable=False),
+        sa.Column("jobs", sa.Integer(), nullable=False),
+        sa.Column("dump_ms", sa.Integer(), nullable=False),
+        sa.Column("encrypt_ms", sa.Integer(), nullable=False),
+        sa.Column("verify_mode", sa.String(), nullable=False),
+        sa.Column("verify_ms", sa.Integer(), nullable=True),
+        sa.Column("verified", sa.Boolean(), nullable=True),
+    )
+    op.create_index("ix_backup_runs_created_at", "backup_runs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_backup_runs_created_at", table_name="backup_runs")
+    op.drop_table("backup_runs")
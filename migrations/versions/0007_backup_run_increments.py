@@ -0,0 +1,24 @@
+"""Backup runs: kind (full / incremental) and the problems watermark they cover."""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0007_backup_run_increments"
+down_revision = "0006_backup_runs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "backup_runs",
+        sa.Column("kind", sa.String(), nullable=False, server_default="full"),
+    )
+    op.add_column("backup_runs", sa.Column("last_problem_id", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("backup_runs", "last_problem_id")
+    op.drop_column("backup_runs", "kind")
@@ -0,0 +1,27 @@
+"""Backup runs: record the pg_snapshot they cover instead of a problems id.
+
+Increments now export the rows the previous run's snapshot didn't see; an
+id watermark missed late commits and updates. Recorded watermarks can't be
+turned into snapshots, so the next increment after the upgrade takes a full
+backup.
+"""
+from __future__ import annotations
+
+import sqlalchemy as sa
+from alembic import op
+
+
+revision = "0008_backup_run_snapshots"
+down_revision = "0007_backup_run_increments"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("backup_runs", sa.Column("snapshot", sa.String(), nullable=True))
+    op.drop_column("backup_runs", "last_problem_id")
+
+
+def downgrade() -> None:
+    op.add_column("backup_runs", sa.Column("last_problem_id", sa.Integer(), nullable=True))
+    op.drop_column("backup_runs", "snapshot")
@@ -0,0 +1,91 @@
+"""Conformance of the NumPy batch generator against ProblemGenerator."""
+from __future__ import annotations
+
+import random
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from benchmarks.batch_generator import generate_batch  # noqa: E402
+from app.services.problem_codec import OPERATIONS  # noqa: E402
+from app.services.problem_generator import ProblemGenerator  # noqa: E402
+from app.utils.constants import Difficulty, TrainingMode  # noqa: E402
+
+N = 20_000
+BINS = 20
+# Total-variation distance between two 20k-sample histograms of the same
+# distribution sits around 0.01-0.02; a wrong range or bias shows up as 0.1+.
+MAX_TVD = 0.05
+
+SINGLE_OP_MODES = (
+    TrainingMode.ADDITION_ONLY,
+    TrainingMode.SUBTRACTION_ONLY,
+    TrainingMode.MULTIPLICATION_ONLY,
+    TrainingMode.DIVISION_ONLY,
+    TrainingMode.DIVISION_REMAINDER,
+    TrainingMode.POWER_ONLY,
+    TrainingMode.SQRT_ONLY,
+)
+
+
+def _tvd(x: np.ndarray, y: np.ndarray) -> float:
+    lo = min(x.min(), y.min())
+    hi = max(x.max(), y.max())
+    edges = np.unique(np.linspace(lo, hi + 1, BINS + 1).astype(np.int64))
+    hx, _ = np.histogram(x, bins=edges)
+    hy, _ = np.histogram(y, bins=edges)
+    return 0.5 * np.abs(hx / len(x) - hy / len(y)).sum()
+
+
+def _scalar_columns(difficulty, mode):
+    problems = ProblemGenerator.generate_problems(
+        difficulty, mode, N, rng=random.Random(17)
+    )
+    return {
+        "first_num": np.array([p.first_num for p in problems]),
+        "second_num": np.array([p.second_num for p in problems]),
+        "answer": np.array([p.answer for p in problems]),
+        "op": np.array([OPERATIONS.index(p.operation) for p in problems]),
+    }
+
+
+@pytest.mark.parametrize("difficulty", list(Difficulty))
+@pytest.mark.parametrize("mode", SINGLE_OP_MODES)
+def test_batch_histograms_match_scalar_path(mode, difficulty):
+    scalar = _scalar_columns(difficulty, mode)
+    batch = generate_batch(difficulty, mode, N, rng=np.random.default_rng(17))
+    for column in ("first_num", "second_num", "answer"):
+        assert _tvd(getattr(batch, column), scalar[column]) < MAX_TVD, column
+
+
+def test_mixed_mode_op_mix_matches_scalar_path():
+    scalar = _scalar_columns(Difficulty.MEDIUM, TrainingMode.MIXED)
+    batch = generate_batch(
+        Difficulty.MEDIUM, TrainingMode.MIXED, N, rng=np.random.default_rng(17)
+    )
+    ours = np.bincount(batch.op, minlength=len(OPERATIONS)) / N
+    theirs = np.bincount(scalar["op"], minlength=len(OPERATIONS)) / N
+    assert 0.5 * np.abs(ours - theirs).sum() < MAX_TVD
+
+
+def test_batch_rows_are_valid_problems_and_pack_into_problem_set():
+    batch = generate_batch(
+        Difficulty.HARD, TrainingMode.MIXED, 500, rng=np.random.default_rng(5)
+    )
+    problems = batch.to_problems()
+    for p in problems:
+        if p.operation == "÷r":
+            assert p.first_num == p.second_num * p.answer + p.metadata["remainder"]
+            assert 1 <= p.metadata["remainder"] < p.second_num
+        elif p.operation == "÷":
+            assert p.first_num == p.second_num * p.answer
+    packed = batch.to_problem_set()
+    assert len(packed) == 500
+    assert packed[123] == problems[123] == batch.problem(123)
+
+
+def test_batch_is_reproducible_from_seed():
+    a = generate_batch(Difficulty.EASY, TrainingMode.MIXED, 100, rng=np.random.default_rng(1))
+    b = generate_batch(Difficulty.EASY, TrainingMode.MIXED, 100, rng=np.random.default_rng(1))
+    assert a.to_problem_set() == b.to_problem_set()
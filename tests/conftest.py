@@ -79,6 +79,19 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def _reset_anchor_edit_cache():
+    """Anchor edits are deduplicated per (chat_id, message_id) and problem sets
+    are cached per session_id process-wide; tests reuse the same fake ids —
+    start every test with empty caches."""
+    from app.services import session_state
+    from app.utils import ui
+
+    ui._edit_slots.clear()
+    session_state._problem_cache.clear()
+    yield
+
+
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
@@ -8,6 +8,8 @@ import pytest
 
 from app.database.db import (
     complete_daily_attempt,
+    create_training_session,
+    finalize_session,
     get_daily_leaderboard,
     get_or_create_daily_attempt,
     get_or_create_daily_challenge,
@@ -176,3 +178,62 @@ async def test_get_daily_leaderboard_pagination(db):
     assert len(page2) == 2 and has_next2 is True
     page3, has_next3 = await get_daily_leaderboard(d, limit=2, offset=4)
     assert len(page3) == 1 and has_next3 is False
+
+
+@pytest.mark.asyncio
+async def test_finalize_session_completes_session_and_attempt_together(db):
+    user, _ = await get_or_create_user(telegram_id=8801, username="fin", first_name="F")
+    attempt, _ = await get_or_create_daily_attempt(user.id, _fresh_date())
+    session = await create_training_session(8801, "hard", "mixed", 10)
+
+    summary = await finalize_session(
+        session.id, 7, 3, daily_attempt_id=attempt.id, total_time_ms=42_000
+    )
+
+    assert summary.current_streak == 1
+    assert summary.max_streak == 1
+    assert summary.already_completed is False
+    from sqlalchemy import select
+    from app.database.db import async_session_maker
+    from app.database.models import DailyChallengeAttempt, TrainingSession
+
+    async with async_session_maker() as s:
+        done = await s.get(TrainingSession, session.id)
+        finished = (
+            await s.execute(
+                select(DailyChallengeAttempt).where(DailyChallengeAttempt.id == attempt.id)
+            )
+        ).scalar_one()
+    assert done.completed is True
+    assert (finished.correct, finished.total_time_ms) == (7, 42_000)
+    assert finished.completed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_finalize_session_twice_does_not_double_count(db):
+    await get_or_create_user(telegram_id=8802, username="twice", first_name="T")
+    session = await create_training_session(8802, "easy", "mixed", 5)
+
+    await finalize_session(session.id, 4, 1)
+    again = await finalize_session(session.id, 4, 1)
+
+    assert again.already_completed is True
+    assert again.current_streak == 1
+    from app.database.db import get_user_stats
+
+    stats = await get_user_stats(8802)
+    assert (stats["correct"], stats["incorrect"], stats["total"]) == (4, 1, 5)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_finalizes_keep_every_counter_update(db):
+    """The locked read serializes finishes of the same user's sessions."""
+    await get_or_create_user(telegram_id=8803, username="race", first_name="R")
+    sessions = [await create_training_session(8803, "easy", "mixed", 5) for _ in range(4)]
+
+    await asyncio.gather(*(finalize_session(s.id, 3, 2) for s in sessions))
+
+    from app.database.db import get_user_stats
+
+    stats = await get_user_stats(8803)
+    assert (stats["correct"], stats["incorrect"]) == (12, 8)
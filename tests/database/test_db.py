@@ -1,4 +1,9 @@
 """Tests for app.database.db."""
+import asyncio
+import time
+from pathlib import Path
+from unittest.mock import patch
+
 import pytest
 
 from app.database.db import (
@@ -12,6 +17,9 @@ from app.database.db import (
     complete_training_session,
     get_top_users,
     get_user_stats,
+    get_backup_runs,
+    get_backup_base,
+    record_backup_run,
 )
 
 
@@ -122,8 +130,9 @@ async def test_create_and_complete_training_session(db):
     assert session.total_problems == 5
     assert session.completed is False
 
-    await complete_training_session(session.id, correct=4, incorrect=1)
+    streak = await complete_training_session(session.id, correct=4, incorrect=1)
     stats = await get_user_stats(444)
+    assert streak == stats["current_streak"]
     assert stats["correct"] == 4
     assert stats["incorrect"] == 1
     assert stats["total"] == 5
@@ -150,3 +159,89 @@ async def test_get_top_users_after_training(db):
 @pytest.mark.asyncio
 async def test_get_user_stats_empty_for_unknown(db):
     assert await get_user_stats(99999) == {}
+
+
+@pytest.mark.asyncio
+async def test_record_backup_run_is_listed_newest_first(db):
+    await record_backup_run("old.dump.enc", 10, 1, 1, 100, 20, "off")
+    await record_backup_run("new.dump.enc", 2 << 30, 46, 4, 900, 300, "list", 50, True)
+    runs = await get_backup_runs(2)
+    names = [r.name for r in runs]
+    assert names.index("new.dump.enc") < names.index("old.dump.enc")
+    new = runs[names.index("new.dump.enc")]
+    assert (new.size_bytes, new.parts, new.verify_ms, new.verified) == (2 << 30, 46, 50, True)
+    assert runs[names.index("old.dump.enc")].verified is None
+
+
+@pytest.mark.asyncio
+async def test_backup_base_is_the_newest_run_with_a_snapshot(db):
+    await record_backup_run("full.dump.enc", 10, 1, 1, 100, 20, "off", snapshot="40:40:")
+    await record_backup_run("incr.problems.enc", 5, 1, 1, 10, 2, "off",
+                            kind="incremental", snapshot="55:57:55")
+    await record_backup_run("plain.dump.enc", 10, 1, 1, 100, 20, "off")
+    assert await get_backup_base() == ("incr.problems.enc", "55:57:55")
+
+
+def test_schema_head_matches_the_migration_scripts():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    from app.database.db import SCHEMA_HEAD
+
+    cfg = Config(str(Path(__file__).resolve().parents[2] / "alembic.ini"))
+    assert ScriptDirectory.from_config(cfg).get_current_head() == SCHEMA_HEAD
+
+
+@pytest.mark.asyncio
+async def test_init_db_skips_alembic_when_already_at_head(db):
+    with patch("app.database.db._upgrade_to_head") as upgrade:
+        await init_db()
+    upgrade.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_replicas_booting_together_migrate_once(db):
+    """Both see an old schema; the advisory lock lets one upgrade while the
+    other waits, re-checks and finds the work done."""
+    from app.database.db import SCHEMA_HEAD
+
+    revisions = {"0006_backup_runs"}
+    upgrades = []
+
+    async def current(conn):
+        return set(revisions)
+
+    def upgrade():
+        upgrades.append(1)
+        time.sleep(0.2)  # long enough for the other replica to queue on the lock
+        revisions.clear()
+        revisions.add(SCHEMA_HEAD)
+
+    with patch("app.database.db._schema_revisions", side_effect=current), \
+            patch("app.database.db._upgrade_to_head", side_effect=upgrade):
+        await asyncio.gather(init_db(), init_db())
+
+    assert len(upgrades) == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_boot_keeps_the_lock_until_alembic_returns(db):
+    """Cancelling init_db mid-upgrade waits for the Alembic thread before
+    unlocking, so another replica can't start migrating alongside it."""
+    finished = []
+
+    async def current(conn):
+        return {"0006_backup_runs"}
+
+    def upgrade():
+        time.sleep(0.3)
+        finished.append(True)
+
+    with patch("app.database.db._schema_revisions", side_effect=current), \
+            patch("app.database.db._upgrade_to_head", side_effect=upgrade):
+        boot = asyncio.create_task(init_db())
+        await asyncio.sleep(0.1)
+        boot.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await boot
+        assert finished == [True]
@@ -6,6 +6,7 @@ import pytest
 
 from app.database.db import (
     create_training_session,
+    discard_problem_shown,
     get_avg_problem_time,
     get_or_create_user,
     get_session_mistakes,
@@ -59,6 +60,16 @@ async def test_record_problem_answered_updates_correctness(db):
     assert all(m.id != pid for m in mistakes)
 
 
+@pytest.mark.asyncio
+async def test_discard_problem_shown_removes_only_that_row(db):
+    sid = await _make_session(10004)
+    kept = await record_problem_shown(sid, 1, 1, "+", 2)
+    dropped = await record_problem_shown(sid, 2, 2, "+", 4)
+    await discard_problem_shown(dropped)
+
+    assert [m.id for m in await get_session_mistakes(sid)] == [kept]
+
+
 @pytest.mark.asyncio
 async def test_get_session_mistakes_returns_only_incorrect(db):
     sid = await _make_session(10003)
@@ -82,6 +93,44 @@ async def test_get_session_mistakes_empty_for_perfect_session(db):
     assert await get_session_mistakes(sid) == []
 
 
+@pytest.mark.asyncio
+async def test_mistakes_index_is_declared_on_the_model(db):
+    """Otherwise the next ``alembic revision --autogenerate`` drops it."""
+    from alembic.autogenerate import compare_metadata
+    from alembic.migration import MigrationContext
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from app.config import DATABASE_URL
+    from app.database.models import Base
+
+    engine = create_async_engine(DATABASE_URL, poolclass=NullPool)
+    async with engine.connect() as conn:
+        diff = await conn.run_sync(
+            lambda sync: compare_metadata(MigrationContext.configure(sync), Base.metadata)
+        )
+    await engine.dispose()
+    assert not [d for d in diff if "ix_problems_session_mistakes" in repr(d)]
+
+
+@pytest.mark.asyncio
+async def test_get_session_mistakes_can_use_partial_index(db):
+    from sqlalchemy import false, select, text
+    from app.database.db import async_session_maker
+    from app.database.models import Problem
+
+    stmt = (
+        select(Problem.id)
+        .where(Problem.session_id == 1, Problem.is_correct == false())
+        .order_by(Problem.id)
+    )
+    async with async_session_maker() as session:
+        await session.execute(text("SET LOCAL enable_seqscan = off"))
+        compiled = stmt.compile(compile_kwargs={"literal_binds": True})
+        rows = (await session.execute(text(f"EXPLAIN {compiled}"))).scalars().all()
+    assert "ix_problems_session_mistakes" in "\n".join(rows)
+
+
 @pytest.mark.asyncio
 async def test_get_avg_problem_time_none_when_no_data(db):
     await get_or_create_user(telegram_id=10005, username="t", first_name="T")
@@ -0,0 +1,73 @@
+"""Tests for the admin backup download: split uploads + flood-wait handling."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+
+from app.config import ADMIN_BACKUP_PASSWORD
+from app.handlers.admin import _send_backup_file, admin_download_backup_process
+
+
+def _flood(seconds: int) -> TelegramRetryAfter:
+    return TelegramRetryAfter(method=MagicMock(), message="Too Many Requests", retry_after=seconds)
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_is_slept_out_and_the_upload_retried(tmp_path):
+    part = tmp_path / "b.dump.enc.001"
+    part.write_bytes(b"x")
+    bot = MagicMock()
+    bot.send_document = AsyncMock(side_effect=[_flood(7), _flood(3), None])
+    with patch("app.handlers.admin.asyncio.sleep", new_callable=AsyncMock) as sleep:
+        await _send_backup_file(bot, 1, part, "caption")
+    assert [c.args[0] for c in sleep.await_args_list] == [7, 3]
+    assert bot.send_document.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_persistent_flood_wait_gives_up(tmp_path):
+    part = tmp_path / "b.dump.enc"
+    part.write_bytes(b"x")
+    bot = MagicMock()
+    bot.send_document = AsyncMock(side_effect=_flood(1))
+    with patch("app.handlers.admin.asyncio.sleep", new_callable=AsyncMock), \
+            pytest.raises(TelegramRetryAfter):
+        await _send_backup_file(bot, 1, part)
+    assert bot.send_document.await_count == 5
+
+
+@pytest.mark.asyncio
+async def test_download_sends_parts_in_order_then_the_manifest(tmp_path):
+    base = tmp_path / "bot_backup_20260101_000000.dump.enc"
+    names = [f"{base.name}.001", f"{base.name}.002"]
+    digests = {names[0]: "1" * 64, names[1]: "2" * 64}
+    for name in names:
+        (tmp_path / name).write_bytes(b"x")
+    (tmp_path / f"{base.name}.sha256").write_text(
+        "".join(f"{digest}  {name}\n" for name, digest in digests.items())
+    )
+    message = MagicMock()
+    message.from_user.id = 1
+    message.chat.id = 99
+    message.text = ADMIN_BACKUP_PASSWORD
+    message.delete = AsyncMock()
+    message.answer = AsyncMock()
+    message.bot.send_document = AsyncMock()
+    state = MagicMock()
+    state.clear = AsyncMock()
+    service = MagicMock()
+    service.recent_or_new_backup = AsyncMock(return_value=base)
+
+    with patch("app.handlers.admin.is_admin", return_value=True), patch(
+        "app.handlers.admin.get_user_language", new_callable=AsyncMock, return_value="en"
+    ):
+        await admin_download_backup_process(message, state, service)
+
+    sent = message.bot.send_document.await_args_list
+    assert [c.args[1].path.name for c in sent] == [*names, f"{base.name}.sha256"]
+    for number, (call, name) in enumerate(zip(sent, names), 1):
+        assert f"({number}/2)" in call.kwargs["caption"]
+        assert digests[name] in call.kwargs["caption"]
+    state.clear.assert_awaited_once()
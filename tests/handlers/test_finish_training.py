@@ -10,6 +10,7 @@ from aiogram.types import CallbackQuery
 
 from app.database.db import (
     complete_training_session,  # noqa: F401  (re-exported sanity)
+    SessionSummary,
     create_training_session,
     get_or_create_daily_attempt,
     get_or_create_user,
@@ -43,6 +44,7 @@ def _make_state(data: dict):
     s = MagicMock()
     s.get_data = AsyncMock(return_value=data)
     s.update_data = AsyncMock()
+    s.set_data = AsyncMock()
     s.set_state = AsyncMock()
     s.clear = AsyncMock()
     return s
@@ -180,3 +182,47 @@ async def test_finish_training_daily_handles_missing_started_at(db):
     assert updated.completed_at is not None
     assert updated.correct == 10
     assert updated.total_time_ms == 0
+
+
+@pytest.mark.asyncio
+async def test_finish_training_renders_summary_from_fsm_timings():
+    """Average, slowest problems and the streak need no DB reads: the
+    timings come from the FSM aggregates and the streak from the completing
+    write."""
+    from app.services.problem_codec import ProblemSet
+    from app.services.problem_generator import make_problem
+    from app.services.session_state import remember_problems
+
+    problems = ProblemSet.from_problems(
+        [make_problem(2, 3, "+", 5), make_problem(7, 8, "×", 56),
+         make_problem(9, 0, "√", 3), make_problem(12, 2, "^", 144)]
+    )
+    remember_problems(901, problems)
+    state = _make_state(
+        {
+            "lang": "en",
+            "session_id": 901,
+            "problem_count": 4,
+            "idx": 3,
+            "correct": 3,
+            "incorrect": 1,
+            # Answers of 1, 8 and 5 s; problem 2 went untimed.
+            "answer_time_sum": 14.0,
+            "timed_answers": 3,
+            "slowest": [[1, 8.0], [3, 5.0], [0, 1.0]],
+        }
+    )
+    with patch(
+        "app.handlers.training.finalize_session",
+        new_callable=AsyncMock,
+        return_value=SessionSummary(current_streak=6, max_streak=9),
+    ), patch("app.handlers.training.safe_edit", new_callable=AsyncMock) as edit:
+        await finish_training(_make_callback(), state)
+
+    body = edit.call_args.args[1]
+    assert "🔥 6 d" in body
+    assert "4.7s" in body  # (1 + 8 + 5) / 3 — the untimed answer is left out
+    slowest = body.split("Slowest")[1]
+    assert slowest.index("7 × 8") < slowest.index("12²") < slowest.index("2 + 3")
+    written = state.set_data.call_args.args[0]
+    assert (written["answer_time_sum"], written["timed_answers"], written["slowest"]) == (0.0, 0, [])
@@ -7,6 +7,8 @@ import pytest
 
 from app.handlers.training import TrainingStates, quick_start_handler
 from app.keyboards.callbacks import MenuCB
+from app.services.session_state import SessionState
+from app.utils.constants import DIFFICULTY_CONFIG, Difficulty
 
 
 @pytest.fixture
@@ -61,9 +63,6 @@ async def test_quick_start_launches_session_with_favorite(callback, state):
         "app.handlers.training.get_user_favorite",
         new_callable=AsyncMock,
         return_value=("mult", "hard"),
-    ), patch(
-        "app.handlers.training.ProblemGenerator.generate_problems",
-        return_value=[MagicMock(), MagicMock(), MagicMock()],
     ), patch(
         "app.handlers.training.create_training_session",
         new_callable=AsyncMock,
@@ -81,25 +80,10 @@ async def test_quick_start_launches_session_with_favorite(callback, state):
 
 
 @pytest.mark.asyncio
-async def test_quick_start_persists_problems_as_specs_not_objects(callback, state):
-    """All FSM writers must store JSON-safe spec dicts so RedisStorage works
-    and so readers' ``_specs_to_problems(data["problems"])`` doesn't crash.
-
-    Regression guard: if a future patch reverts to ``problems=problems``
-    (raw Problem list), this test fires.
+async def test_quick_start_persists_seed_not_problems(callback, state):
+    """Fresh sessions store only a seed and a count — constant-size FSM data
+    that ``SessionState`` turns back into the same problems on every turn.
     """
-    from app.services.problem_generator import Problem
-
-    real_problems = [
-        Problem(
-            first_num=2,
-            second_num=3,
-            operation="×",
-            answer=6,
-            formatted_text="2 × 3",
-            metadata={},
-        )
-    ]
     session = MagicMock()
     session.id = 11
     with patch(
@@ -110,9 +94,6 @@ async def test_quick_start_persists_problems_as_specs_not_objects(callback, stat
         "app.handlers.training.get_user_favorite",
         new_callable=AsyncMock,
         return_value=("mult", "easy"),
-    ), patch(
-        "app.handlers.training.ProblemGenerator.generate_problems",
-        return_value=real_problems,
     ), patch(
         "app.handlers.training.create_training_session",
         new_callable=AsyncMock,
@@ -123,14 +104,15 @@ async def test_quick_start_persists_problems_as_specs_not_objects(callback, stat
         await quick_start_handler(callback, MenuCB(action="quick_start"), state)
 
     kwargs = state.update_data.call_args.kwargs
-    stored = kwargs["problems"]
-    assert isinstance(stored, list) and stored, "problems list missing or empty"
-    assert all(isinstance(item, dict) for item in stored), (
-        f"Quick Start stored {type(stored[0]).__name__}, expected dict specs"
-    )
-    # And the spec keys are the ones _specs_to_problems consumes.
-    required = {"first_num", "second_num", "operation", "answer", "formatted_text"}
-    assert required <= set(stored[0].keys())
+    assert "problems" not in kwargs
+    assert isinstance(kwargs["problem_seed"], int)
+    assert kwargs["problem_count"] == DIFFICULTY_CONFIG[Difficulty.EASY]["examples_count"]
+
+    first = SessionState.from_data(kwargs).problems
+    again = SessionState.from_data(kwargs).problems
+    assert len(first) == kwargs["problem_count"]
+    assert all(p.operation == "×" for p in first)
+    assert [p.formatted_text for p in first] == [p.formatted_text for p in again]
 
 
 @pytest.mark.asyncio
@@ -147,9 +129,6 @@ async def test_quick_start_defaults_to_medium_when_favorite_difficulty_is_null(
         "app.handlers.training.get_user_favorite",
         new_callable=AsyncMock,
         return_value=("mult", None),
-    ), patch(
-        "app.handlers.training.ProblemGenerator.generate_problems",
-        return_value=[MagicMock(), MagicMock()],
     ), patch(
         "app.handlers.training.create_training_session",
         new_callable=AsyncMock,
@@ -52,3 +52,139 @@ def test_result_keyboard_shows_retry_when_mistakes():
     flat = [b for row in kb.inline_keyboard for b in row]
     texts = [b.text for b in flat]
     assert any("Перерешать" in t for t in texts)
+
+
+def _viewing_results_state(data: dict):
+    """Real FSMContext over MemoryStorage: retry stores its problem set under
+    a second destiny. ``set_data`` is wrapped so tests can read the writes."""
+    from aiogram.fsm.context import FSMContext
+    from aiogram.fsm.storage.base import StorageKey
+    from aiogram.fsm.storage.memory import MemoryStorage
+
+    state = FSMContext(
+        storage=MemoryStorage(), key=StorageKey(bot_id=1, chat_id=2, user_id=30002)
+    )
+    state.get_data = AsyncMock(return_value=data)
+    state.set_data = AsyncMock()
+    state.set_state = AsyncMock()
+    return state
+
+
+def _retry_callback():
+    from unittest.mock import MagicMock
+
+    from aiogram.types import CallbackQuery
+
+    cb = MagicMock(spec=CallbackQuery)
+    cb.from_user = MagicMock(id=30002)
+    cb.message = MagicMock()
+    cb.answer = AsyncMock()
+    return cb
+
+
+@pytest.mark.asyncio
+async def test_retry_starts_from_fsm_mistakes_without_reading_problems():
+    from unittest.mock import MagicMock, patch
+
+    from app.handlers.training import retry_mistakes_handler
+    from app.services.problem_codec import ProblemSet
+    from app.services.problem_generator import make_problem
+
+    packed = ProblemSet.from_problems([make_problem(7, 8, "×", 56), make_problem(9, 3, "−", 6)])
+    state = _viewing_results_state(
+        {"lang": "en", "session_id": 41, "mode": "mixed", "difficulty": "easy",
+         "session_kind": "normal", "retry_problems": packed.blob}
+    )
+    with patch(
+        "app.handlers.training.get_session_mistakes", new_callable=AsyncMock
+    ) as read_mistakes, patch(
+        "app.handlers.training.create_training_session",
+        new_callable=AsyncMock,
+        return_value=MagicMock(id=42),
+    ), patch(
+        "app.handlers.training.record_problem_shown", new_callable=AsyncMock, return_value=1
+    ), patch("app.handlers.training.safe_edit", new_callable=AsyncMock) as edit:
+        await retry_mistakes_handler(_retry_callback(), MagicMock(), state)
+
+    read_mistakes.assert_not_awaited()
+    assert "7 × 8" in edit.call_args.args[1]
+    written = state.set_data.call_args_list[-1].args[0]
+    assert written["session_kind"] == "retry"
+    assert written["problem_count"] == 2
+    assert written["retry_problems"] is None
+
+
+@pytest.mark.asyncio
+async def test_retry_falls_back_to_problem_rows_when_fsm_has_none(db):
+    from unittest.mock import MagicMock, patch
+
+    from app.handlers.training import retry_mistakes_handler
+
+    await get_or_create_user(telegram_id=30002, username="r2", first_name="R")
+    original = await create_training_session(30002, "easy", "add", total_problems=2)
+    bad = await record_problem_shown(original.id, 4, 5, "+", 9)
+    await record_problem_answered(bad, user_answer=8, is_correct=False)
+
+    state = _viewing_results_state(
+        {"lang": "en", "session_id": original.id, "mode": "add", "difficulty": "easy"}
+    )
+    with patch("app.handlers.training.safe_edit", new_callable=AsyncMock) as edit:
+        await retry_mistakes_handler(_retry_callback(), MagicMock(), state)
+
+    assert "4 + 5" in edit.call_args.args[1]
+
+
+async def _finish_with_a_wrong_last_answer(data: dict):
+    """Answer problem 2 of 3 wrong and finish; returns the FSM write and the
+    ``get_session_mistakes`` mock."""
+    from unittest.mock import MagicMock, patch
+
+    from app.database.db import SessionSummary
+    from app.handlers.training import _record_and_advance
+    from app.services.problem_codec import ProblemSet
+    from app.services.problem_generator import make_problem
+    from app.services.session_state import remember_problems
+
+    problems = ProblemSet.from_problems(
+        [make_problem(1, 1, "+", 2), make_problem(2, 2, "+", 4), make_problem(3, 3, "+", 6)]
+    )
+    remember_problems(51, problems)
+    state = _viewing_results_state(
+        {"lang": "en", "session_id": 51, "problem_count": 3, "idx": 2,
+         "correct": 1, "incorrect": 1, **data}
+    )
+    with patch(
+        "app.handlers.training.finalize_session",
+        new_callable=AsyncMock,
+        return_value=SessionSummary(current_streak=1, max_streak=1),
+    ), patch(
+        "app.handlers.training.get_session_mistakes", new_callable=AsyncMock
+    ) as read_mistakes, patch("app.handlers.training.safe_edit", new_callable=AsyncMock):
+        await _record_and_advance(_retry_callback(), state, user_answer=0, skipped=False)
+    return state.set_data.call_args.args[0], read_mistakes
+
+
+@pytest.mark.asyncio
+async def test_finish_packs_the_recorded_mistakes_for_retry():
+    from app.services.problem_codec import ProblemSet
+
+    written, read_mistakes = await _finish_with_a_wrong_last_answer({"mistake_mask": 0b001})
+
+    read_mistakes.assert_not_awaited()
+    assert written["mistake_mask"] == 0
+    retry = ProblemSet(written["retry_problems"])
+    assert [p.formatted_text for p in retry] == ["1 + 1", "3 + 3"]
+
+
+@pytest.mark.asyncio
+async def test_finish_leaves_retry_to_the_problem_rows_without_a_mask():
+    """A session begun before the mask was kept can't pack its first
+    mistake: retry falls back to the table, and finish still doesn't read it."""
+    written, read_mistakes = await _finish_with_a_wrong_last_answer(
+        {"mistakes": [0], "answer_times": [2.0, 1.0]}
+    )
+
+    read_mistakes.assert_not_awaited()
+    assert written["retry_problems"] is None
+    # Per-answer lists left by an older session are dropped, not carried on.
+    assert "mistakes" not in written and "answer_times" not in written
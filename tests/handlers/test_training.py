@@ -8,13 +8,19 @@ import pytest
 from aiogram.types import CallbackQuery
 
 from app.handlers.training import (
+    SLOWEST_SHOWN,
     TrainingStates,
+    _record_answer_time,
     _record_and_advance,
     abort_training_handler,
+    handle_answer,
     select_difficulty_handler,
     start_training_handler,
 )
 from app.keyboards.callbacks import MenuCB, TrainingCB
+from app.services.problem_codec import ProblemSet
+from app.services.problem_generator import make_problem
+from app.services.session_state import remember_problems
 
 
 @pytest.fixture
@@ -88,24 +94,20 @@ async def test_abort_training_handler_clears_state(callback, state):
 # ---------------------------------------------------------------------------
 
 
-def _problem_spec(answer: int = 75) -> dict:
-    """Match the FSM-stored shape (dict spec, Redis-safe)."""
-    return {
-        "first_num": 5,
-        "second_num": 15,
-        "operation": "×",
-        "answer": answer,
-        "formatted_text": "5 × 15",
-        "metadata": {},
-    }
+def _problem(answer: int = 75):
+    return make_problem(5, 15, "×", answer)
 
 
-def _fsm_with(answer: int, session_kind: str = "normal"):
+def _fsm_with(answer: int, session_kind: str = "normal", *extra_answers: int):
+    """Counters in FSM data; the problem set sits in the per-process cache."""
+    problems = ProblemSet.from_problems(_problem(a) for a in (answer, *extra_answers))
+    remember_problems(5, problems)
     state = MagicMock()
     state.get_data = AsyncMock(
         return_value={
             "lang": "ru",
-            "problems": [_problem_spec(answer)],
+            "session_id": 5,
+            "problem_count": len(problems),
             "idx": 0,
             "correct": 0,
             "incorrect": 0,
@@ -116,6 +118,7 @@ def _fsm_with(answer: int, session_kind: str = "normal"):
         }
     )
     state.update_data = AsyncMock()
+    state.set_data = AsyncMock()
     state.set_state = AsyncMock()
     state.clear = AsyncMock()
     return state
@@ -153,36 +156,6 @@ async def test_wrong_answer_feedback_does_not_reveal_correct_answer(session_kind
     )
 
 
-def test_problem_spec_roundtrip_preserves_all_fields():
-    """specs -> Problem -> specs is the FSM serialisation pivot.
-
-    Every writer calls ``_problems_to_specs`` before ``state.update_data``;
-    every reader calls ``_specs_to_problems`` after ``state.get_data``. If
-    either direction drops a field, ``show_problem`` renders garbage. This
-    test pins both halves.
-    """
-    from app.handlers.training import _problem_to_spec, _spec_to_problem
-    from app.services.problem_generator import Problem
-
-    original = Problem(
-        first_num=12,
-        second_num=3,
-        operation="÷r",
-        answer=4,
-        formatted_text="12 ÷ 3",
-        metadata={"remainder": 0, "extra": "kept"},
-    )
-    spec = _problem_to_spec(original)
-    rebuilt = _spec_to_problem(spec)
-    assert rebuilt.first_num == 12
-    assert rebuilt.second_num == 3
-    assert rebuilt.operation == "÷r"
-    assert rebuilt.answer == 4
-    assert rebuilt.formatted_text == "12 ÷ 3"
-    assert rebuilt.metadata.get("remainder") == 0
-    assert rebuilt.metadata.get("extra") == "kept"
-
-
 @pytest.mark.asyncio
 @pytest.mark.parametrize("session_kind", ["normal", "retry", "daily"])
 async def test_skipped_feedback_does_not_reveal_correct_answer(session_kind):
@@ -201,3 +174,188 @@ async def test_skipped_feedback_does_not_reveal_correct_answer(session_kind):
     assert "42" not in feedback, (
         f"Skip feedback for {session_kind} leaked the correct answer."
     )
+
+
+@pytest.mark.asyncio
+async def test_answer_turn_costs_one_fsm_read_and_one_write():
+    """A mid-session answer: one get_data, one set_data, no update_data/set_state."""
+    state = _fsm_with(75, "normal", 10)
+    state.get_data.return_value.update(mode="mixed", difficulty="easy")
+    cb = _spec_callback()
+    with patch(
+        "app.handlers.training.record_problem_answered", new_callable=AsyncMock
+    ), patch(
+        "app.handlers.training.record_problem_shown",
+        new_callable=AsyncMock,
+        return_value=77,
+    ), patch("app.handlers.training.safe_edit", new_callable=AsyncMock) as edit:
+        await _record_and_advance(cb, state, user_answer=75, skipped=False)
+
+    edit.assert_awaited_once()
+    assert state.get_data.await_count == 1
+    state.set_data.assert_awaited_once()
+    state.update_data.assert_not_awaited()
+    state.set_state.assert_not_awaited()
+    written = state.set_data.call_args.args[0]
+    assert written["idx"] == 1
+    assert written["correct"] == 1
+    assert written["session_streak"] == 1
+    assert written["current_problem_id"] == 77
+
+
+def _mid_session_state():
+    state = _fsm_with(75, "normal", 10)
+    state.get_data.return_value.update(mode="mixed", difficulty="easy", current_problem_id=70)
+    return state
+
+
+@pytest.mark.asyncio
+async def test_answer_turn_edits_while_db_writes_are_in_flight():
+    """The edit must not wait for the DB: it completes only once both writes
+    have started, which would deadlock if they ran after it."""
+    import asyncio
+
+    answered_started, shown_started = asyncio.Event(), asyncio.Event()
+    release = asyncio.Event()
+
+    async def answered(*args, **kwargs):
+        answered_started.set()
+        await release.wait()
+
+    async def shown(*args, **kwargs):
+        shown_started.set()
+        await release.wait()
+        return 77
+
+    async def edit(*args, **kwargs):
+        await answered_started.wait()
+        await shown_started.wait()
+        release.set()
+
+    state = _mid_session_state()
+    with patch("app.handlers.training.record_problem_answered", side_effect=answered), patch(
+        "app.handlers.training.record_problem_shown", side_effect=shown
+    ), patch("app.handlers.training.safe_edit", side_effect=edit):
+        await asyncio.wait_for(
+            _record_and_advance(_spec_callback(), state, user_answer=75, skipped=False), 2
+        )
+
+    assert state.set_data.call_args.args[0]["current_problem_id"] == 77
+
+
+@pytest.mark.asyncio
+async def test_failed_edit_still_persists_the_answer():
+    state = _mid_session_state()
+    with patch(
+        "app.handlers.training.record_problem_answered", new_callable=AsyncMock
+    ) as answered, patch(
+        "app.handlers.training.record_problem_shown", new_callable=AsyncMock, return_value=77
+    ), patch(
+        "app.handlers.training.safe_edit",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("telegram down"),
+    ), pytest.raises(RuntimeError, match="telegram down"):
+        await _record_and_advance(_spec_callback(), state, user_answer=75, skipped=False)
+
+    answered.assert_awaited_once_with(70, user_answer=75, is_correct=True)
+    state.set_data.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failed_write_fails_the_turn_without_advancing():
+    """The edit to problem 2 already went out when the answer write fails:
+    the screen is put back on problem 1 so it agrees with the FSM."""
+    state = _mid_session_state()
+    with patch(
+        "app.handlers.training.record_problem_answered",
+        new_callable=AsyncMock,
+        side_effect=ConnectionError("db down"),
+    ), patch(
+        "app.handlers.training.record_problem_shown", new_callable=AsyncMock, return_value=77
+    ), patch(
+        "app.handlers.training.discard_problem_shown", new_callable=AsyncMock
+    ) as discard, patch(
+        "app.handlers.training.safe_edit", new_callable=AsyncMock
+    ) as edit, pytest.raises(ConnectionError, match="db down"):
+        await _record_and_advance(_spec_callback(), state, user_answer=75, skipped=False)
+
+    state.set_data.assert_not_awaited()
+    fsm_idx = state.get_data.return_value["idx"]
+    on_screen = edit.call_args_list[-1].args[1]
+    assert f"Пример {fsm_idx + 1} / 2" in on_screen
+    assert [c.args[1] for c in edit.call_args_list][0] != on_screen
+    discard.assert_awaited_once_with(77)
+
+
+@pytest.mark.asyncio
+async def test_failed_edit_discards_the_shown_row():
+    """A retried turn inserts its own row: the failed one's mustn't linger."""
+    state = _mid_session_state()
+    with patch(
+        "app.handlers.training.record_problem_answered", new_callable=AsyncMock
+    ), patch(
+        "app.handlers.training.record_problem_shown", new_callable=AsyncMock, return_value=77
+    ), patch(
+        "app.handlers.training.discard_problem_shown", new_callable=AsyncMock
+    ) as discard, patch(
+        "app.handlers.training.safe_edit",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("telegram down"),
+    ), pytest.raises(RuntimeError, match="telegram down"):
+        await _record_and_advance(_spec_callback(), state, user_answer=75, skipped=False)
+
+    discard.assert_awaited_once_with(77)
+
+
+@pytest.mark.asyncio
+async def test_answer_turn_latency_is_recorded():
+    from app.utils.latency import TURN_LATENCY
+
+    TURN_LATENCY.clear()
+    state = _mid_session_state()
+    with patch(
+        "app.handlers.training.record_problem_answered", new_callable=AsyncMock
+    ), patch(
+        "app.handlers.training.record_problem_shown", new_callable=AsyncMock, return_value=77
+    ), patch("app.handlers.training.safe_edit", new_callable=AsyncMock):
+        await _record_and_advance(_spec_callback(), state, user_answer=75, skipped=False)
+
+    assert TURN_LATENCY.summary()["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_double_tap_on_the_same_problem_is_graded_once():
+    """The scheduler runs both taps in turn; the second still carries idx 0
+    and must not be scored against problem 1."""
+    state = _mid_session_state()
+    data = state.get_data.return_value
+    state.get_data = AsyncMock(side_effect=lambda: dict(data))
+    state.set_data = AsyncMock(side_effect=data.update)
+    tap = TrainingCB(action="answer", idx=0, answer=75)
+    first, second = _spec_callback(), _spec_callback()
+    with patch(
+        "app.handlers.training.record_problem_answered", new_callable=AsyncMock
+    ) as answered, patch(
+        "app.handlers.training.record_problem_shown", new_callable=AsyncMock, return_value=77
+    ), patch("app.handlers.training.safe_edit", new_callable=AsyncMock) as edit:
+        await handle_answer(first, tap, state)
+        await handle_answer(second, tap, state)
+
+    answered.assert_awaited_once()
+    edit.assert_awaited_once()
+    assert (data["idx"], data["correct"], data["incorrect"]) == (1, 1, 0)
+    second.answer.assert_awaited_once()
+
+
+def test_answer_time_aggregates_stay_fixed_size():
+    """A long session keeps O(1) timing data in FSM, not a list per answer."""
+    from app.services.session_state import SessionState
+
+    session = SessionState()
+    for idx, seconds in enumerate([3.0, 9.0, 1.0, 7.0, 4.0, 8.0] * 20):
+        _record_answer_time(session, idx, seconds)
+
+    assert session.timed_answers == 120
+    assert session.answer_time_sum == pytest.approx(640.0)
+    assert len(session.slowest) == SLOWEST_SHOWN
+    assert [t for _, t in session.slowest] == [9.0, 9.0, 9.0]
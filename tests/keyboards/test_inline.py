@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import pytest
+from pydantic import ValidationError
 
 from app.keyboards.callbacks import (
     AdminCB,
@@ -293,3 +294,40 @@ class TestTipsMenu:
         kb = InlineKeyboards.tips_menu("ru")
         actions = {cb.action for cb in _unpack_all(kb, TipsCB)}
         assert {"multiplication", "division", "general"} <= actions
+
+
+STATIC_BUILDERS = (
+    ("admin_main_menu", {}),
+    ("difficulty_selection", {}),
+    ("mode_selection", {}),
+    ("mode_selection", {"expanded": True}),
+    ("training_type_controls", {}),
+    ("daily_already_done", {}),
+    ("notification_preset_selection", {}),
+    ("cancel_custom_time", {}),
+    ("tips_menu", {}),
+    ("back_only", {}),
+)
+
+
+@pytest.mark.parametrize("name, kwargs", STATIC_BUILDERS)
+@pytest.mark.parametrize("lang", ["ru", "en"])
+def test_static_keyboards_are_cached_and_match_fresh_build(name, kwargs, lang):
+    builder = getattr(InlineKeyboards, name)
+    first = builder(lang, **kwargs)
+    assert builder(lang, **kwargs) is first
+    fresh = builder.__wrapped__(lang, **kwargs)
+    assert first.model_dump_json(exclude_none=True) == fresh.model_dump_json(exclude_none=True)
+
+
+def test_cached_keyboard_is_read_only():
+    kb = InlineKeyboards.back_only("ru")
+    with pytest.raises(TypeError):
+        kb.inline_keyboard.append([])
+    with pytest.raises(TypeError):
+        kb.inline_keyboard[0].clear()
+    with pytest.raises(ValidationError):
+        kb.inline_keyboard[0][0].text = "changed"
+    with pytest.raises(ValidationError):
+        kb.inline_keyboard = []
+    assert kb.inline_keyboard[0][0].text == InlineKeyboards.back_only("ru").inline_keyboard[0][0].text
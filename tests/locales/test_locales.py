@@ -1,7 +1,16 @@
 """Tests for app.locales."""
 import pytest
 
-from app.locales import get_text, DEFAULT_LANG, LOCALES
+from app.locales import (
+    DEFAULT_LANG,
+    LOCALES,
+    LocaleCatalogError,
+    TextTemplate,
+    _compile,
+    get_template,
+    get_text,
+    validate_catalog,
+)
 
 
 class TestGetText:
@@ -33,6 +42,66 @@ class TestGetText:
         assert "User" in text
 
 
+class TestCompiledCatalog:
+    def test_every_template_renders_like_str_format(self):
+        for lang, texts in LOCALES.items():
+            for key, text in texts.items():
+                template = get_template(key, lang)
+                values = {name: f"<{name}>" for name in template.fields}
+                assert template.format(**values) == text.format(**values), (lang, key)
+
+    def test_missing_key_falls_back_to_default_lang(self):
+        locales = {"ru": {"a": "ру {x}", "b": "только ру"}, "en": {"a": "en {x}"}}
+        texts, templates = _compile(locales)
+        assert texts["en"]["b"] == "только ру"
+        assert templates["en"]["b"] is templates["ru"]["b"]
+
+    def test_template_format_matches_get_text_format(self):
+        assert get_template("welcome", "en").format(name="User") == get_text(
+            "welcome", "en"
+        ).format(name="User")
+        assert get_template("main_menu", "xx").format() == get_text("main_menu", DEFAULT_LANG)
+        assert get_template("nonexistent_key_xyz", "ru").format() == "nonexistent_key_xyz"
+
+    def test_template_escapes_percent_and_braces(self):
+        template = TextTemplate("{acc}% of {{total}}")
+        assert template.format(acc=95) == "95% of {total}"
+
+    def test_template_with_format_spec_uses_format_map(self):
+        assert TextTemplate("{value:.1f}s").format(value=4.25) == "4.2s"
+
+    def test_template_ignores_extra_values(self):
+        assert TextTemplate("{rank}/{total}").format(rank=1, total=9, unused=0) == "1/9"
+
+    def test_template_missing_value_raises(self):
+        with pytest.raises(TypeError, match="total"):
+            TextTemplate("{rank}/{total}").format(rank=1)
+
+    def test_template_quotes_and_backslashes_survive(self):
+        text = 'He said "{word}" \\ it\'s {n}\n'
+        assert TextTemplate(text).format(word="hi", n=2) == text.format(word="hi", n=2)
+
+
+class TestCatalogValidation:
+    def test_shipped_catalog_is_clean(self):
+        assert validate_catalog(LOCALES) == []
+
+    def test_placeholder_mismatch_is_reported(self):
+        problems = validate_catalog(
+            {"ru": {"row": "{medal} {name}"}, "en": {"row": "{medal} {nmae}"}}
+        )
+        assert len(problems) == 1
+        assert "row" in problems[0] and "nmae" in problems[0]
+
+    def test_unparsable_text_is_reported(self):
+        problems = validate_catalog({"ru": {"broken": "{oops"}, "en": {}})
+        assert problems and problems[0].startswith("ru:broken")
+
+    def test_compile_refuses_invalid_catalog(self):
+        with pytest.raises(LocaleCatalogError):
+            _compile({"ru": {"a": "{x}"}, "en": {"a": "{y}"}})
+
+
 class TestFairRetryFeedback:
     """The wrong/skipped feedback templates must NOT interpolate the correct
     answer. Both ❌ and ⏭ feed into the "Retry mistakes" flow — revealing
@@ -0,0 +1,101 @@
+"""Tests for app.middlewares.update_scheduler (per-chat ordering, global cap)."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from aiogram.fsm.storage.base import StorageKey
+
+from app.middlewares.update_scheduler import ChatUpdateScheduler
+
+
+def _key(chat_id: int, user_id: int | None = None) -> StorageKey:
+    return StorageKey(bot_id=1, chat_id=chat_id, user_id=user_id or chat_id)
+
+
+async def _run(scheduler, key, log, tag, delay=0.01):
+    async with scheduler.lock(key):
+        log.append(("start", tag))
+        await asyncio.sleep(delay)
+        log.append(("end", tag))
+
+
+@pytest.mark.asyncio
+async def test_same_chat_updates_run_sequentially_in_arrival_order():
+    scheduler = ChatUpdateScheduler(max_concurrency=8)
+    log: list[tuple[str, int]] = []
+    await asyncio.gather(*(_run(scheduler, _key(10), log, i) for i in range(5)))
+    assert log == [(phase, i) for i in range(5) for phase in ("start", "end")]
+
+
+@pytest.mark.asyncio
+async def test_different_chats_run_concurrently():
+    scheduler = ChatUpdateScheduler(max_concurrency=8)
+    log: list[tuple[str, int]] = []
+    await asyncio.gather(*(_run(scheduler, _key(chat), log, chat) for chat in range(3)))
+    # All three started before any finished.
+    assert [phase for phase, _ in log[:3]] == ["start"] * 3
+
+
+@pytest.mark.asyncio
+async def test_global_cap_limits_in_flight_and_reports_queue_depth():
+    scheduler = ChatUpdateScheduler(max_concurrency=2)
+    release = asyncio.Event()
+    peak = 0
+
+    async def worker(chat: int) -> None:
+        nonlocal peak
+        async with scheduler.lock(_key(chat)):
+            peak = max(peak, scheduler.in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(worker(chat)) for chat in range(5)]
+    await asyncio.sleep(0.01)
+    assert scheduler.in_flight == 2
+    assert scheduler.queue_depth == 3
+    release.set()
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert scheduler.queue_depth == 0
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_locks_are_dropped_once_chat_is_idle():
+    scheduler = ChatUpdateScheduler()
+    log: list[tuple[str, int]] = []
+    await asyncio.gather(*(_run(scheduler, _key(chat), log, chat, 0) for chat in range(50)))
+    assert scheduler.active_chats == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_queue_depth():
+    scheduler = ChatUpdateScheduler(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def holder() -> None:
+        async with scheduler.lock(_key(1)):
+            await release.wait()
+
+    async def waiter() -> None:
+        async with scheduler.lock(_key(1)):
+            pass
+
+    held = asyncio.create_task(holder())
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(waiter())
+    await asyncio.sleep(0)
+    assert scheduler.queue_depth == 1
+    queued.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await queued
+    assert scheduler.queue_depth == 0
+    release.set()
+    await held
+    assert scheduler.active_chats == 0
+
+
+def test_rejects_non_positive_cap():
+    with pytest.raises(ValueError):
+        ChatUpdateScheduler(max_concurrency=0)
@@ -0,0 +1,941 @@
+"""Tests for app.services.backup_service encryption (DMB2 streaming + DMB1 legacy)."""
+from __future__ import annotations
+
+import asyncio
+import io
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from cryptography.fernet import Fernet
+
+from app.services.backup_service import (
+    _ENC_HEADER,
+    _ENC_MAGIC_V1,
+    _ENC_SALT_LEN,
+    BackupDecryptionError,
+    BackupRestoreError,
+    BackupVerificationError,
+    ChunkDecryptor,
+    ChunkEncryptor,
+    _archive_encrypted,
+    _decrypt_for_restore,
+    _derive_fernet_key,
+    _encrypt_file,
+    backup_parts,
+    decrypt_backup,
+    decrypt_stream,
+    encrypt_stream,
+    restore_backup,
+    verify_backup,
+)
+
+PASSWORD = "correct horse battery staple"
+H = _ENC_HEADER.size
+
+
+def _seal(data: bytes, chunk_size: int) -> bytes:
+    encryptor = ChunkEncryptor(PASSWORD, chunk_size=chunk_size)
+    return encryptor.header + encryptor.update(data) + encryptor.finalize()
+
+
+@pytest.mark.parametrize("size", [0, 1, 63, 64, 65, 64 * 5, 64 * 5 + 7])
+def test_chunked_roundtrip_around_chunk_boundaries(size):
+    data = os.urandom(size)
+    out = io.BytesIO()
+    decrypt_stream(io.BytesIO(_seal(data, chunk_size=64)), out, PASSWORD)
+    assert out.getvalue() == data
+
+
+def test_file_roundtrip(tmp_path):
+    src, enc, dst = tmp_path / "a.dump", tmp_path / "a.dump.enc", tmp_path / "b.dump"
+    src.write_bytes(os.urandom(3 * 1024 * 1024 + 11))
+    _encrypt_file(src, enc, PASSWORD)
+    assert enc.read_bytes()[:4] == b"DMB2"
+    decrypt_backup(enc, dst, PASSWORD)
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_legacy_dmb1_backups_still_decrypt(tmp_path):
+    salt = os.urandom(_ENC_SALT_LEN)
+    token = Fernet(_derive_fernet_key(PASSWORD, salt)).encrypt(b"legacy dump")
+    enc, dst = tmp_path / "old.dump.enc", tmp_path / "old.dump"
+    enc.write_bytes(_ENC_MAGIC_V1 + salt + token)
+    decrypt_backup(enc, dst, PASSWORD)
+    assert dst.read_bytes() == b"legacy dump"
+
+
+def test_wrong_password_fails_and_leaves_no_output(tmp_path):
+    enc, dst = tmp_path / "a.dump.enc", tmp_path / "a.dump"
+    enc.write_bytes(_seal(b"x" * 500, chunk_size=64))
+    with pytest.raises(BackupDecryptionError):
+        decrypt_backup(enc, dst, "wrong")
+    assert not dst.exists()
+
+
+@pytest.mark.parametrize(
+    "tamper",
+    [
+        lambda blob, sealed: blob[:-sealed],  # last chunk dropped
+        lambda blob, sealed: blob[:-1],  # tail cut
+        lambda blob, sealed: blob[:H] + blob[H + sealed : H + 2 * sealed]
+        + blob[H : H + sealed] + blob[H + 2 * sealed :],  # chunks swapped
+        lambda blob, sealed: blob[:10] + bytes([blob[10] ^ 1]) + blob[11:],  # header bit
+    ],
+    ids=["truncated-at-boundary", "truncated-mid-chunk", "reordered", "header-flip"],
+)
+def test_tampered_streams_are_rejected(tamper):
+    blob = _seal(os.urandom(64 * 4 + 5), chunk_size=64)
+    with pytest.raises(BackupDecryptionError):
+        decrypt_stream(io.BytesIO(tamper(blob, 64 + 16)), io.BytesIO(), PASSWORD)
+
+
+def test_bad_magic_is_rejected():
+    with pytest.raises(BackupDecryptionError, match="magic"):
+        decrypt_stream(io.BytesIO(b"PK\x03\x04rest"), io.BytesIO(), PASSWORD)
+
+
+class _PatternSource(io.RawIOBase):
+    """``size`` bytes of a repeating pattern, generated on read."""
+
+    def __init__(self, size: int) -> None:
+        self.remaining = size
+        self._pattern = bytes(range(256)) * 4096  # 1 MiB
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, n: int = -1) -> bytes:
+        n = min(n if n >= 0 else self.remaining, self.remaining, len(self._pattern))
+        self.remaining -= n
+        return self._pattern[:n]
+
+
+class _DecryptingSink(io.RawIOBase):
+    """Pipes ciphertext straight into a ``ChunkDecryptor`` and only counts the output."""
+
+    def __init__(self) -> None:
+        self._header = b""
+        self._decryptor: ChunkDecryptor | None = None
+        self.plain_bytes = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        if self._decryptor is None:
+            self._header += data
+            self._decryptor = ChunkDecryptor(self._header, PASSWORD)
+        else:
+            self.plain_bytes += len(self._decryptor.update(data))
+        return len(data)
+
+    def close_stream(self) -> None:
+        self.plain_bytes += len(self._decryptor.finalize())
+
+
+def test_memory_stays_flat_on_multi_gb_stream():
+    """2 GiB through encrypt -> decrypt without touching disk: peak traced
+    allocations stay within a few chunks instead of growing with the input."""
+    size = 2 * 1024 ** 3 + 12345
+    sink = _DecryptingSink()
+    tracemalloc.start()
+    try:
+        encrypt_stream(_PatternSource(size), sink, PASSWORD)
+        sink.close_stream()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert sink.plain_bytes == size
+    assert peak < 16 * 1024 * 1024, f"peak {peak / 2**20:.1f} MiB"
+
+
+_DUMP_SCRIPT = """
+import sys, time
+size, code, err, hang = int(sys.argv[1]), int(sys.argv[2]), sys.argv[3], sys.argv[4] == "1"
+sys.stdout.buffer.write(sys.argv[5].encode())
+block = bytes(range(256)) * 4096
+while size > 0:
+    sys.stdout.buffer.write(block[:size])
+    size -= len(block)
+sys.stdout.flush()
+sys.stderr.write(err)
+sys.stderr.flush()
+while hang:
+    time.sleep(1)
+sys.exit(code)
+"""
+
+
+_spawn = asyncio.create_subprocess_exec  # the tests patch it on the shared module
+
+
+class _FakeDump:
+    """Stands in for pg_dump: a real child process writing ``size`` bytes of a
+    repeating pattern to stdout (so pipe backpressure is real), then ``stderr``,
+    then exiting with ``exit_code`` — or hanging until killed. ``header`` is
+    written before the pattern (``"PGDMP"`` passes for a custom-format dump)."""
+
+    def __init__(
+        self,
+        size: int,
+        exit_code: int = 0,
+        stderr: str = "",
+        hang: bool = False,
+        header: str = "",
+    ) -> None:
+        self.size, self.exit_code, self.stderr, self.hang = size, exit_code, stderr, hang
+        self.header = header
+        self.args: tuple = ()
+        self.proc = None
+        self.calls = 0
+
+    async def __call__(self, *args, **kwargs):
+        self.args = args
+        self.calls += 1
+        self.proc = await _spawn(
+            sys.executable, "-c", _DUMP_SCRIPT,
+            str(self.size), str(self.exit_code), self.stderr, "1" if self.hang else "0",
+            self.header,
+            **kwargs,
+        )
+        return self.proc
+
+
+def _pattern(size: int) -> bytes:
+    return (bytes(range(256)) * (size // 256 + 1))[:size]
+
+
+@pytest.fixture
+def backup_env(tmp_path, monkeypatch):
+    """A ``BackupService`` writing into ``tmp_path``; returns ``(service, install)``
+    where ``install(fake)`` swaps pg_dump for a ``_FakeDump``."""
+    from unittest.mock import AsyncMock
+
+    from app.services import backup_service
+
+    service = backup_service.BackupService(AsyncMock())
+    service.backups_dir = tmp_path
+    service._notify_admins_failure = AsyncMock()
+    service._notify_admins_success = AsyncMock()
+    monkeypatch.setattr(backup_service, "record_backup_run", AsyncMock())
+
+    def install(fake: _FakeDump) -> _FakeDump:
+        monkeypatch.setattr(backup_service.asyncio, "create_subprocess_exec", fake)
+        return fake
+
+    return service, install
+
+
+async def test_dump_is_streamed_into_the_encrypted_file(backup_env, tmp_path):
+    service, install = backup_env
+    size = 3 * (1 << 20) + 7
+    fake = install(_FakeDump(size))
+
+    path = await service.create_backup()
+
+    assert not any(a.startswith("--file") for a in fake.args)  # stdout, not a temp file
+    # No plaintext, no leftover staging part: the backup and its manifest only.
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name, path.name + ".sha256"]
+    assert path.stat().st_mode & 0o777 == 0o600
+    out = io.BytesIO()
+    with path.open("rb") as fin:
+        decrypt_stream(fin, out, os.environ["ADMIN_BACKUP_PASSWORD"])
+    assert out.getvalue() == _pattern(size)
+    service._notify_admins_success.assert_awaited_once()
+
+
+async def test_failed_dump_leaves_nothing_and_reports_scrubbed_stderr(backup_env, tmp_path):
+    service, install = backup_env
+    install(_FakeDump(5 << 20, exit_code=1, stderr="connect postgresql://u:secret@db/x failed"))
+
+    assert await service.create_backup() is None
+
+    assert list(tmp_path.iterdir()) == []
+    _, exit_code, err_text = service._notify_admins_failure.await_args.args
+    assert exit_code == 1
+    assert "secret" not in err_text and "u:***@" in err_text
+
+
+async def test_pipeline_error_kills_pg_dump_and_removes_partial(backup_env, tmp_path, monkeypatch):
+    from app.services import backup_service
+
+    service, install = backup_env
+    fake = install(_FakeDump(64 << 20, hang=True))
+    real_seal, calls = backup_service._seal_into, []
+
+    def failing_seal(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 2:
+            raise OSError(28, "No space left on device")
+        return real_seal(*args, **kwargs)
+
+    monkeypatch.setattr(backup_service, "_seal_into", failing_seal)
+
+    assert await service.create_backup() is None
+
+    assert fake.proc.returncode is not None  # killed, not left blocked on the pipe
+    assert list(tmp_path.iterdir()) == []
+    service._notify_admins_failure.assert_awaited_once()
+
+
+async def test_cancelled_backup_kills_pg_dump_and_removes_partial(backup_env, tmp_path):
+    service, install = backup_env
+    fake = install(_FakeDump(8 << 20, hang=True))
+
+    task = asyncio.create_task(service.create_backup())
+    while not any(tmp_path.iterdir()):
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.2)
+    run = service._running  # what loop shutdown cancels; waiters are shielded
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert run.cancelled()
+
+    assert fake.proc.returncode is not None
+    assert list(tmp_path.iterdir()) == []
+
+
+async def test_backup_encryption_does_not_block_the_event_loop(backup_env):
+    """A ticker standing in for update handlers must keep getting the loop
+    while a 128 MiB dump is derived-key'd and encrypted (~0.2 s of CPU)."""
+    service, install = backup_env
+    install(_FakeDump(128 << 20))
+
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    ticking = asyncio.create_task(ticker())
+    try:
+        path = await service.create_backup()
+    finally:
+        done.set()
+        await ticking
+
+    assert path is not None and backup_parts(path)[0].read_bytes()[:4] == b"DMB2"
+    assert len(lags) > 10
+    assert max(lags) < 0.05, f"event loop stalled for {max(lags) * 1000:.0f} ms"
+
+
+async def test_concurrent_backups_share_one_dump(backup_env, tmp_path):
+    service, install = backup_env
+    fake = install(_FakeDump(4 << 20))
+
+    paths = await asyncio.gather(*(service.create_backup() for _ in range(3)))
+
+    assert fake.calls == 1
+    assert len(set(paths)) == 1 and paths[0] is not None
+    assert len(list(tmp_path.iterdir())) == 2  # one backup + its manifest
+    service._notify_admins_success.assert_awaited_once()
+
+
+async def test_cancelled_waiter_does_not_abort_the_shared_dump(backup_env):
+    service, install = backup_env
+    fake = install(_FakeDump(4 << 20))
+
+    impatient = asyncio.create_task(service.create_backup())
+    await asyncio.sleep(0)
+    patient = asyncio.create_task(service.create_backup())
+    await asyncio.sleep(0.05)
+    impatient.cancel()
+
+    path = await patient
+    assert path is not None and path.exists()
+    assert fake.calls == 1
+
+
+async def test_recent_backup_is_reused_then_expires(backup_env):
+    service, install = backup_env
+    fake = install(_FakeDump(1 << 20))
+
+    first = await service.recent_or_new_backup()
+    assert await service.recent_or_new_backup() == first
+    assert fake.calls == 1
+
+    await asyncio.sleep(1.1)  # file names carry the second
+    second = await service.recent_or_new_backup(max_age=0)
+    assert fake.calls == 2 and second != first
+
+
+async def test_failed_backup_is_not_reused(backup_env):
+    service, install = backup_env
+    fake = install(_FakeDump(1 << 20, exit_code=1))
+
+    assert await service.recent_or_new_backup() is None
+    assert await service.recent_or_new_backup() is None
+    assert fake.calls == 2
+
+
+_DIR_DUMP_SCRIPT = """
+import os, sys
+target = sys.argv[1]
+os.mkdir(target)
+for name, size in (("toc.dat", 300), ("3001.dat.gz", 2 << 20), ("3002.dat.gz", 17)):
+    with open(os.path.join(target, name), "wb") as f:
+        f.write(bytes(range(256)) * (size // 256) + b"x" * (size % 256))
+"""
+
+
+async def test_parallel_directory_dump_is_archived_into_one_encrypted_file(
+    backup_env, tmp_path, monkeypatch
+):
+    from app.services import backup_service
+
+    service, _ = backup_env
+    seen: list[tuple] = []
+
+    async def directory_dump(*args, **kwargs):
+        seen.append(args)
+        target = next(a for a in args if a.startswith("--file=")).split("=", 1)[1]
+        return await _spawn(sys.executable, "-c", _DIR_DUMP_SCRIPT, target, **kwargs)
+
+    monkeypatch.setattr(backup_service, "BACKUP_DUMP_JOBS", 4)
+    monkeypatch.setattr(backup_service.asyncio, "create_subprocess_exec", directory_dump)
+
+    path = await service.create_backup()
+
+    assert "--format=directory" in seen[0] and "--jobs=4" in seen[0]
+    # Staging directory removed.
+    assert sorted(p.name for p in tmp_path.iterdir()) == [path.name, path.name + ".sha256"]
+    out_dir = tmp_path / "restore"
+    out_dir.mkdir()
+    restored = _decrypt_for_restore(path, out_dir, os.environ["ADMIN_BACKUP_PASSWORD"])
+    assert restored.is_dir()
+    assert {p.name: p.stat().st_size for p in restored.iterdir()} == {
+        "toc.dat": 300, "3001.dat.gz": 2 << 20, "3002.dat.gz": 17,
+    }
+
+
+def _custom_backup(tmp_path) -> Path:
+    plain, enc = tmp_path / "x.dump", tmp_path / "x.dump.enc"
+    plain.write_bytes(b"PGDMP" + os.urandom(1000))
+    _encrypt_file(plain, enc, PASSWORD)
+    return enc
+
+
+def test_restore_runs_parallel_pg_restore_and_reports_timings(tmp_path, monkeypatch):
+    import subprocess
+
+    enc = _custom_backup(tmp_path)
+    calls = []
+
+    def fake_run(command, env, stderr):
+        source = command[-1]
+        calls.append((command, env["PGPASSWORD"], open(source, "rb").read(5), source))
+        return subprocess.CompletedProcess(command, 0, stderr=b"")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    staging = tmp_path / "staging"
+    staging.mkdir()
+
+    timings = restore_backup(
+        enc, "postgresql+asyncpg://u:pw@db:5432/restored", PASSWORD,
+        jobs=3, clean=True, workdir=staging,
+    )
+
+    command, pg_password, magic, source = calls[0]
+    assert command[:2] == ["pg_restore", "--jobs=3"]
+    assert "--dbname=postgresql://u@db:5432/restored" in command and "--clean" in command
+    assert (pg_password, magic) == ("pw", b"PGDMP")
+    assert not os.path.exists(source) and list(staging.iterdir()) == []  # plaintext gone
+    assert set(timings) == {"decrypt_s", "restore_s", "increments_s", "total_s"}
+
+
+def test_restore_failure_is_reported_without_credentials(tmp_path, monkeypatch):
+    import subprocess
+
+    enc = _custom_backup(tmp_path)
+    monkeypatch.setattr(
+        subprocess, "run",
+        lambda command, env, stderr: subprocess.CompletedProcess(
+            command, 1, stderr=b"could not connect postgresql://u:pw@db/x"
+        ),
+    )
+    with pytest.raises(BackupRestoreError, match=r"exit=1.*u:\*\*\*@") as exc:
+        restore_backup(enc, "postgresql://u:pw@db/x", PASSWORD)
+    assert "pw@" not in str(exc.value)
+
+
+async def test_large_backup_is_split_into_hashed_parts(backup_env, tmp_path, monkeypatch):
+    import hashlib
+
+    from app.services import backup_service
+
+    service, install = backup_env
+    monkeypatch.setattr(backup_service, "BACKUP_PART_SIZE", 1 << 20)
+    size = 3 * (1 << 20) + 500_000
+    install(_FakeDump(size))
+
+    path = await service.create_backup()
+
+    parts = backup_parts(path)
+    assert [p.name for p in parts] == [f"{path.name}.{n:03d}" for n in (1, 2, 3, 4)]
+    assert all(p.stat().st_size <= 1 << 20 for p in parts)
+    assert backup_service.read_manifest(path) == {
+        p.name: hashlib.sha256(p.read_bytes()).hexdigest() for p in parts
+    }
+    out = tmp_path / "restored.dump"
+    decrypt_backup(parts[1], out, os.environ["ADMIN_BACKUP_PASSWORD"])  # any part names it
+    assert out.read_bytes() == _pattern(size)
+
+
+@pytest.fixture
+def split_backup(tmp_path):
+    """A 3-part backup written through the real part writer + manifest."""
+    from app.services.backup_service import _PartWriter, _publish_parts
+
+    data = os.urandom(200_000)
+    writer = _PartWriter(tmp_path / ".x.part", 80_000)
+    encrypt_stream(io.BytesIO(data), writer, PASSWORD)
+    writer.close()
+    base = tmp_path / "x.dump.enc"
+    _publish_parts(writer.parts, base)
+    return base, data
+
+
+def test_split_backup_roundtrip(split_backup, tmp_path):
+    base, data = split_backup
+    assert len(backup_parts(base)) == 3
+    decrypt_backup(base, tmp_path / "x.dump", PASSWORD)
+    assert (tmp_path / "x.dump").read_bytes() == data
+
+
+def test_corrupted_part_fails_its_hash_check(split_backup, tmp_path):
+    base, _ = split_backup
+    second = backup_parts(base)[1]
+    blob = bytearray(second.read_bytes())
+    blob[100] ^= 1
+    second.write_bytes(bytes(blob))
+    with pytest.raises(BackupDecryptionError, match=r"\.002 failed its SHA-256"):
+        decrypt_backup(base, tmp_path / "x.dump", PASSWORD)
+    assert not (tmp_path / "x.dump").exists()
+
+
+def test_missing_part_is_reported_before_decrypting(split_backup, tmp_path):
+    base, _ = split_backup
+    backup_parts(base)[2].unlink()
+    with pytest.raises(BackupDecryptionError, match="do not match the manifest"):
+        decrypt_backup(base, tmp_path / "x.dump", PASSWORD)
+
+
+async def test_retention_removes_every_part_of_old_backups(backup_env, tmp_path, monkeypatch):
+    from app.services import backup_service
+
+    service, _ = backup_env
+    monkeypatch.setattr(backup_service, "BACKUP_RETENTION", 1)
+    for stamp in ("20260101_000000", "20260102_000000"):
+        base = tmp_path / f"bot_backup_{stamp}.dump.enc"
+        for name in (f"{base.name}.001", f"{base.name}.002", f"{base.name}.sha256"):
+            (tmp_path / name).write_bytes(b"x")
+
+    await service._cleanup_old_backups()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "bot_backup_20260102_000000.dump.enc.001",
+        "bot_backup_20260102_000000.dump.enc.002",
+        "bot_backup_20260102_000000.dump.enc.sha256",
+    ]
+
+
+_FAKE_PG_RESTORE = """#!{python}
+import hashlib, os, sys
+source = sys.argv[-1]
+if os.path.isdir(source):
+    seen = " ".join(sorted(os.listdir(source)))
+else:
+    # Like pg_restore --list, stop after the first bytes when asked to.
+    data = sys.stdin.buffer.read(int(os.environ.get("FAKE_PG_RESTORE_READ", "-1")))
+    seen = f"{{len(data)}} {{hashlib.sha256(data).hexdigest()}}"
+with open(os.environ["FAKE_PG_RESTORE_LOG"], "a") as log:
+    log.write(" ".join(sys.argv[1:]) + " | " + seen + "\\n")
+sys.stderr.write(os.environ.get("FAKE_PG_RESTORE_STDERR", ""))
+sys.exit(int(os.environ.get("FAKE_PG_RESTORE_EXIT", "0")))
+"""
+
+
+@pytest.fixture
+def fake_pg_restore(tmp_path_factory, monkeypatch) -> Path:
+    """Put a ``pg_restore`` stand-in first on PATH; returns its call log."""
+    bin_dir = tmp_path_factory.mktemp("bin")
+    script = bin_dir / "pg_restore"
+    script.write_text(_FAKE_PG_RESTORE.format(python=sys.executable))
+    script.chmod(0o755)
+    log = bin_dir / "calls.log"
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_PG_RESTORE_LOG", str(log))
+    return log
+
+
+def _sealed_dump(tmp_path, size: int) -> tuple[Path, bytes]:
+    plain, enc = tmp_path / "x.dump", tmp_path / "x.dump.enc"
+    plain.write_bytes(b"PGDMP" + os.urandom(size))
+    _encrypt_file(plain, enc, PASSWORD)
+    return enc, plain.read_bytes()
+
+
+def test_verify_streams_the_decrypted_dump_into_pg_restore_list(tmp_path, fake_pg_restore):
+    import hashlib
+
+    enc, data = _sealed_dump(tmp_path, 3 << 20)
+
+    assert verify_backup(enc, PASSWORD) >= 0
+
+    args, seen = fake_pg_restore.read_text().strip().split(" | ")
+    assert args == "--list"
+    assert seen == f"{len(data)} {hashlib.sha256(data).hexdigest()}"
+
+
+def test_verify_still_authenticates_what_pg_restore_does_not_read(
+    tmp_path, fake_pg_restore, monkeypatch
+):
+    enc, _ = _sealed_dump(tmp_path, 3 << 20)
+    blob = bytearray(enc.read_bytes())
+    blob[-100] ^= 1  # last chunk, long after the bytes pg_restore reads
+    enc.write_bytes(bytes(blob))
+    monkeypatch.setenv("FAKE_PG_RESTORE_READ", "4096")
+
+    with pytest.raises(BackupDecryptionError):
+        verify_backup(enc, PASSWORD)
+
+
+def test_verify_restore_mode_reports_pg_restore_errors_scrubbed(
+    tmp_path, fake_pg_restore, monkeypatch
+):
+    enc, _ = _sealed_dump(tmp_path, 1000)
+    monkeypatch.setenv("FAKE_PG_RESTORE_EXIT", "1")
+    monkeypatch.setenv("FAKE_PG_RESTORE_STDERR", "could not connect postgresql://u:pw@db/x")
+
+    with pytest.raises(BackupVerificationError, match=r"exit=1.*u:\*\*\*@") as exc:
+        verify_backup(enc, PASSWORD, database_url="postgresql+asyncpg://u:pw@db/scratch")
+
+    assert "pw@" not in str(exc.value)
+    args = fake_pg_restore.read_text().split(" | ")[0].split()
+    assert "--clean" in args and "--dbname=postgresql://u@db/scratch" in args
+
+
+def test_verify_lists_a_directory_dump_from_its_toc_alone(tmp_path, fake_pg_restore):
+    src = tmp_path / "dump"
+    src.mkdir()
+    for name in ("toc.dat", "3001.dat.gz"):
+        (src / name).write_bytes(os.urandom(4096))
+    enc = tmp_path / "x.dump.enc"
+    with enc.open("wb") as out:
+        _archive_encrypted(src, out, PASSWORD)
+
+    verify_backup(enc, PASSWORD)
+    verify_backup(enc, PASSWORD, database_url="postgresql://u@db/scratch", jobs=3)
+
+    listed, restored = fake_pg_restore.read_text().strip().splitlines()
+    assert listed.startswith("--list ") and listed.endswith("| toc.dat")
+    assert "--jobs=3" in restored and restored.endswith("| 3001.dat.gz toc.dat")
+
+
+async def test_verified_backup_stats_are_reported_and_recorded(
+    backup_env, fake_pg_restore, monkeypatch
+):
+    from app.services import backup_service
+
+    service, install = backup_env
+    monkeypatch.setattr(backup_service, "BACKUP_VERIFY", "list")
+    install(_FakeDump(2 << 20, header="PGDMP"))
+
+    path = await service.create_backup()
+
+    stats, exit_code = service._notify_admins_success.await_args.args
+    assert exit_code == 0 and stats.name == path.name
+    assert (stats.verify_mode, stats.verified, stats.parts) == ("list", True, 1)
+    assert stats.size_bytes == path.stat().st_size
+    assert stats.dump_s >= stats.encrypt_s > 0 and stats.verify_s > 0
+    record = backup_service.record_backup_run.await_args.kwargs
+    assert record["verified"] is True and record["verify_mode"] == "list"
+    assert record["dump_ms"] == round(stats.dump_s * 1000)
+
+
+async def test_failed_verification_keeps_the_backup_and_says_so(
+    backup_env, fake_pg_restore, monkeypatch
+):
+    from app.services import backup_service
+
+    service, install = backup_env
+    monkeypatch.setattr(backup_service, "BACKUP_VERIFY", "list")
+    monkeypatch.setenv("FAKE_PG_RESTORE_EXIT", "1")
+    install(_FakeDump(1 << 20, header="PGDMP"))
+
+    path = await service.create_backup()
+
+    assert path is not None and path.exists()
+    stats, _ = service._notify_admins_success.await_args.args
+    assert stats.verified is False and "exit=1" in stats.verify_error
+    assert backup_service.record_backup_run.await_args.kwargs["verified"] is False
+
+
+async def test_success_message_carries_timings_and_verification():
+    from unittest.mock import AsyncMock
+
+    from app.services.backup_service import BackupService, BackupStats
+
+    service = BackupService(AsyncMock())
+    service._broadcast = AsyncMock()
+    stats = BackupStats(
+        name="b.dump.enc", size_bytes=200 << 20, parts=5, jobs=1,
+        dump_s=10.0, encrypt_s=2.5, verify_mode="list", verify_s=4.0, verified=True,
+    )
+
+    await service._notify_admins_success(stats, 0)
+
+    message = service._broadcast.await_args.args[0]
+    assert "частей: 5" in message
+    assert "10.0 с (20.0 MB/с)" in message and "шифрование: 2.5 с" in message
+    assert "pg_restore --list): ✅ 4.0 с (50.0 MB/с)" in message
+
+
+async def _problems(count: int, answered: bool = True) -> list[int]:
+    """``count`` problems in a new session of a new user; their ids."""
+    from app.database.db import (
+        create_training_session,
+        get_or_create_user,
+        record_problem_answered,
+        record_problem_shown,
+    )
+
+    telegram_id = time.time_ns() % 10**9
+    await get_or_create_user(telegram_id=telegram_id, username="b", first_name="B")
+    session = await create_training_session(telegram_id, "easy", "mult", count)
+    ids = []
+    for i in range(count):
+        ids.append(await record_problem_shown(session.id, i, 3, "×", 3 * i))
+        if answered:
+            await record_problem_answered(ids[-1], 3 * i, True)
+    return ids
+
+
+async def _problem_rows(ids: list[int]) -> list[tuple]:
+    from sqlalchemy import select
+
+    from app.database.db import async_session_maker
+    from app.database.models import Problem
+
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(Problem.id, Problem.session_id, Problem.user_answer, Problem.answered_at)
+            .where(Problem.id.in_(ids))
+            .order_by(Problem.id)
+        )
+        return [tuple(row) for row in result]
+
+
+async def _delete_problems(ids: list[int]) -> None:
+    """What a database restored from an older full dump lacks."""
+    from sqlalchemy import delete
+
+    from app.database.db import async_session_maker
+    from app.database.models import Problem
+
+    async with async_session_maker() as session:
+        await session.execute(delete(Problem).where(Problem.id.in_(ids)))
+        await session.commit()
+
+
+# A full backup older than anything the tests export; its snapshot is taken
+# by the test.
+_FULL = "bot_backup_20000101_000000.dump.enc"
+
+
+async def _snapshot() -> str:
+    from app.services.backup_service import BackupService
+
+    return await BackupService._change_snapshot()
+
+
+async def _increment(service, monkeypatch, base: tuple[str, str]):
+    """Export an increment on top of ``base``; ``(path, stats)``."""
+    from unittest.mock import AsyncMock
+
+    from app.services import backup_service
+
+    monkeypatch.setattr(backup_service, "get_backup_base", AsyncMock(return_value=base))
+    path = await service.create_increment()
+    stats, _ = service._notify_admins_success.await_args.args
+    await asyncio.sleep(1)  # names carry a per-second timestamp
+    return path, stats
+
+
+async def _replay(increments: list[Path], base: str = _FULL) -> dict[str, int]:
+    from app.services.backup_service import _apply_increments
+
+    return await _apply_increments(
+        increments, os.environ["DATABASE_URL"], os.environ["ADMIN_BACKUP_PASSWORD"], base
+    )
+
+
+async def test_increment_replays_new_rows_onto_a_restored_database(backup_env, monkeypatch):
+    service, _ = backup_env
+    full = await _snapshot()
+    ids = await _problems(3)
+    before = await _problem_rows(ids)
+
+    path, stats = await _increment(service, monkeypatch, (_FULL, full))
+
+    assert stats.kind == "incremental" and stats.snapshot
+    assert stats.rows == {"users": 1, "training_sessions": 1, "problems": 3}
+    assert path.name.endswith(".problems.enc") and path.read_bytes()[:4] == b"DMB2"
+    await _delete_problems(ids)
+    assert await _replay([path]) == stats.rows
+    assert await _problem_rows(ids) == before
+    # The id sequence was moved past the replayed rows.
+    assert (await _problems(1))[0] > ids[-1]
+
+
+async def test_a_row_committed_late_under_a_lower_id_is_not_lost(backup_env, monkeypatch):
+    """An id watermark would pass over ``late``: a newer id commits first."""
+    import asyncpg
+
+    from app.services.backup_service import _to_libpq_url
+
+    service, _ = backup_env
+    (existing,) = await _problems(1)
+    ((_, session_id, _, _),) = await _problem_rows([existing])
+    full = await _snapshot()
+    conn = await asyncpg.connect(_to_libpq_url(os.environ["DATABASE_URL"]))
+    try:
+        tx = conn.transaction()
+        await tx.start()
+        late = await conn.fetchval(
+            "INSERT INTO problems (session_id, first_number, second_number, operation, "
+            "correct_answer, is_correct) VALUES ($1, 2, 2, '+', 4, false) RETURNING id",
+            session_id,
+        )
+        newer = await _problems(1)
+        first, first_stats = await _increment(service, monkeypatch, (_FULL, full))
+        await tx.commit()
+    finally:
+        await conn.close()
+    second, second_stats = await _increment(
+        service, monkeypatch, (first.name, first_stats.snapshot)
+    )
+
+    assert newer[0] > late
+    assert (first_stats.rows["problems"], second_stats.rows["problems"]) == (1, 1)
+    await _delete_problems([late, *newer])
+    await _replay([first, second])
+    assert [row[0] for row in await _problem_rows([late, *newer])] == [late, *newer]
+
+
+async def test_late_answers_and_counter_updates_ship_again(backup_env, monkeypatch):
+    from app.database.db import finalize_session, record_problem_answered
+
+    service, _ = backup_env
+    ids = await _problems(2, answered=False)
+    ((_, session_id, _, _), _) = await _problem_rows(ids)
+    full = await _snapshot()
+
+    await record_problem_answered(ids[0], 0, True)
+    await finalize_session(session_id, 1, 1)
+    _, stats = await _increment(service, monkeypatch, (_FULL, full))
+
+    assert stats.rows == {"users": 1, "training_sessions": 1, "problems": 1}
+
+
+async def test_replay_refuses_a_gap_in_the_increment_chain(backup_env, monkeypatch):
+    service, _ = backup_env
+    full = await _snapshot()
+    await _problems(2)
+    first, first_stats = await _increment(service, monkeypatch, (_FULL, full))
+    await _problems(2)
+    second, _ = await _increment(service, monkeypatch, (first.name, first_stats.snapshot))
+
+    with pytest.raises(BackupRestoreError, match="increment is missing"):
+        await _replay([second])
+    # Building on a run older than the full dump only overlaps it.
+    await _replay([second], base=second.name.replace(".problems.enc", ".dump.enc"))
+
+
+async def test_first_increment_without_a_snapshot_takes_a_full_backup(
+    backup_env, monkeypatch
+):
+    from unittest.mock import AsyncMock
+
+    from app.services import backup_service
+
+    service, install = backup_env
+    fake = install(_FakeDump(1 << 10))
+    monkeypatch.setattr(backup_service, "get_backup_base", AsyncMock(return_value=None))
+
+    path = await service.create_increment()
+
+    assert fake.calls == 1 and path.name.endswith(".dump.enc")
+
+
+async def test_increment_joins_a_running_full_backup(backup_env, monkeypatch):
+    from unittest.mock import AsyncMock
+
+    service, install = backup_env
+    fake = install(_FakeDump(1 << 10))
+    monkeypatch.setattr(service, "_export_increment", AsyncMock())
+
+    full, increment = await asyncio.gather(service.create_backup(), service.create_increment())
+
+    assert full == increment and fake.calls == 1
+    service._export_increment.assert_not_awaited()
+
+
+async def test_full_backup_waits_for_a_running_increment(backup_env, tmp_path):
+    service, install = backup_env
+    fake = install(_FakeDump(1 << 10))
+    order = []
+
+    async def increment():
+        order.append("increment started")
+        await asyncio.sleep(0.2)
+        order.append("increment done")
+        return tmp_path / "inc.problems.enc"
+
+    service._run_increment = increment
+    incremental, full = await asyncio.gather(service.create_increment(), service.create_backup())
+
+    assert incremental.name == "inc.problems.enc" and full.name.endswith(".dump.enc")
+    assert order == ["increment started", "increment done"] and fake.calls == 1
+    # Only the full backup is offered to admins asking for a recent one.
+    assert await service.recent_or_new_backup() == full
+
+
+async def test_retention_drops_increments_older_than_every_kept_full_backup(
+    backup_env, tmp_path, monkeypatch
+):
+    from app.services import backup_service
+    from app.services.backup_service import increments_after
+
+    service, _ = backup_env
+    monkeypatch.setattr(backup_service, "BACKUP_RETENTION", 1)
+    for name in (
+        "bot_backup_20260101_000000.dump.enc",
+        "bot_backup_20260101_120000.problems.enc",
+        "bot_backup_20260102_000000.dump.enc",
+        "bot_backup_20260102_120000.problems.enc.001",
+        "bot_backup_20260102_120000.problems.enc.002",
+        "bot_backup_20260102_120000.problems.enc.sha256",
+    ):
+        (tmp_path / name).write_bytes(b"x")
+
+    await service._cleanup_old_backups()
+
+    kept = tmp_path / "bot_backup_20260102_000000.dump.enc"
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        kept.name,
+        "bot_backup_20260102_120000.problems.enc.001",
+        "bot_backup_20260102_120000.problems.enc.002",
+        "bot_backup_20260102_120000.problems.enc.sha256",
+    ]
+    assert [p.name for p in increments_after(kept)] == [
+        "bot_backup_20260102_120000.problems.enc"
+    ]
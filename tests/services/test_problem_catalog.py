@@ -0,0 +1,65 @@
+"""Tests for app.services.problem_catalog and seeded no-repeat draws."""
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+import pytest
+
+from app.services.problem_catalog import (
+    CATALOG_MAX_SIZE,
+    catalog_stats,
+    get_catalog,
+    permuted_position,
+)
+from app.services.problem_codec import SeededProblems
+from app.services.problem_generator import ProblemGenerator, make_problem
+from app.utils.constants import Difficulty, TrainingMode
+
+
+def test_small_spaces_are_catalogued_and_large_ones_skipped():
+    stats = catalog_stats()
+    assert stats["sizes"]["sqrt/easy"] == 11
+    assert stats["sizes"]["power/easy"] == 9
+    assert stats["skipped"]["add/hard"] > CATALOG_MAX_SIZE
+    assert get_catalog("add", Difficulty.HARD) is None
+    assert stats["bytes"] > 0 and stats["build_ms"] >= 0
+
+
+@pytest.mark.parametrize(
+    "op, mode",
+    [("sqrt", TrainingMode.SQRT_ONLY), ("power", TrainingMode.POWER_ONLY)],
+)
+@pytest.mark.parametrize("difficulty", list(Difficulty))
+def test_catalog_is_exactly_the_scalar_support(op, mode, difficulty):
+    catalog = get_catalog(op, difficulty)
+    catalogued = {make_problem(*catalog.entry(i)) for i in range(len(catalog))}
+    scalar = set(
+        ProblemGenerator.generate_problems(difficulty, mode, 3000, rng=random.Random(0))
+    )
+    assert catalogued == scalar
+
+
+@pytest.mark.parametrize("size", [1, 2, 9, 11, 28, 1089, 8100])
+def test_permuted_position_is_a_bijection(size):
+    for seed in (0, 1, 2**62 + 7):
+        positions = {permuted_position(seed, "mul", idx, size) for idx in range(size)}
+        assert positions == set(range(size))
+
+
+def test_seeded_session_never_repeats_within_a_catalog():
+    for seed in range(50):
+        session = SeededProblems(seed, Difficulty.EASY, TrainingMode.SQRT_ONLY, 22)
+        counts = Counter(p.formatted_text for p in session)
+        # 11 possible roots: every one shown exactly twice, never back-to-back.
+        assert set(counts.values()) == {2}
+        assert all(session[i] != session[i + 1] for i in range(21))
+
+
+def test_first_draw_is_uniform_over_the_catalog():
+    counts = Counter(
+        SeededProblems(seed, Difficulty.EASY, TrainingMode.POWER_ONLY, 1)[0].formatted_text
+        for seed in range(9000)
+    )
+    assert len(counts) == 9
+    assert max(counts.values()) < 1.15 * min(counts.values())
@@ -0,0 +1,102 @@
+"""Tests for app.services.problem_codec."""
+from __future__ import annotations
+
+import json
+import random
+
+import pytest
+
+from app.services.problem_codec import (
+    ProblemSet,
+    SeededProblems,
+    decode_problem,
+    decode_problems,
+    encode_problems,
+)
+from app.services.problem_generator import Problem, ProblemGenerator, make_problem
+from app.utils.constants import Difficulty, TrainingMode
+
+
+def _spec(p: Problem) -> dict:
+    return {
+        "first_num": p.first_num,
+        "second_num": p.second_num,
+        "operation": p.operation,
+        "answer": p.answer,
+        "formatted_text": p.formatted_text,
+        "metadata": dict(p.metadata),
+    }
+
+
+def test_roundtrip_preserves_display_fields_for_every_operation():
+    rng = random.Random(7)
+    problems = ProblemGenerator.generate_problems(
+        Difficulty.HARD, TrainingMode.MIXED, 300, rng=rng
+    )
+    assert {p.operation for p in problems} == {"+", "−", "×", "÷", "÷r", "^", "√"}
+    decoded = decode_problems(encode_problems(problems))
+    assert [_spec(p) for p in decoded] == [_spec(p) for p in problems]
+
+
+def test_make_problem_derives_remainder_metadata():
+    p = make_problem(14, 4, "÷r", 3)
+    assert p.formatted_text == "14 ÷ 4 (с остатком)"
+    assert p.metadata == {"remainder": 2, "dividend": 14, "divisor": 4}
+
+
+def test_packed_form_is_much_smaller_than_json_specs():
+    problems = ProblemGenerator.generate_problems(
+        Difficulty.MEDIUM, TrainingMode.MIXED, 20, rng=random.Random(1)
+    )
+    packed = encode_problems(problems)
+    as_json = json.dumps([_spec(p) for p in problems], ensure_ascii=False)
+    assert len(packed) * 3 < len(as_json)
+
+
+def test_problem_set_accepts_legacy_specs():
+    problems = [make_problem(12, 3, "÷", 4), make_problem(5, 2, "^", 25)]
+    legacy = ProblemSet.from_specs(_spec(p) for p in problems)
+    assert len(legacy) == 2
+    assert legacy == ProblemSet.from_problems(problems)
+    assert legacy[1].formatted_text == "5²"
+
+
+def test_seeded_problems_are_random_access_and_reproducible():
+    seeded = SeededProblems(1234, Difficulty.HARD, TrainingMode.MIXED, 5000)
+    assert len(seeded) == 5000
+    assert _spec(seeded[4321]) == _spec(seeded[4321])
+    assert _spec(seeded[-1]) == _spec(seeded[4999])
+    other_seed = SeededProblems(1235, Difficulty.HARD, TrainingMode.MIXED, 5000)
+    assert [_spec(p) for p in seeded[:20]] != [_spec(p) for p in other_seed[:20]]
+    with pytest.raises(IndexError):
+        seeded[5000]
+
+
+def test_seeded_problems_respect_mode():
+    seeded = SeededProblems(99, Difficulty.EASY, TrainingMode.SQRT_ONLY, 50)
+    assert all(p.operation == "√" and p.answer ** 2 == p.first_num for p in seeded)
+
+
+def test_decode_problem_matches_full_decode_at_every_index():
+    # 13-byte records straddle base64 quads at every possible offset.
+    problems = ProblemGenerator.generate_problems(
+        Difficulty.HARD, TrainingMode.MIXED, 37, rng=random.Random(3)
+    )
+    blob = encode_problems(problems)
+    full = decode_problems(blob)
+    assert [_spec(decode_problem(blob, i)) for i in range(37)] == [_spec(p) for p in full]
+    packed = ProblemSet(blob)
+    assert len(packed) == 37
+    assert _spec(packed[-1]) == _spec(full[-1])
+    with pytest.raises(IndexError):
+        packed[37]
+
+
+def test_problem_is_immutable_and_hashable():
+    p = make_problem(14, 4, "÷r", 3)
+    with pytest.raises(AttributeError):
+        p.answer = 4
+    with pytest.raises(TypeError):
+        p.metadata["remainder"] = 0
+    assert not hasattr(p, "__dict__")
+    assert {p, make_problem(14, 4, "÷r", 3)} == {p}
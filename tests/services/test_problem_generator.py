@@ -1,4 +1,8 @@
 """Tests for app.services.problem_generator."""
+import random
+from collections import Counter
+from statistics import NormalDist
+
 import pytest
 
 from app.services.problem_generator import ProblemGenerator, Problem
@@ -92,3 +96,30 @@ class TestProblemGeneratorGenerateVariants:
         variants = ProblemGenerator.generate_variants(0, 2)
         assert len(variants) >= 2
         assert any(v[0] == 0 and v[1] for v in variants)
+
+    def test_near_zero_never_negative_and_distinct(self):
+        rng = random.Random(3)
+        for correct in (0, 1, 2, 3):
+            for _ in range(300):
+                values = [v for v, _ in ProblemGenerator.generate_variants(correct, 4, rng=rng)]
+                assert min(values) >= 0
+                assert len(set(values)) == 4
+
+    def test_many_variants_stay_distinct(self):
+        values = [v for v, _ in ProblemGenerator.generate_variants(0, 40, rng=random.Random(1))]
+        assert len(set(values)) == 40
+
+    def test_keeps_rounded_gaussian_shape(self):
+        # One wrong answer around 100 (sigma = 15): offset d != 0 should follow
+        # P(round(N(0, 15)) == d), renormalized without d == 0.
+        rng = random.Random(11)
+        n = 20_000
+        counts = Counter()
+        for _ in range(n):
+            variants = ProblemGenerator.generate_variants(100, 2, rng=rng)
+            counts[next(v for v, correct in variants if not correct) - 100] += 1
+        dist = NormalDist(0, 15)
+        expected = {d: dist.cdf(d + 0.5) - dist.cdf(d - 0.5) for d in range(-90, 91) if d}
+        norm = sum(expected.values())
+        tvd = 0.5 * sum(abs(counts[d] / n - p / norm) for d, p in expected.items())
+        assert tvd < 0.05
@@ -0,0 +1,96 @@
+"""Tests for app.services.session_state."""
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.fsm.context import FSMContext
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from app.services import session_state as session_state_module
+from app.services.problem_codec import ProblemSet
+from app.services.problem_generator import make_problem
+from app.services.session_state import SessionState, session_state
+
+
+def _state(data: dict):
+    s = MagicMock()
+    s.get_data = AsyncMock(return_value=data)
+    s.set_data = AsyncMock()
+    return s
+
+
+def test_from_data_coerces_ints_and_keeps_unknown_keys():
+    session = SessionState.from_data(
+        {"idx": "2", "session_id": "9", "lang": None, "picker": "x"}
+    )
+    assert session.idx == 2
+    assert session.session_id == 9
+    assert session.lang == "ru"
+    assert session.to_data()["picker"] == "x"
+
+
+@pytest.mark.asyncio
+async def test_session_state_writes_once_on_change():
+    state = _state({"idx": 0, "correct": 0})
+    async with session_state(state) as session:
+        session.idx += 1
+        session.correct += 1
+    state.get_data.assert_awaited_once()
+    state.set_data.assert_awaited_once()
+    written = state.set_data.call_args.args[0]
+    assert (written["idx"], written["correct"]) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_session_state_skips_write_when_unchanged():
+    state = _state(SessionState(idx=3).to_data())
+    async with session_state(state):
+        pass
+    state.set_data.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_session_state_skips_write_when_block_raises():
+    state = _state({"idx": 0})
+    with pytest.raises(RuntimeError):
+        async with session_state(state) as session:
+            session.idx = 5
+            raise RuntimeError("boom")
+    state.set_data.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_problem_list_moves_to_its_own_key_and_reloads_on_cache_miss():
+    storage = MemoryStorage()
+    state = FSMContext(storage=storage, key=StorageKey(bot_id=1, chat_id=2, user_id=3))
+    problems = ProblemSet.from_problems(
+        [make_problem(2, 3, "×", 6), make_problem(144, 0, "√", 12)]
+    )
+    await state.set_data({"session_id": 9, "idx": 0, "problems": problems.blob})
+
+    async with session_state(state) as session:
+        assert session.problems == problems
+
+    main = await state.get_data()
+    assert "problems" not in main
+    assert main["problem_count"] == 2
+
+    # Another worker / a restart: nothing cached, one read of the side key.
+    session_state_module._problem_cache.clear()
+    async with session_state(state) as session:
+        assert session.problems[1].formatted_text == "√144"
+        session.idx = 1
+    assert (await state.get_data())["idx"] == 1
+
+
+def test_seeded_session_data_is_constant_size():
+    short = SessionState.from_data(
+        {"difficulty": "easy", "mode": "mixed", "problem_seed": 7, "problem_count": 10}
+    )
+    marathon = SessionState.from_data(
+        {"difficulty": "easy", "mode": "mixed", "problem_seed": 7, "problem_count": 100_000}
+    )
+    assert marathon.total == 100_000
+    assert len(str(marathon.to_data())) - len(str(short.to_data())) <= 4
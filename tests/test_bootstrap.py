@@ -1,13 +1,16 @@
 """Tests for startup-time side effects in app.bootstrap."""
 from __future__ import annotations
 
+import asyncio
+import time
+from contextlib import ExitStack
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
 from aiogram.exceptions import TelegramForbiddenError
 
-from app.bootstrap import notify_admins_startup
+from app.bootstrap import notify_admins_startup, setup_app
 
 
 @pytest.mark.asyncio
@@ -46,3 +49,59 @@ async def test_notify_admins_startup_swallows_forbidden_and_continues():
         # Should NOT raise even though the first admin blocked the bot.
         await notify_admins_startup(bot, reminders_count=3)
     assert bot.send_message.call_count == 2
+
+
+def _patch_startup(stack: ExitStack, init_db, set_bot_commands) -> MagicMock:
+    stack.enter_context(patch("app.bootstrap.init_db", init_db))
+    stack.enter_context(patch("app.bootstrap.set_bot_commands", set_bot_commands))
+    stack.enter_context(patch("app.bootstrap.load_scheduled_users", AsyncMock()))
+    stack.enter_context(patch("app.bootstrap.BackupService", MagicMock()))
+    # The routers are module-level and attach to one Dispatcher per process.
+    stack.enter_context(patch("app.bootstrap.Dispatcher", MagicMock()))
+    notifications = MagicMock()
+    notifications.get_all_jobs_count.return_value = 0
+    stack.enter_context(patch("app.bootstrap.NotificationService", return_value=notifications))
+    return notifications
+
+
+@pytest.mark.asyncio
+async def test_setup_app_overlaps_db_init_with_command_menu():
+    async def slow(*_args):
+        await asyncio.sleep(0.2)
+
+    with ExitStack() as stack:
+        _patch_startup(stack, slow, slow)
+        started = time.perf_counter()
+        app = await setup_app()
+        elapsed = time.perf_counter() - started
+    await app.bot.session.close()
+    assert elapsed < 0.35  # sequential would be 0.4 s
+
+
+@pytest.mark.asyncio
+async def test_setup_app_failure_propagates_and_stops_the_scheduler():
+    set_commands = AsyncMock()
+    with ExitStack() as stack:
+        notifications = _patch_startup(
+            stack, AsyncMock(side_effect=ConnectionRefusedError("db down")), set_commands
+        )
+        with pytest.raises(ConnectionRefusedError, match="db down"):
+            await setup_app()
+    notifications.shutdown.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_command_menu_failure_does_not_cancel_db_init():
+    finished = []
+
+    async def init_db():
+        await asyncio.sleep(0.1)
+        finished.append(True)
+
+    with ExitStack() as stack:
+        _patch_startup(
+            stack, init_db, AsyncMock(side_effect=ConnectionResetError("telegram down"))
+        )
+        app = await setup_app()
+    await app.bot.session.close()
+    assert finished == [True]
@@ -0,0 +1,34 @@
+"""Tests for app.utils.latency."""
+import pytest
+
+from app.utils.latency import LatencyWindow
+
+
+def test_empty_window_has_no_percentiles():
+    window = LatencyWindow("t")
+    assert window.summary() == {"count": 0, "p50_ms": None, "p95_ms": None}
+
+
+def test_nearest_rank_percentiles():
+    window = LatencyWindow("t")
+    for ms in range(1, 101):
+        window.record(float(ms))
+    assert window.percentile(50) == 50.0
+    assert window.percentile(95) == 95.0
+    assert window.percentile(100) == 100.0
+
+
+def test_window_keeps_only_recent_samples():
+    window = LatencyWindow("t", size=3)
+    for ms in (500.0, 1.0, 2.0, 3.0):
+        window.record(ms)
+    assert window.summary()["count"] == 3
+    assert window.percentile(100) == 3.0
+
+
+def test_measure_records_even_when_block_raises():
+    window = LatencyWindow("t")
+    with pytest.raises(ValueError):
+        with window.measure():
+            raise ValueError
+    assert window.summary()["count"] == 1
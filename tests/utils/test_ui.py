@@ -1,12 +1,20 @@
 """Unit tests for app.utils.ui helpers."""
 from __future__ import annotations
 
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 
+from aiogram.exceptions import TelegramBadRequest
+
 from app.utils.ui import (
+    edit_anchor,
     format_problem_anchor,
     format_seconds,
+    format_session_result,
     render_progress_bar,
+    safe_edit,
     today_msk,
 )
 
@@ -102,10 +110,16 @@ def _stub_get_text(k, lang):
     return "{current}/{total} {bar}"
 
 
-def test_anchor_includes_streak_and_time(monkeypatch):
+def _stub_locale(monkeypatch, stub=_stub_get_text):
+    from app.locales import TextTemplate
     from app.utils import ui
 
-    monkeypatch.setattr(ui, "get_text", _stub_get_text)
+    monkeypatch.setattr(ui, "get_text", stub)
+    monkeypatch.setattr(ui, "get_template", lambda k, lang: TextTemplate(stub(k, lang)))
+
+
+def test_anchor_includes_streak_and_time(monkeypatch):
+    _stub_locale(monkeypatch)
     text_ru = format_problem_anchor(
         "5 * 5", current=2, total=5, lang="ru", streak=3, last_time_s=4.2
     )
@@ -119,25 +133,36 @@ def test_anchor_includes_streak_and_time(monkeypatch):
 
 
 def test_anchor_omits_zero_streak(monkeypatch):
-    from app.utils import ui
-
-    monkeypatch.setattr(ui, "get_text", _stub_get_text)
+    _stub_locale(monkeypatch)
     text = format_problem_anchor("1 + 1", current=1, total=5, lang="ru", streak=0)
     assert "🔥" not in text
 
 
 def test_anchor_includes_feedback_prefix(monkeypatch):
-    from app.utils import ui
-
-    monkeypatch.setattr(
-        ui, "get_text", lambda k, lang: "{current}/{total} {bar}"
-    )
+    _stub_locale(monkeypatch, lambda k, lang: "{current}/{total} {bar}")
     text = format_problem_anchor(
         "1 + 1", current=2, total=5, lang="ru", feedback_prefix="✅"
     )
     assert text.startswith("✅\n")
 
 
+def test_session_result_lists_slowest_problems_in_given_order():
+    text = format_session_result(
+        correct=8, total=10, avg_time_s=3.0, current_streak=2, lang="en",
+        slowest=[("12²", 9.5), ("√144", 7.25)],
+    )
+    assert "Slowest" in text
+    assert text.index("12²") < text.index("√144")
+    assert format_seconds(9.5) in text
+
+
+def test_session_result_without_slowest_has_no_breakdown():
+    text = format_session_result(
+        correct=1, total=1, avg_time_s=None, current_streak=0, lang="ru"
+    )
+    assert "🐢" not in text
+
+
 def test_anchor_shows_retry_banner_only_in_retry_session():
     """Retry sessions get a small banner above feedback/header — reassures
     the user that they're in the Retry-mistakes flow."""
@@ -168,3 +193,83 @@ def test_anchor_retry_banner_localized():
 def test_today_msk_returns_a_date():
     d = today_msk()
     assert hasattr(d, "year") and hasattr(d, "month") and hasattr(d, "day")
+
+
+# ---- coalesced anchor edits ---------------------------------------------
+
+
+def _slow_bot(delay: float = 0.01):
+    bot = MagicMock()
+
+    async def edit(**kwargs):
+        await asyncio.sleep(delay)
+
+    bot.edit_message_text = AsyncMock(side_effect=edit)
+    return bot
+
+
+@pytest.mark.asyncio
+async def test_edit_anchor_skips_payload_identical_to_last_sent():
+    bot = _slow_bot(0)
+    await edit_anchor(bot, chat_id=1, message_id=2, text="a")
+    await edit_anchor(bot, chat_id=1, message_id=2, text="a")
+    assert bot.edit_message_text.await_count == 1
+    await edit_anchor(bot, chat_id=1, message_id=2, text="b")
+    assert bot.edit_message_text.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_edit_anchor_burst_collapses_to_latest():
+    bot = _slow_bot()
+    await asyncio.gather(
+        *(edit_anchor(bot, chat_id=1, message_id=3, text=f"v{i}") for i in range(5))
+    )
+    sent = [c.kwargs["text"] for c in bot.edit_message_text.await_args_list]
+    # First edit was already in flight; v1..v3 were superseded by v4.
+    assert sent == ["v0", "v4"]
+
+
+@pytest.mark.asyncio
+async def test_edit_anchor_keys_are_per_message():
+    bot = _slow_bot()
+    await asyncio.gather(
+        edit_anchor(bot, chat_id=1, message_id=4, text="x"),
+        edit_anchor(bot, chat_id=1, message_id=5, text="x"),
+    )
+    assert bot.edit_message_text.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_edit_anchor_not_modified_error_is_swallowed_and_cached():
+    bot = MagicMock()
+    bot.edit_message_text = AsyncMock(
+        side_effect=TelegramBadRequest(method=MagicMock(), message="message is not modified")
+    )
+    await edit_anchor(bot, chat_id=1, message_id=6, text="same")
+    await edit_anchor(bot, chat_id=1, message_id=6, text="same")
+    assert bot.edit_message_text.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_edit_anchor_failure_clears_digest_and_propagates():
+    bot = MagicMock()
+    bot.edit_message_text = AsyncMock(
+        side_effect=[TelegramBadRequest(method=MagicMock(), message="boom"), None]
+    )
+    with pytest.raises(TelegramBadRequest):
+        await edit_anchor(bot, chat_id=1, message_id=7, text="t")
+    await edit_anchor(bot, chat_id=1, message_id=7, text="t")
+    assert bot.edit_message_text.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_safe_edit_shares_slot_with_edit_anchor():
+    bot = _slow_bot(0)
+    callback = MagicMock()
+    callback.message.chat.id = 1
+    callback.message.message_id = 8
+    callback.message.edit_text = AsyncMock()
+    await safe_edit(callback, "menu")
+    await edit_anchor(bot, chat_id=1, message_id=8, text="menu")
+    callback.message.edit_text.assert_awaited_once()
+    bot.edit_message_text.assert_not_awaited()